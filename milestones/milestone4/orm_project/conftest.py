@@ -0,0 +1,215 @@
+# conftest.py
+#
+# This file holds the shared pytest fixtures for the unit tests (`test_*.py`). The unit tests run
+# without a database:
+#   - `fake_db` replaces `MySQL.connect()` with an in-memory connection. The connection records
+#     every statement and answers queries with rows registered through `respond()`.
+#   - `fake_aio` does the same for the async API (`orm/aio.py`): it replaces the `aiomysql`
+#     driver with pools whose connections run against the same `FakeDatabase`.
+#   - Each test starts with no write listeners and an empty query cache.
+#
+# `tests.py` is the end-to-end script. It needs a live database and pytest does not collect it.
+#
+# Example usage:
+#
+#   def test_lock(fake_db):
+#       fake_db.respond("SELECT user_id", rows=[(7, datetime(2026, 1, 1))])
+#       ...
+#       assert fake_db.executed("UPDATE session")
+
+import types
+
+import pytest
+
+import orm.aio
+import orm.base
+from orm.cache import query_cache
+from orm.dbconnectors import MySQL
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.statements = []    # (sql with whitespace collapsed, values)
+        self.commits = 0
+        self.rollbacks = 0
+        self._responses = []    # (fragment, rows, rowcount, error)
+        self._next_id = 1
+
+    def respond(self, fragment, rows=(), rowcount=None, error=None):
+        """Answer statements containing `fragment` with `rows`, or raise `error`.
+
+        `rows` may be a function of `(sql, values)`. The latest matching response wins.
+        """
+        self._responses.insert(0, (fragment, rows, rowcount, error))
+
+    def executed(self, fragment):
+        """Return the `(sql, values)` of every statement containing `fragment`."""
+        return [(sql, values) for sql, values in self.statements if fragment in sql]
+
+    def _run(self, sql, values):
+        sql = " ".join(sql.split())
+        values = tuple(values or ())
+        self.statements.append((sql, values))
+        for fragment, rows, rowcount, error in self._responses:
+            if fragment in sql:
+                if error is not None:
+                    raise error
+                rows = list(rows(sql, values) if callable(rows) else rows)
+                return rows, len(rows) if rowcount is None else rowcount
+        return [], 1
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = -1
+        self.lastrowid = None
+        self._rows = []
+
+    def execute(self, sql, values=()):
+        self._rows, self.rowcount = self.db._run(sql, values)
+        if sql.lstrip().upper().startswith("INSERT"):
+            self.lastrowid = self.db._next_id
+            self.db._next_id += 1
+
+    def executemany(self, sql, rows):
+        for values in rows:
+            self.execute(sql, values)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, **options):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db.commits += 1
+
+    def rollback(self):
+        self.db.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+class FakeAsyncCursor:
+    def __init__(self, db):
+        self._cursor = FakeCursor(db)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, values=()):
+        self._cursor.execute(sql, values)
+
+    async def fetchall(self):
+        return self._cursor.fetchall()
+
+    async def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+
+class FakeAsyncConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, cursor_class=None):
+        return FakeAsyncCursor(self.db)
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        self.db.commits += 1
+
+    async def rollback(self):
+        self.db.rollbacks += 1
+
+
+class _Acquire:
+    """Like `aiomysql`'s `pool.acquire()`: awaitable, or usable with `async with`."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def _acquire(self):
+        self.pool.acquired += 1
+        return FakeAsyncConnection(self.pool.db)
+
+    async def __aenter__(self):
+        return await self._acquire()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    def __init__(self, db, endpoint):
+        self.db = db
+        self.endpoint = endpoint
+        self.acquired = 0
+
+    def acquire(self):
+        return _Acquire(self)
+
+    def release(self, conn):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _isolated_orm(monkeypatch):
+    monkeypatch.setattr(orm.base, "_listeners", {})
+    query_cache.clear()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setattr(MySQL, "connect", lambda self, read=False, **options: FakeConnection(db))
+    return db
+
+
+@pytest.fixture
+def fake_aio(fake_db, monkeypatch):
+    """Route the async API to `fake_db`. Returns the pools created, keyed by `(host, port)`."""
+    pools = {}
+
+    async def create_pool(host, port, **options):
+        return pools.setdefault((host, port), FakePool(fake_db, (host, port)))
+
+    driver = types.SimpleNamespace(create_pool=create_pool, Error=Exception,
+                                   DictCursor=object, SSDictCursor=object)
+    monkeypatch.setattr(orm.aio, "_driver", driver)
+    return pools
@@ -0,0 +1,474 @@
+# loadtest.py
+#
+# This file is a load generator for the ORM. It replays a mix of verification-service operations
+# against a local database through the real `models.models` classes, and reports how the ORM
+# behaves under concurrency.
+#
+# Operations (the mix is set with `--mix`):
+#   - `sign`: save a new `Signature`.
+#   - `verify`: load a signature with its certificate and revocation through the join builder, then
+#     write a `VerificationEvent` and the `AuditLog` row referencing it in one transaction with
+#     `Base.flush()` (`Base.aflush()` when async).
+#   - `access`: look up an unexpired `AccessControlEntry` grant for a user and a document.
+#   - `lockout`: record a failed attempt with `LockoutTracker`, unless the user is already locked.
+#   - `audit`: write a batch of `AuditLog` rows for existing verification events with `bulk_save()`.
+#
+# Concurrency (`--mode`):
+#   - `thread`: `--concurrency` threads using the blocking API.
+#   - `process`: `--concurrency` processes using the blocking API. They are started with `spawn`,
+#     so they share no connections or threads with the parent.
+#   - `async`: `--concurrency` asyncio tasks on one event loop using the async API (`orm/aio.py`).
+#
+# The blocking and async versions of an operation issue the same statements in the same
+# transactions. Reads go through the builders' SQL and `_select_rows()`, which raise on errors
+# instead of returning an empty result.
+#
+# Each worker runs `--operations` operations. The sequence of operations and the rows they touch
+# come from `random.Random` seeded with `--seed` and the worker number, so two runs with the same
+# arguments issue the same work and their results can be compared. `--json` writes the results and
+# the arguments to a file.
+#
+# The report shows, per operation: count, throughput, p50/p95/p99 latency and error rate. An
+# operation counts as an error if it raises or reports failure, for example a `save()` that left
+# the row unsaved or a `bulk_save()` that inserted fewer rows than given. `lockout` writes are
+# not checked, because `LockoutTracker` does not report them. It also
+# shows connections: the number the blocking API opened (counted in `MySQL._open`) and the
+# server's `Threads_connected`, sampled during the run, together with the growth of its
+# `Connections` counter.
+#
+# The database must already contain users, documents, certificates, signatures, verification
+# events and grants, for
+# example from `milestones/milestone2/inserts.sql`. The run writes signatures, verification events,
+# audit rows and failed attempts, so use a disposable database.
+#
+# Example usage:
+#
+#   python loadtest.py --mode thread --concurrency 16 --operations 500 --seed 7
+#   python loadtest.py --mode async --concurrency 200 --operations 100 --json async-200.json
+#   python loadtest.py --mode process --concurrency 4 --mix sign=1,verify=4,access=4,lockout=1,audit=1
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from orm import aio
+from orm.base import Base
+from orm.dbconnectors import MySQL
+from models.models import (AccessControlEntry, AuditLog, DigitalCertificate, Document, Signature,
+                           SignatureRevocation, User, VerificationEvent)
+from services.lockout import LockoutTracker
+
+
+OPERATIONS = ("sign", "verify", "access", "lockout", "audit")
+DEFAULT_MIX = "sign=2,verify=4,access=6,lockout=1,audit=1"
+AUDIT_BATCH = 20
+
+
+class Recorder:
+    """Latencies and error counts per operation for one worker."""
+
+    def __init__(self):
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.errors = {name: 0 for name in OPERATIONS}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+    def merge(self, other):
+        for name in OPERATIONS:
+            self.latencies[name].extend(other["latencies"][name])
+            self.errors[name] += other["errors"][name]
+
+    def to_dict(self):
+        return {"latencies": self.latencies, "errors": self.errors}
+
+
+class ConnectionCounter:
+    """Counts the connections opened by the blocking API in this process."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def install(self):
+        original = MySQL._open
+        counter = self
+
+        def _open(mysql, endpoint, **options):
+            with counter._lock:
+                counter.count += 1
+            return original(mysql, endpoint, **options)
+
+        MySQL._open = _open
+
+
+class ServerSampler:
+    """Samples the server's `Threads_connected` on a dedicated connection during the run."""
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.samples = []
+        self.connections = None
+        self._stopped = threading.Event()
+        self._conn = None
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+
+    def start(self):
+        self._conn = MySQL().connect()
+        self._start_connections = self._status("Connections")
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.connections = self._status("Connections") - self._start_connections
+        self._conn.close()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.samples.append(self._status("Threads_connected"))
+            self._stopped.wait(self.interval)
+
+    def _status(self, name):
+        cursor = self._conn.cursor()
+        try:
+            cursor.execute("SHOW GLOBAL STATUS LIKE %s", (name,))
+            return int(cursor.fetchone()[1])
+        finally:
+            cursor.close()
+
+
+class Fixtures:
+    """Ids of existing rows that the operations pick from."""
+
+    def __init__(self, user_ids, document_ids, certificates, signature_ids, event_ids, grants):
+        self.user_ids = user_ids
+        self.document_ids = document_ids
+        self.certificates = certificates      # [(digital_certificate_id, user_id)]
+        self.signature_ids = signature_ids
+        self.event_ids = event_ids            # verification_event_id, referenced by `audit` rows
+        self.grants = grants                  # [(user_id, document_id)]
+
+    @classmethod
+    def load(cls):
+        certificates = DigitalCertificate.fetch_columns(["digital_certificate_id", "user_id"])
+        grants = AccessControlEntry.fetch_columns(["user_id", "document_id"])
+        fixtures = cls(
+            user_ids=list(User.fetch_columns(["user_id"])["user_id"]),
+            document_ids=list(Document.fetch_columns(["document_id"])["document_id"]),
+            certificates=list(zip(certificates["digital_certificate_id"], certificates["user_id"])),
+            signature_ids=list(Signature.fetch_columns(["signature_id"])["signature_id"]),
+            event_ids=list(VerificationEvent.fetch_columns(["verification_event_id"])["verification_event_id"]),
+            grants=list(zip(grants["user_id"], grants["document_id"])),
+        )
+        missing = [name for name, rows in vars(fixtures).items() if not rows]
+        if missing:
+            raise SystemExit(f"[ERROR] The database has no rows for: {', '.join(missing)}. Load test data first.")
+        return fixtures
+
+    def to_dict(self):
+        return vars(self)
+
+
+class Workload:
+    """The operations, drawing their inputs from a seeded random generator."""
+
+    def __init__(self, fixtures, rng, tracker):
+        self.fixtures = fixtures
+        self.rng = rng
+        self.tracker = tracker
+
+    # Inputs are drawn before the operation is timed, so async and blocking runs draw identically.
+
+    def sign_args(self):
+        certificate_id, user_id = self.rng.choice(self.fixtures.certificates)
+        document_id = self.rng.choice(self.fixtures.document_ids)
+        digest = hashlib.sha256(f"{document_id}:{user_id}:{self.rng.random()}".encode()).hexdigest()
+        return Signature(hash=digest, timestamp=datetime.now(), digital_certificate_id=certificate_id,
+                         user_id=user_id, document_id=document_id)
+
+    def verify_args(self):
+        return self.rng.choice(self.fixtures.signature_ids), self.rng.random() < 0.9
+
+    def access_args(self):
+        if self.rng.random() < 0.8:
+            return self.rng.choice(self.fixtures.grants)
+        return self.rng.choice(self.fixtures.user_ids), self.rng.choice(self.fixtures.document_ids)
+
+    def lockout_args(self):
+        return self.rng.choice(self.fixtures.user_ids)
+
+    def audit_args(self):
+        now = datetime.now()
+        return [AuditLog(user_id=self.rng.choice(self.fixtures.user_ids),
+                         verification_event_id=self.rng.choice(self.fixtures.event_ids), action="loadtest",
+                         timestamp=now, result=self.rng.choice(("success", "failure")),
+                         method="loadtest", ip="127.0.0.1")
+                for _ in range(AUDIT_BATCH)]
+
+    def run(self, name):
+        return getattr(self, name)(getattr(self, f"{name}_args")())
+
+    def sign(self, signature):
+        signature.save()
+        return signature.__dict__.get("_persisted", False)
+
+    def verify(self, args):
+        signature_id, valid = args
+        rows = Signature._select_rows(*self._verify_read(signature_id))
+        if not rows:
+            return False
+        return Base.flush(self._verification_rows(rows[0], valid)) == 2
+
+    def access(self, args):
+        AccessControlEntry._select_rows(*self._access_read(args))
+        return True
+
+    def lockout(self, user_id):
+        if not self.tracker.is_locked(user_id):
+            self.tracker.record_failure(user_id)
+        return True
+
+    def audit(self, entries):
+        return AuditLog.bulk_save(entries) == len(entries)
+
+    async def arun(self, name):
+        return await getattr(self, f"a{name}")(getattr(self, f"{name}_args")())
+
+    async def asign(self, signature):
+        await signature.asave()
+        return signature.__dict__.get("_persisted", False)
+
+    async def averify(self, args):
+        signature_id, valid = args
+        rows = await aio._select_rows(Signature, *self._verify_read(signature_id))
+        if not rows:
+            return False
+        return await Base.aflush(self._verification_rows(rows[0], valid)) == 2
+
+    async def aaccess(self, args):
+        await aio._select_rows(AccessControlEntry, *self._access_read(args))
+        return True
+
+    async def alockout(self, user_id):
+        return await asyncio.to_thread(self.lockout, user_id)
+
+    async def aaudit(self, entries):
+        return await AuditLog.abulk_save(entries) == len(entries)
+
+    # Each read returns `(sql, values, tables)` for `_select_rows()`.
+
+    def _verify_read(self, signature_id):
+        join = (Signature.join_builder()
+                .join(DigitalCertificate, on="digital_certificate_id")
+                .left_join(SignatureRevocation, on="signature_id")
+                .where(signature_id=signature_id))
+        tables = [model.__name__.lower() for model in (Signature, DigitalCertificate, SignatureRevocation)]
+        return (*join.sql(), tables)
+
+    def _access_read(self, args):
+        user_id, document_id = args
+        sql, values = AccessControlEntry._query_sql(
+            {"user_id": user_id, "document_id": document_id, "expires_at__gt": datetime.now()})
+        return sql, values, [AccessControlEntry.__name__.lower()]
+
+    def _verification_rows(self, row, valid):
+        """Return the event and the audit row referencing it, in insert order."""
+        now = datetime.now()
+        result = "success" if valid else "failure"
+        user_id, document_id = row["signature__user_id"], row["signature__document_id"]
+        event = VerificationEvent(verification_event_id=VerificationEvent.new_id(), user_id=user_id,
+                                  document_id=document_id, timestamp=now, result=result)
+        log = AuditLog(user_id=user_id, verification_event_id=event.verification_event_id,
+                       action="verify signature", timestamp=now, result=result, method="loadtest",
+                       ip="127.0.0.1")
+        return [event, log]
+
+
+def _schedule(seed, worker, operations, mix):
+    rng = random.Random(seed * 1_000_003 + worker)
+    names = list(mix)
+    return rng, rng.choices(names, weights=[mix[name] for name in names], k=operations)
+
+
+def _timed(recorder, name, call):
+    start = time.perf_counter()
+    try:
+        ok = bool(call())
+    except Exception as e:
+        print(f"[ERROR] {name} raised {type(e).__name__}: {e}")
+        ok = False
+    recorder.record(name, time.perf_counter() - start, ok)
+
+
+def _blocking_worker(worker, config, fixtures, recorder, lockout):
+    rng, schedule = _schedule(config["seed"], worker, config["operations"], config["mix"])
+    workload = Workload(fixtures, rng, lockout)
+    for name in schedule:
+        _timed(recorder, name, lambda: workload.run(name))
+
+
+def _process_worker(args):
+    """Entry point of a `--mode process` worker. Returns its recorder and connection count."""
+    worker, config, fixtures = args
+    recorder = Recorder()
+    counter = ConnectionCounter()
+    counter.install()
+    lockout = LockoutTracker()
+    _blocking_worker(worker, config, Fixtures(**fixtures), recorder, lockout)
+    return recorder.to_dict(), counter.count
+
+
+async def _async_main(config, fixtures, recorder, lockout):
+    async def worker(index):
+        rng, schedule = _schedule(config["seed"], index, config["operations"], config["mix"])
+        workload = Workload(fixtures, rng, lockout)
+        for name in schedule:
+            start = time.perf_counter()
+            try:
+                ok = bool(await workload.arun(name))
+            except Exception as e:
+                print(f"[ERROR] {name} raised {type(e).__name__}: {e}")
+                ok = False
+            recorder.record(name, time.perf_counter() - start, ok)
+
+    try:
+        await asyncio.gather(*(worker(index) for index in range(config["concurrency"])))
+    finally:
+        await aio.close_pools()
+
+
+def run(config):
+    fixtures = Fixtures.load()
+    recorder = Recorder()
+    counter = ConnectionCounter()
+    sampler = ServerSampler()
+    counter.install()
+
+    lockout = LockoutTracker()
+    lockout.load()
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        if config["mode"] == "thread":
+            with ThreadPoolExecutor(max_workers=config["concurrency"]) as pool:
+                futures = [pool.submit(_blocking_worker, index, config, fixtures, recorder, lockout)
+                           for index in range(config["concurrency"])]
+                for future in futures:
+                    future.result()
+        elif config["mode"] == "process":
+            jobs = [(index, config, fixtures.to_dict()) for index in range(config["concurrency"])]
+            # `spawn` keeps the sampler's thread and connection out of the workers.
+            with multiprocessing.get_context("spawn").Pool(config["concurrency"]) as pool:
+                for result, connections in pool.map(_process_worker, jobs):
+                    recorder.merge(result)
+                    counter.count += connections
+        else:
+            asyncio.run(_async_main(config, fixtures, recorder, lockout))
+    finally:
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+
+    return summarize(config, recorder, elapsed, counter.count, sampler)
+
+
+def _percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(config, recorder, elapsed, client_connections, sampler):
+    operations = {}
+    for name in OPERATIONS:
+        latencies = sorted(recorder.latencies[name])
+        if not latencies:
+            continue
+        operations[name] = {
+            "count": len(latencies),
+            "throughput": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            "errors": recorder.errors[name],
+            "error_rate": round(recorder.errors[name] / len(latencies), 4),
+        }
+    total = sum(op["count"] for op in operations.values())
+    samples = sampler.samples or [0]
+    return {
+        "config": dict(config),
+        "elapsed_seconds": round(elapsed, 3),
+        "total_operations": total,
+        "throughput": round(total / elapsed, 2) if elapsed else 0.0,
+        "operations": operations,
+        "connections": {
+            "client_opened": client_connections,
+            "server_opened": sampler.connections,
+            "server_threads_connected_max": max(samples),
+            "server_threads_connected_mean": round(sum(samples) / len(samples), 1),
+        },
+    }
+
+
+def print_report(results):
+    config = results["config"]
+    print(f"\n--- Load test: mode={config['mode']} concurrency={config['concurrency']} "
+          f"operations/worker={config['operations']} seed={config['seed']} ---")
+    print(f"{'operation':<10}{'count':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}{'rate':>8}")
+    for name, op in results["operations"].items():
+        print(f"{name:<10}{op['count']:>8}{op['throughput']:>10}{op['p50_ms']:>10}{op['p95_ms']:>10}"
+              f"{op['p99_ms']:>10}{op['errors']:>9}{op['error_rate']:>8.2%}")
+    print(f"total: {results['total_operations']} operations in {results['elapsed_seconds']}s "
+          f"({results['throughput']} ops/s)")
+    connections = results["connections"]
+    print(f"connections: client opened {connections['client_opened']}, server opened "
+          f"{connections['server_opened']}, Threads_connected max {connections['server_threads_connected_max']} "
+          f"mean {connections['server_threads_connected_mean']}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay mixed verification traffic against the ORM.")
+    parser.add_argument("--mode", choices=("thread", "process", "async"), default="thread")
+    parser.add_argument("--concurrency", type=int, default=8, help="threads, processes or tasks")
+    parser.add_argument("--operations", type=int, default=200, help="operations per worker")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    config = {"mode": args.mode, "concurrency": args.concurrency, "operations": args.operations,
+              "mix": args.mix, "seed": args.seed}
+    results = run(config)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"[INFO] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
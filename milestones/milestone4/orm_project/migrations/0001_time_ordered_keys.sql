@@ -0,0 +1,67 @@
+-- 0001_time_ordered_keys.sql
+--
+-- Widens the keys of `Signature`, `AuditLog` and `VerificationEvent` to BIGINT, together with
+-- every column that references them. These models use `TimeOrdered` keys (see orm/ids.py),
+-- which are larger than 2^31 and overflow the INT columns of milestones/milestone2/dsvs.sql.
+--
+-- MySQL does not allow changing the type of a column used by a foreign key, so the foreign keys
+-- from milestones/milestone2/foreign_keys.sql are dropped, the columns widened, and the foreign
+-- keys added back.
+--
+-- Apply this before partitioning `auditlog` or `verificationevent` with `add_partitions()`.
+-- Native partitioning needs their foreign keys dropped, and then this migration's DROP FOREIGN
+-- KEY statements fail.
+--
+-- Rolling back fails if any key is already larger than INT can hold.
+--
+--   python -m orm.migrations apply migrations/0001_time_ordered_keys.sql
+
+-- migrate:up
+ALTER TABLE signaturerevocation DROP FOREIGN KEY fk_SignatureRevocation_Signature;
+ALTER TABLE verificationevent DROP FOREIGN KEY fk_VerificationEvent_AuditLog;
+ALTER TABLE auditlog DROP FOREIGN KEY fk_AuditLog_VerificationEvent;
+ALTER TABLE ipaddresslog DROP FOREIGN KEY fk_IPAddressLog_VerificationEvent;
+
+ALTER TABLE signature MODIFY signature_id BIGINT NOT NULL AUTO_INCREMENT;
+ALTER TABLE signaturerevocation MODIFY signature_id BIGINT DEFAULT NULL;
+ALTER TABLE auditlog
+    MODIFY audit_log_id BIGINT NOT NULL,
+    MODIFY verification_event_id BIGINT NOT NULL;
+ALTER TABLE verificationevent
+    MODIFY verification_event_id BIGINT NOT NULL AUTO_INCREMENT,
+    MODIFY audit_log_id BIGINT DEFAULT NULL;
+ALTER TABLE ipaddresslog MODIFY verification_event_id BIGINT NOT NULL;
+
+ALTER TABLE signaturerevocation
+    ADD CONSTRAINT fk_SignatureRevocation_Signature FOREIGN KEY (signature_id) REFERENCES signature(signature_id);
+ALTER TABLE verificationevent
+    ADD CONSTRAINT fk_VerificationEvent_AuditLog FOREIGN KEY (audit_log_id) REFERENCES auditlog(audit_log_id);
+ALTER TABLE auditlog
+    ADD CONSTRAINT fk_AuditLog_VerificationEvent FOREIGN KEY (verification_event_id) REFERENCES verificationevent(verification_event_id);
+ALTER TABLE ipaddresslog
+    ADD CONSTRAINT fk_IPAddressLog_VerificationEvent FOREIGN KEY (verification_event_id) REFERENCES verificationevent(verification_event_id);
+
+-- migrate:down
+ALTER TABLE signaturerevocation DROP FOREIGN KEY fk_SignatureRevocation_Signature;
+ALTER TABLE verificationevent DROP FOREIGN KEY fk_VerificationEvent_AuditLog;
+ALTER TABLE auditlog DROP FOREIGN KEY fk_AuditLog_VerificationEvent;
+ALTER TABLE ipaddresslog DROP FOREIGN KEY fk_IPAddressLog_VerificationEvent;
+
+ALTER TABLE signature MODIFY signature_id INT NOT NULL AUTO_INCREMENT;
+ALTER TABLE signaturerevocation MODIFY signature_id INT DEFAULT NULL;
+ALTER TABLE auditlog
+    MODIFY audit_log_id INT NOT NULL,
+    MODIFY verification_event_id INT NOT NULL;
+ALTER TABLE verificationevent
+    MODIFY verification_event_id INT NOT NULL AUTO_INCREMENT,
+    MODIFY audit_log_id INT DEFAULT NULL;
+ALTER TABLE ipaddresslog MODIFY verification_event_id INT NOT NULL;
+
+ALTER TABLE signaturerevocation
+    ADD CONSTRAINT fk_SignatureRevocation_Signature FOREIGN KEY (signature_id) REFERENCES signature(signature_id);
+ALTER TABLE verificationevent
+    ADD CONSTRAINT fk_VerificationEvent_AuditLog FOREIGN KEY (audit_log_id) REFERENCES auditlog(audit_log_id);
+ALTER TABLE auditlog
+    ADD CONSTRAINT fk_AuditLog_VerificationEvent FOREIGN KEY (verification_event_id) REFERENCES verificationevent(verification_event_id);
+ALTER TABLE ipaddresslog
+    ADD CONSTRAINT fk_IPAddressLog_VerificationEvent FOREIGN KEY (verification_event_id) REFERENCES verificationevent(verification_event_id);
@@ -0,0 +1,15 @@
+-- 0002_nullable_notification_document.sql
+--
+-- Makes `notification.document_id` nullable. Notifications that are not about a document, such
+-- as the certificate expiry notices of services/expiry_scanner.py, are stored with a NULL
+-- `document_id`. The foreign key to `document` stays and still checks the rows that have one.
+--
+-- Rolling back fails while any notification has a NULL `document_id`.
+--
+--   python -m orm.migrations apply migrations/0002_nullable_notification_document.sql
+
+-- migrate:up
+ALTER TABLE notification MODIFY document_id INT DEFAULT NULL;
+
+-- migrate:down
+ALTER TABLE notification MODIFY document_id INT NOT NULL;
@@ -20,8 +20,10 @@
 # Below you can find two models examples that demonstrate the usage of the base class
 
 from orm.columns import Column
-from orm.datatypes import Integer, String, Boolean
+from orm.datatypes import Integer, String, Boolean, Date, DateTime
 from orm.base import Base
+from orm.ids import TimeOrdered
+from orm.partitions import RangePartitioning
 
 
 class User(Base):
@@ -48,6 +50,8 @@ class User(Base):
 
 
 class Role(Base):
+    __cache__ = True
+
     role_id = Column(Integer, primary_key=True)
     title = Column(String(50))
     permissions = Column(String(100))
@@ -60,6 +64,8 @@ class Role(Base):
 
 
 class Organization(Base):
+    __cache__ = True
+
     organization_id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     sector = Column(String(100))
@@ -73,11 +79,29 @@ class Organization(Base):
         self.region = kwargs.get('region')
 
 
+class CertificateAuthority(Base):
+    __cache__ = True
+
+    certificate_authority_id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    authority_public_key = Column(String(255), nullable=False)
+    organization_id = Column(Integer, foreign_key=True)
+    status = Column(String(50), nullable=False)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.certificate_authority_id = kwargs.get('certificate_authority_id')
+        self.name = kwargs.get('name')
+        self.authority_public_key = kwargs.get('authority_public_key')
+        self.organization_id = kwargs.get('organization_id')
+        self.status = kwargs.get('status')
+
+
 class Document(Base):
     document_id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
-    content = String(type="TEXT")
-    upload_time = Column(String("DATETIME"))
+    content = Column(String(type="TEXT"))
+    upload_time = Column(DateTime())
     organization_id = Column(Integer, foreign_key=True)
 
     def __init__(self, **kwargs):
@@ -89,10 +113,38 @@ class Document(Base):
         self.organization_id = kwargs.get('organization_id')
 
 
+class DocumentRoleSignature(Base):
+    document_id = Column(Integer, primary_key=True)
+    role_id = Column(Integer, primary_key=True)
+    signature_count = Column(Integer, nullable=False)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.document_id = kwargs.get('document_id')
+        self.role_id = kwargs.get('role_id')
+        self.signature_count = kwargs.get('signature_count')
+
+
+class DocumentCompleteness(Base):
+    document_id = Column(Integer, primary_key=True)
+    organization_id = Column(Integer)
+    signed_mask = Column(Integer, nullable=False)
+    complete = Column(Boolean, nullable=False)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.document_id = kwargs.get('document_id')
+        self.organization_id = kwargs.get('organization_id')
+        self.signed_mask = kwargs.get('signed_mask')
+        self.complete = kwargs.get('complete')
+
+
 class Signature(Base):
-    signature_id = Column(Integer, primary_key=True)
+    __id_strategy__ = TimeOrdered()
+
+    signature_id = Column(Integer("BIGINT"), primary_key=True)
     hash = Column(String(255), nullable=False)
-    timestamp = Column(String("DATETIME"), nullable=False)
+    timestamp = Column(DateTime(), nullable=False)
     digital_certificate_id = Column(Integer, foreign_key=True)
     user_id = Column(Integer, foreign_key=True)
     document_id = Column(Integer, foreign_key=True)
@@ -110,8 +162,8 @@ class Signature(Base):
 class DigitalCertificate(Base):
     digital_certificate_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, foreign_key=True)
-    issue_date = Column(String("DATE"))
-    expiration_date = Column(String("DATE"))
+    issue_date = Column(Date())
+    expiration_date = Column(Date())
     fingerprint = Column(String(255))
 
     def __init__(self, **kwargs):
@@ -126,11 +178,11 @@ class DigitalCertificate(Base):
 class Session(Base):
     session_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, foreign_key=True)
-    start_time = Column(String("DATETIME"))
-    end_time = Column(String("DATETIME"))
+    start_time = Column(DateTime())
+    end_time = Column(DateTime())
     ip_address = Column(String(255))
     failedAttempts = Column(Integer)
-    lockedUntil = Column(String("DATETIME"))
+    lockedUntil = Column(DateTime())
     result = Column(String(50))
 
     def __init__(self, **kwargs):
@@ -146,11 +198,14 @@ class Session(Base):
 
 
 class AuditLog(Base):
-    audit_log_id = Column(Integer, primary_key=True)
+    __partition__ = RangePartitioning("timestamp")
+    __id_strategy__ = TimeOrdered()
+
+    audit_log_id = Column(Integer("BIGINT"), primary_key=True)
     user_id = Column(Integer, foreign_key=True)
-    verification_event_id = Column(Integer, foreign_key=True)
+    verification_event_id = Column(Integer("BIGINT"), foreign_key=True)
     action = Column(String(255))
-    timestamp = Column(String("DATETIME"))
+    timestamp = Column(DateTime())
     result = Column(String(50))
     method = Column(String(100))
     ip = Column(String(255))
@@ -167,13 +222,32 @@ class AuditLog(Base):
         self.ip = kwargs.get('ip')
 
 
+class AuditLogRollup(Base):
+    summary_month = Column(Date(), primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    action = Column(String(255), primary_key=True)
+    result = Column(String(50), primary_key=True)
+    action_count = Column(Integer, nullable=False)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.summary_month = kwargs.get('summary_month')
+        self.user_id = kwargs.get('user_id')
+        self.action = kwargs.get('action')
+        self.result = kwargs.get('result')
+        self.action_count = kwargs.get('action_count')
+
+
 class VerificationEvent(Base):
-    verification_event_id = Column(Integer, primary_key=True)
+    __partition__ = RangePartitioning("timestamp")
+    __id_strategy__ = TimeOrdered()
+
+    verification_event_id = Column(Integer("BIGINT"), primary_key=True)
     user_id = Column(Integer, foreign_key=True)
     document_id = Column(Integer, foreign_key=True)
-    timestamp = Column(String("DATETIME"))
+    timestamp = Column(DateTime())
     result = Column(String(50))
-    audit_log_id = Column(Integer, foreign_key=True)
+    audit_log_id = Column(Integer("BIGINT"), foreign_key=True)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -190,7 +264,7 @@ class HashRecord(Base):
     document_id = Column(Integer, foreign_key=True)
     hash_value = Column(String(255))
     algorithm = Column(String(50))
-    created_at = Column(String("DATETIME"))
+    created_at = Column(DateTime())
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -205,7 +279,7 @@ class Notification(Base):
     notification_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, foreign_key=True)
     document_id = Column(Integer, foreign_key=True)
-    timestamp = Column(String("DATETIME"))
+    timestamp = Column(DateTime())
     type = Column(String(50))
     content = Column(String(255))
     read_unread = Column(Boolean)
@@ -225,8 +299,8 @@ class AccessControlEntry(Base):
     user_id = Column(Integer, primary_key=True)
     document_id = Column(Integer, primary_key=True)
     access_type = Column(String(50))  # read/write/revoke
-    granted_at = Column(String("DATETIME"))
-    expires_at = Column(String("DATETIME"))
+    granted_at = Column(DateTime())
+    expires_at = Column(DateTime())
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -237,12 +311,40 @@ class AccessControlEntry(Base):
         self.expires_at = kwargs.get('expires_at')
 
 
+class AccessRevocationLog(Base):
+    user_id = Column(Integer)
+    document_id = Column(Integer)
+    access_type = Column(String(50))
+    revoked_at = Column(DateTime())
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.user_id = kwargs.get('user_id')
+        self.document_id = kwargs.get('document_id')
+        self.access_type = kwargs.get('access_type')
+        self.revoked_at = kwargs.get('revoked_at')
+
+
+class CertificateExpiryScan(Base):
+    scanner = Column(String(50), primary_key=True)
+    covered_until = Column(Date(), primary_key=True)
+    scanned_at = Column(DateTime())
+    certificate_count = Column(Integer)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.scanner = kwargs.get('scanner')
+        self.covered_until = kwargs.get('covered_until')
+        self.scanned_at = kwargs.get('scanned_at')
+        self.certificate_count = kwargs.get('certificate_count')
+
+
 class PublicKey(Base):
     public_key_id = Column(Integer, primary_key=True)
     digital_certificate_id = Column(Integer, foreign_key=True)
     key_material = Column(String(255))
     format = Column(String(50))
-    last_used = Column(String("DATETIME"))
+    last_used = Column(DateTime())
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -257,7 +359,7 @@ class PrivateKey(Base):
     private_key_id = Column(Integer, primary_key=True)
     digital_certificate_id = Column(Integer, foreign_key=True)
     key_material = Column(String(255))
-    rotation_date = Column(String("DATETIME"))
+    rotation_date = Column(DateTime())
     mfa_bound = Column(Boolean)
 
     def __init__(self, **kwargs):
@@ -272,8 +374,8 @@ class PrivateKey(Base):
 class SignatureRevocation(Base):
     revocation_id = Column(Integer, primary_key=True)
     reason = Column(String(255))
-    revoked_at = Column(String("DATETIME"))
-    signature_id = Column(Integer, foreign_key=True)
+    revoked_at = Column(DateTime())
+    signature_id = Column(Integer("BIGINT"), foreign_key=True)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -0,0 +1,282 @@
+# aio.py
+#
+# This file implements the asyncio counterparts of the `Base` read and write methods, so an
+# asyncio service can `await` the ORM instead of running every call in a thread pool:
+#
+#   - `Model.aget(table, id)`, `Model.aget_all()`, `Model.aquery(**filters)`
+#   - `instance.asave()`, `Model.abulk_save(instances)`, `Base.aflush(instances)`
+#   - `async for instance in Model.astream(**filters)`, which reads rows in chunks from a
+#     server-side cursor
+#
+# They use the same models and `Column` definitions and build their SQL with the same private
+# builders as the blocking methods (`_get_sql`, `_query_sql`, `_insert_sql`, ...), so both APIs
+# always issue the same statements. Results go through `_from_row` and the query cache, and writes
+# fire the same listeners.
+#
+# Connections come from `aiomysql` pools, one pool per event loop and server. A pool is bound to
+# the loop that created it, so each loop (for example one per test) gets its own. Pool connections
+# run in autocommit mode, and writes open an explicit transaction.
+# Replica routing and read-your-writes stickiness follow `orm/dbconnectors.py`. The stickiness
+# window is tracked per asyncio task.
+#
+# `aiomysql` is an optional dependency, imported on first use. Pool sizes come from
+# `DB_POOL_MIN_SIZE` (default 1) and `DB_POOL_MAX_SIZE` (default 10) per server.
+#
+# Listeners are plain functions and run on the event loop, so a listener that does blocking I/O
+# (such as `AuditRollups`) will block the loop while it runs.
+#
+# Client-side ID strategies (`Sequence`, `TimeOrdered`; see `orm/ids.py`) assign keys in the
+# loop's default executor, not on the loop. They still use the blocking `mysql.connector` driver
+# for their own queries: a `Sequence` block allocation, and on first use the BIGINT check and
+# node id lease of `TimeOrdered`. So `mysql.connector` must be installed for those models.
+#
+# Example usage:
+#
+#   async def verify(signature_id):
+#       signature = await Signature.aget("signature", signature_id)
+#       await VerificationEvent(signature_id=signature_id, result="success").asave()
+#
+#   async for event in VerificationEvent.astream(result="failure"):
+#       ...
+#
+#   await close_pools()   # before the event loop shuts down
+
+import asyncio
+import os
+import weakref
+from contextlib import asynccontextmanager
+
+from orm.cache import query_cache
+from orm.dbconnectors import MySQL, _endpoint, _get_router
+
+
+# The `aiomysql` module, set by `_load_driver()`.
+_driver = None
+
+# Event loop -> {endpoint: task creating or holding that endpoint's pool}.
+_pools = weakref.WeakKeyDictionary()
+
+
+def _load_driver():
+    """Import `aiomysql` and load `.env` the first time an async connection is needed."""
+    global _driver
+    if _driver is None:
+        try:
+            import aiomysql
+        except ImportError:
+            raise ImportError("The async ORM API requires the aiomysql package (pip install aiomysql)")
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _driver = aiomysql
+    return _driver
+
+
+class AsyncMySQL:
+    @asynccontextmanager
+    async def connect(self, read=False):
+        """Borrow a pooled connection for the duration of the `async with` block.
+
+        With `read=True` the connection comes from a replica's pool when one is configured,
+        available, and the current task has not written within the stickiness window.
+        """
+        driver = _load_driver()
+        if read and not MySQL._is_sticky():
+            router = _get_router()
+            for replica in router.candidates():
+                try:
+                    pool = await self._pool(replica)
+                    conn = await pool.acquire()
+                except (driver.Error, OSError) as e:
+                    print(f"[ERROR] Replica {replica[0]}:{replica[1]} unavailable, ejecting: {e}")
+                    router.eject(replica)
+                    continue
+                try:
+                    yield conn
+                finally:
+                    pool.release(conn)
+                return
+
+        pool = await self._pool(_endpoint(os.getenv("DB_HOST", "localhost")))
+        if not read:
+            MySQL.mark_write()
+        async with pool.acquire() as conn:
+            yield conn
+
+    async def _pool(self, endpoint):
+        pools = _pools.setdefault(asyncio.get_running_loop(), {})
+        task = pools.get(endpoint)
+        if task is None:
+            task = pools[endpoint] = asyncio.ensure_future(self._create_pool(endpoint))
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if pools.get(endpoint) is task:
+                del pools[endpoint]
+            raise
+
+    async def _create_pool(self, endpoint):
+        host, port = endpoint
+        return await _load_driver().create_pool(
+            host=host,
+            port=port,
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            db=os.getenv("DB_NAME"),
+            minsize=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+            maxsize=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            autocommit=True,
+        )
+
+
+async def close_pools():
+    """Close every pool created on the running event loop."""
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for task in pools.values():
+        try:
+            pool = await task
+        except Exception:
+            continue
+        pool.close()
+        await pool.wait_closed()
+
+
+async def _select_rows(model, sql, values, tables):
+    """Async version of `Base._select_rows()`, sharing its query cache."""
+    key = (sql, tuple(values)) if getattr(model, "__cache__", False) else None
+    if key is not None:
+        rows = query_cache.get(key)
+        if rows is not None:
+            return [dict(row) for row in rows]
+        versions = query_cache.snapshot(tables)
+
+    async with AsyncMySQL().connect(read=True) as conn:
+        async with conn.cursor(_load_driver().DictCursor) as cursor:
+            await cursor.execute(sql, values)
+            rows = await cursor.fetchall()
+
+    if key is not None:
+        query_cache.put(key, tables, versions, [dict(row) for row in rows])
+    return rows
+
+
+async def _write(statements):
+    """Run `statements` in one transaction on the primary. Returns the last cursor's `lastrowid`."""
+    async with AsyncMySQL().connect() as conn:
+        await conn.begin()
+        try:
+            async with conn.cursor() as cursor:
+                for sql, values in statements:
+                    await cursor.execute(sql, values)
+                lastrowid = cursor.lastrowid
+            await conn.commit()
+            MySQL.mark_write()
+            return lastrowid
+        except BaseException:
+            await conn.rollback()
+            raise
+
+
+async def _assign_ids(model, instances):
+    """`model._assign_ids()`, run in the default executor if the strategy may query the server."""
+    if model.__id_strategy__.client_side:
+        await asyncio.get_running_loop().run_in_executor(None, model._assign_ids, instances)
+    else:
+        model._assign_ids(instances)
+
+
+async def aget(model, table, id, projection=None):
+    try:
+        sql, values = model._get_sql(table, id, projection)
+        rows = await _select_rows(model, sql, values, [table])
+        return model._from_row(rows[0], projection) if rows else None
+    except Exception as e:
+        print(f"[ERROR] Failed to get {table} by id: {e}")
+        return None
+
+
+async def aget_all(model, table=None, projection=None):
+    table = table or model.__name__.lower()
+    try:
+        select = projection.select_list() if projection else "*"
+        rows = await _select_rows(model, f"SELECT {select} FROM {model._read_table(table)}", (), [table])
+        return [model._from_row(row, projection) for row in rows]
+    except Exception as e:
+        print(f"[ERROR] failed to get all from {table}: {e}")
+        return []
+
+
+async def aquery(model, filters, projection=None):
+    try:
+        sql, values = model._query_sql(filters, projection)
+        rows = await _select_rows(model, sql, values, [model.__name__.lower()])
+        return [model._from_row(row, projection) for row in rows]
+    except Exception as e:
+        print(f"[ERROR] Query failed: {e}")
+        return []
+
+
+async def astream(model, filters, chunk_size=1000, projection=None):
+    """Yield instances matching `filters`, fetching `chunk_size` rows at a time."""
+    sql, values = model._query_sql(filters, projection)
+    try:
+        async with AsyncMySQL().connect(read=True) as conn:
+            async with conn.cursor(_load_driver().SSDictCursor) as cursor:
+                await cursor.execute(sql, values)
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield model._from_row(row, projection)
+    except Exception as e:
+        print(f"[ERROR] Streaming query failed: {e}")
+
+
+async def asave(instance):
+    if instance._is_persisted():
+        statement = instance._update_sql()
+        if statement is None:
+            print("[ERROR] Cannot update: Primary key is missing")
+            return
+        try:
+            await _write([statement])
+            instance._emit("update", instance)
+        except Exception as e:
+            print(f"[ERROR] Update failed: {e}")
+        return
+
+    try:
+        await _assign_ids(type(instance), [instance])
+        lastrowid = await _write([instance._insert_sql()])
+        instance._after_insert(lastrowid)
+        instance._emit("insert", instance)
+    except Exception as e:
+        print(f"[ERROR] Insert failed: {e}")
+
+
+async def abulk_save(model, instances, chunk_size=1000):
+    instances = list(instances)
+    if not instances:
+        return 0
+    return await aflush([(model, instances)], chunk_size)
+
+
+async def aflush(groups, chunk_size=1000):
+    """Insert `[(model, instances)]` in one transaction, as `Base._flush()` does."""
+    if not groups:
+        return 0
+    tables = ", ".join(model.__name__.lower() for model, _ in groups)
+    try:
+        for model, instances in groups:
+            await _assign_ids(model, instances)
+        await _write([statement for model, instances in groups
+                      for statement in model._bulk_insert_sql(instances, chunk_size)])
+        for model, instances in groups:
+            for instance in instances:
+                instance._persisted = True
+            model._emit("bulk_insert", instances)
+        return sum(len(instances) for _, instances in groups)
+    except Exception as e:
+        print(f"[ERROR] Bulk insert into {tables} failed: {e}")
+        return 0
@@ -5,6 +5,13 @@
 #   - `save()`: Insert or update the current model instance in the database.
 #   - `_insert()`: Insert the current instance into the database (private method).
 #   - `_update()`: Update the current instance in the database (private method).
+#   - `bulk_save()`: Insert many new instances with multi-row INSERT statements.
+#   - `flush()`: Insert new instances of several models in one transaction.
+#   - `new_id()`: Allocate a primary key before insert, for models with a client-side ID strategy.
+#   - `load_file()`: Bulk-load a CSV or JSONL file into the model's table.
+#   - `export()`: Stream the model's table to a JSONL, CSV or Parquet file.
+#   - `fetch_columns()`: Read columns into typed arrays for analytics instead of model instances.
+#   - `query_range()`: Query a time range, touching only the partitions it overlaps.
 #   - `get()`: Retrieve a record by its ID.
 #   - `delete()`: Delete a record by its ID.
 #   - `get_all()`: Retrieve all records of the model from the database.
@@ -12,9 +19,23 @@
 #   - `create_table()`: Create a table in the database based on the model's schema.
 #   - `create_schema()`: Generate the schema for the model in the database.
 #   - `join()`: Join multiple models together for data retrieval.
+#   - `join_builder()`: Join any number of models with aliased columns and typed results.
+#   - `aggregate()`: Run COUNT/SUM/MIN/MAX aggregations in the database, optionally grouped.
+#   - `only()` / `defer()`: Select only some columns; the rest load on first access.
+#   - `load_deferred()`: Load deferred columns for many instances in one batched query.
 #   - `where()`: Add WHERE conditions to queries.
 #   - `having()`: Add HAVING conditions to queries.
 #   - `group_by()`: Add GROUP BY clauses to queries.
+#   - `listen()`: Register a callback fired after a successful write to the model's table.
+#   - `aget()`, `aget_all()`, `aquery()`, `asave()`, `abulk_save()`, `aflush()`, `astream()`:
+#     asyncio versions of the methods above, backed by an async connection pool (see `orm/aio.py`).
+#
+# Reads (`get`, `get_all`, `query`, `join`, `aggregate`) open connections with `read=True`, so they
+# are served by a read replica when one is configured (see `orm/dbconnectors.py`). Writes always go
+# to the primary.
+#
+# Models that set `__cache__ = True` serve those reads from an in-process result cache that is
+# invalidated per table by every write made through the ORM (see `orm/cache.py`).
 #
 # Connection management is critical. Every method interacting with the database must:
 #   - Open a new connection and cursor at the start of the operation.
@@ -43,6 +64,9 @@
 #   query = f"SELECT * FROM users {where_condition}"
 #   print(query)  # Output: SELECT * FROM users WHERE name = 'Alice' AND age = 25
 #
+#   # Example of a range query, run in the database so an index on `expires_at` can be used:
+#   expired = AccessControlEntry.query(expires_at__lt=datetime.now())
+#
 #   # Example of using GROUP BY:
 #   group_by_condition = User.group_by('name')
 #   query = f"SELECT name, COUNT(*) FROM users {group_by_condition} HAVING COUNT(*) > 5"
@@ -53,15 +77,91 @@
 #   query = f"SELECT * FROM users {having_condition}"
 #   print(query)  # Output: SELECT * FROM users HAVING COUNT(orders) > 5
 #
+#   # Example of running an aggregation in the database:
+#   rows = VerificationEvent.aggregate(group_by=["result"], count="*", having={"count": (">", 5)})
+#   for row in rows:
+#       print(row.result, row.count)
+#
 # The `Base` class is meant to be subclassed, and any model that extends `Base` will automatically
 # inherit the methods for database interaction.
 
 
+from collections import namedtuple
+from functools import lru_cache
+
+from orm.cache import query_cache
 from orm.dbconnectors import MySQL
 from orm.columns import Column
+from orm.ids import AUTO_INCREMENT
+from orm.projection import Projection
+
+
+# Write listeners keyed by (model class, event name). Services that keep derived state in
+# memory (indexes, counters, caches) register here to stay in sync with the ORM's writes.
+_listeners = {}
+
+AGGREGATES = ("count", "sum", "min", "max")
+
+# Lookup suffixes accepted by `where()` and `query()`, e.g. `expires_at__lt=now`. A key without a
+# suffix is an equality test. `__between` takes a `(low, high)` pair and is inclusive.
+LOOKUPS = {
+    None: "= %s",
+    "lt": "< %s",
+    "lte": "<= %s",
+    "gt": "> %s",
+    "gte": ">= %s",
+    "between": "BETWEEN %s AND %s",
+}
+
+
+def _split_lookup(key):
+    """Split a filter key such as `timestamp__gte` into its column and lookup (None for equality).
+
+    Raises ValueError for an unknown lookup such as `timestamp__since`.
+    """
+    column, separator, lookup = key.rpartition("__")
+    if not separator:
+        return key, None
+    if lookup not in LOOKUPS:
+        raise ValueError(f"Unknown lookup {lookup!r} in {key!r}; expected one of "
+                         f"{', '.join(name for name in LOOKUPS if name)}")
+    return column, lookup
+
+
+def _lookup_values(conditions):
+    """Return the query parameters for `conditions`, in the order `where()` places them."""
+    values = []
+    for key, value in conditions.items():
+        if _split_lookup(key)[1] == "between":
+            low, high = value
+            values += [low, high]
+        else:
+            values.append(value)
+    return values
+
+
+@lru_cache(maxsize=None)
+def _decoders(model):
+    """Return `(column, to_python)` pairs for the model's columns whose type has a codec."""
+    decoders = []
+    for name, column in model.__dict__.items():
+        if isinstance(column, Column):
+            column_type = column.type() if isinstance(column.type, type) else column.type
+            if hasattr(column_type, "to_python"):
+                decoders.append((name, column_type.to_python))
+    return tuple(decoders)
+
+
+@lru_cache(maxsize=256)
+def _row_type(fields):
+    """Return a namedtuple class for a result shape, reused across queries with the same fields."""
+    return namedtuple("Row", fields)
 
 
 class Base:
+    # How new rows get their primary key; see `orm/ids.py`.
+    __id_strategy__ = AUTO_INCREMENT
+
     def __init__(self, **kwargs):
         """Initialize model instance with attributes."""
         self._db = MySQL()
@@ -71,17 +171,26 @@ class Base:
     def save(self):
         """Insert or update the record in the database.
 
+        Instances read from the database, or already inserted, are updated. Others are inserted,
+        with a primary key from the model's `__id_strategy__` (see `orm/ids.py`).
+
         TODO:
             - If the model instance has an `id`, call `_update()` to update the existing record.
             - Otherwise, call `_insert()` to insert the new record.
             - Ensure connection and cursor management is handled properly (open and close as needed).
         """
 
-        if hasattr(self, "id") and getattr(self, "id") is not None:
+        if self._is_persisted():
             self._update()
         else:
             self._insert()
 
+    def _is_persisted(self):
+        """Return True if `save()` should update an existing row rather than insert a new one."""
+        if self.__dict__.get("_persisted"):
+            return True
+        return hasattr(self, "id") and getattr(self, "id") is not None
+
     def _insert(self):
         """Insert the current instance into the database.
 
@@ -91,30 +200,17 @@ class Base:
             - Ensure the connection and cursor are properly closed after the operation, even if an error occurs.
             - Commit the transaction if successful; rollback if there's an error.
         """
-        table = self.__class__.__name__.lower()
-        columns = []
-        values = []
-        placeholders = []
-
-        for attr, value in self.__dict__.items():
-            if attr.startswith("_") or callable(value) or isinstance(value, (list, dict)):
-                continue
-            columns.append(attr)
-            values.append(value)
-            placeholders.append("%s")
-
-        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
-
         conn = self._db.connect()
         cursor = conn.cursor()
 
         try:
-            cursor.execute(sql, values)
+            type(self)._assign_ids([self])
+            cursor.execute(*self._insert_sql())
             conn.commit()
+            MySQL.mark_write()
 
-            for attr in self.__dict__:
-                if attr.endswith("_id") and getattr(self, attr) is None:
-                    setattr(self, attr, cursor.lastrowid)
+            self._after_insert(cursor.lastrowid)
+            self._emit("insert", self)
         except Exception as e:
             print(f"[ERROR] Insert failed: {e}")
             conn.rollback()
@@ -122,6 +218,32 @@ class Base:
             cursor.close()
             conn.close()
 
+    def _insert_sql(self):
+        """Return the `INSERT` statement and parameters for this instance."""
+        fields = self._fields()
+        columns = list(fields)
+        placeholders = ["%s"] * len(columns)
+        sql = f"INSERT INTO {self._write_table()} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
+        return sql, list(fields.values())
+
+    def _after_insert(self, lastrowid):
+        type(self).__id_strategy__.after_insert(self, lastrowid)
+        self._persisted = True
+
+    @classmethod
+    def _assign_ids(cls, instances):
+        """Give instances without a primary key one from the model's ID strategy."""
+        cls.__id_strategy__.assign(cls, instances)
+
+    @classmethod
+    def new_id(cls):
+        """Return a new primary key value from the model's client-side ID strategy.
+
+        Use it to know a row's key before inserting it, for example to reference it from related
+        rows written in the same `Base.flush()`.
+        """
+        return cls.__id_strategy__.new_id(cls)
+
     def _update(self):
         """Update the current instance in the database.
 
@@ -131,35 +253,19 @@ class Base:
             - Ensure the connection and cursor are properly closed after the operation, even if an error occurs.
             - Commit the transaction if successful; rollback if there's an error.
         """
-        table = self.__class__.__name__.lower()
-        updates = []
-        values = []
-        pk = None
-        pk_column = None
-
-        for attr, value in self.__dict__.items():
-            if attr.startswith("_") or callable(value) or isinstance(value, (list, dict)):
-                continue
-            if attr.endswith("_id") and pk is None:
-                pk = value
-                pk_column = attr
-                continue
-            updates.append(f"{attr} = %s")
-            values.append(value)
-
-        if not pk or not pk_column:
+        statement = self._update_sql()
+        if statement is None:
             print("[ERROR] Cannot update: Primary key is missing")
             return
 
-        values.append(pk)
-        sql = f"UPDATE {table} SET {', '.join(updates)} WHERE {pk_column} = %s"
-
         conn = self._db.connect()
         cursor = conn.cursor()
 
         try:
-            cursor.execute(sql, values)
+            cursor.execute(*statement)
             conn.commit()
+            MySQL.mark_write()
+            self._emit("update", self)
         except Exception as e:
             print(f"[ERROR] Update failed: {e}")
             conn.rollback()
@@ -167,6 +273,336 @@ class Base:
             cursor.close()
             conn.close()
 
+    def _update_sql(self):
+        """Return the `UPDATE` statement and parameters for this instance, or None without a key."""
+        fields = self._fields()
+        pk_columns = type(self)._primary_keys()
+        if not pk_columns:
+            # Models without declared keys: the first `*_id` attribute identifies the row.
+            pk_columns = [attr for attr in fields if attr.endswith("_id")][:1]
+        if not pk_columns or any(fields.get(col) is None for col in pk_columns):
+            return None
+
+        updates = [f"{attr} = %s" for attr in fields if attr not in pk_columns]
+        values = [value for attr, value in fields.items() if attr not in pk_columns]
+        values += [fields[col] for col in pk_columns]
+        condition = " AND ".join(f"{col} = %s" for col in pk_columns)
+        return f"UPDATE {self._write_table()} SET {', '.join(updates)} WHERE {condition}", values
+
+    @classmethod
+    def bulk_save(cls, instances, chunk_size=1000):
+        """Insert many new instances of this model in a single transaction.
+
+        Rows are sent as multi-row `INSERT` statements of up to `chunk_size` rows each, and every
+        instance must have the same set of attributes. Returns the number of rows inserted.
+        Models with a client-side `__id_strategy__` get their keys assigned first. Auto-increment
+        keys are not read back into the instances.
+        """
+        instances = list(instances)
+        if not instances:
+            return 0
+        return Base._flush([(cls, instances)], chunk_size)
+
+    @staticmethod
+    def flush(instances, chunk_size=1000):
+        """Insert new instances of any models in a single transaction.
+
+        Instances are grouped by model and each model's rows are written as in `bulk_save()`, in
+        the order each model first appears in `instances`. List parent rows before the rows that
+        reference them. Returns the number of rows inserted.
+        """
+        groups = Base._groups(instances)
+        if not groups:
+            return 0
+        return Base._flush(groups, chunk_size)
+
+    @staticmethod
+    def _groups(instances):
+        """Return `[(model, instances)]` in the order each model first appears in `instances`."""
+        groups = {}
+        for instance in instances:
+            groups.setdefault(type(instance), []).append(instance)
+        return list(groups.items())
+
+    @staticmethod
+    def _flush(groups, chunk_size):
+        tables = ", ".join(model.__name__.lower() for model, _ in groups)
+
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            for model, instances in groups:
+                model._assign_ids(instances)
+            for model, instances in groups:
+                for sql, values in model._bulk_insert_sql(instances, chunk_size):
+                    cursor.execute(sql, values)
+            conn.commit()
+            MySQL.mark_write()
+            for model, instances in groups:
+                for instance in instances:
+                    instance._persisted = True
+                model._emit("bulk_insert", instances)
+            return sum(len(instances) for _, instances in groups)
+        except Exception as e:
+            print(f"[ERROR] Bulk insert into {tables} failed: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    @classmethod
+    def _bulk_insert_sql(cls, instances, chunk_size):
+        """Yield multi-row `INSERT` statements of up to `chunk_size` rows, grouped by target table."""
+        columns = list(instances[0]._fields())
+        row_sql = f"({', '.join(['%s'] * len(columns))})"
+
+        by_table = {}
+        for instance in instances:
+            by_table.setdefault(instance._write_table(), []).append(instance)
+        for target, rows in by_table.items():
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                sql = f"INSERT INTO {target} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))}"
+                yield sql, [getattr(instance, col) for instance in chunk for col in columns]
+
+    @classmethod
+    def only(cls, *columns):
+        """Return a projection of this model that selects only `columns` (plus the primary key)."""
+        return Projection(cls, columns)
+
+    @classmethod
+    def defer(cls, *columns):
+        """Return a projection of this model that selects every column except `columns`."""
+        return Projection(cls, [col for col in cls._columns() if col not in columns])
+
+    @classmethod
+    def load_deferred(cls, instances, *columns, chunk_size=1000):
+        """Load deferred columns for many instances, one query per `chunk_size` instances.
+
+        Loads `columns`, or every deferred column if none are given. Values assigned to an
+        instance since it was loaded are kept.
+        """
+        pending = [instance for instance in instances if instance.__dict__.get("_deferred")]
+        if not pending:
+            return
+        columns = list(columns) or [col for col in cls._columns()
+                                    if any(col in instance._deferred for instance in pending)]
+        pk_columns = cls._primary_keys()
+        table = cls.__name__.lower()
+        key_sql = f"({', '.join(['%s'] * len(pk_columns))})"
+
+        conn = MySQL().connect(read=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            for start in range(0, len(pending), chunk_size):
+                by_key = {}
+                for instance in pending[start:start + chunk_size]:
+                    key = tuple(instance.__dict__[col] for col in pk_columns)
+                    by_key.setdefault(key, []).append(instance)
+
+                sql = (f"SELECT {', '.join(pk_columns + columns)} FROM {cls._read_table(table)} "
+                       f"WHERE ({', '.join(pk_columns)}) IN ({', '.join([key_sql] * len(by_key))})")
+                cursor.execute(sql, [value for key in by_key for value in key])
+
+                loaded = {tuple(row[col] for col in pk_columns): row for row in cursor.fetchall()}
+                for key, group in by_key.items():
+                    row = loaded.get(key, {})
+                    for instance in group:
+                        for col in columns:
+                            if col in instance._deferred:
+                                instance.__dict__.setdefault(col, row.get(col))
+                                instance._deferred.discard(col)
+        except Exception as e:
+            print(f"[ERROR] Failed to load deferred columns from {table}: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _load_deferred(self, name):
+        type(self).load_deferred([self], name)
+        return self.__dict__.get(name)
+
+    @classmethod
+    def _from_row(cls, row, projection=None):
+        """Build an instance from a result row, marking columns outside `projection` as deferred.
+
+        Values of `Date` and `DateTime` columns are converted to `date` and `datetime` objects.
+        """
+        for col, to_python in _decoders(cls):
+            if col in row:
+                row[col] = to_python(row[col])
+        instance = cls(**row)
+        instance._persisted = True
+        if projection and projection.deferred:
+            for col in projection.deferred:
+                instance.__dict__.pop(col, None)
+            instance._deferred = set(projection.deferred)
+        return instance
+
+    @classmethod
+    def load_file(cls, path, format="csv", chunk_size=2000, local_infile=True):
+        """Bulk-load a CSV or JSONL file into this model's table. See `orm/bulkload.py`.
+
+        Returns a dict with the number of rows loaded, elapsed seconds, rows/sec and the method
+        used ("load_data" or "insert"). Raises `BulkLoadError` if the load stops part way.
+        """
+        from orm.bulkload import load_file
+        return load_file(cls, path, format=format, chunk_size=chunk_size, local_infile=local_infile)
+
+    @classmethod
+    def export(cls, path, format="jsonl", where=None, chunk_size=10000, compression=None, checkpoint=None):
+        """Stream this model's table to a file in primary key order. See `orm/export.py`.
+
+        `where` is a dict of equality filters, as in `query()`. With a `checkpoint` path an
+        interrupted export resumes after the last exported key. Returns a dict with the output
+        path, rows written and last key. Raises if the export stops before the end of the table.
+        """
+        from orm.export import export
+        return export(cls, path, format=format, where=where, chunk_size=chunk_size,
+                      compression=compression, checkpoint=checkpoint)
+
+    @classmethod
+    def fetch_columns(cls, columns=None, where=None, chunk_size=10000, numpy=False):
+        """Read `columns` of the rows matching `where` into per-column typed buffers.
+
+        Returns a `ColumnarResult` indexed by column name, or a dict of NumPy arrays if `numpy`
+        is True. See `orm/columnar.py`.
+        """
+        from orm.columnar import fetch_columns
+        return fetch_columns(cls, columns, where=where, chunk_size=chunk_size, numpy=numpy)
+
+    @classmethod
+    def query_range(cls, start=None, end=None, **filters):
+        """Query rows whose partition column (or `timestamp`) is in `[start, end)`.
+
+        For models that declare `__partition__`, only the partitions overlapping the range are
+        read. See `orm/partitions.py`.
+        """
+        from orm.partitions import query_range
+        return query_range(cls, start, end, filters)
+
+    async def asave(self):
+        """Async `save()`. See `orm/aio.py`."""
+        from orm import aio
+        await aio.asave(self)
+
+    @classmethod
+    async def abulk_save(cls, instances, chunk_size=1000):
+        """Async `bulk_save()`. Returns the number of rows inserted."""
+        from orm import aio
+        return await aio.abulk_save(cls, instances, chunk_size)
+
+    @staticmethod
+    async def aflush(instances, chunk_size=1000):
+        """Async `Base.flush()`. Returns the number of rows inserted."""
+        from orm import aio
+        return await aio.aflush(Base._groups(instances), chunk_size)
+
+    @classmethod
+    async def aget(cls, table, id):
+        """Async `get()`."""
+        from orm import aio
+        return await aio.aget(cls, table, id)
+
+    @classmethod
+    async def aget_all(cls, table=None):
+        """Async `get_all()`."""
+        from orm import aio
+        return await aio.aget_all(cls, table)
+
+    @classmethod
+    async def aquery(cls, **filters):
+        """Async `query()`."""
+        from orm import aio
+        return await aio.aquery(cls, filters)
+
+    @classmethod
+    def astream(cls, chunk_size=1000, **filters):
+        """Return an async iterator over the instances matching `filters`, read in chunks.
+
+        Example:
+            async for event in VerificationEvent.astream(result="failure"):
+                ...
+        """
+        from orm import aio
+        return aio.astream(cls, filters, chunk_size)
+
+    def _write_table(self):
+        """Return the table this instance is written to, which for monthly tables depends on its row."""
+        table = self.__class__.__name__.lower()
+        partitioning = getattr(type(self), "__partition__", None)
+        if partitioning is None:
+            return table
+        return partitioning.write_table(table, getattr(self, partitioning.column, None))
+
+    @classmethod
+    def _read_tables(cls, table=None):
+        """Return the tables holding this model's rows: its table, or its monthly tables."""
+        table = table or cls.__name__.lower()
+        partitioning = getattr(cls, "__partition__", None)
+        return partitioning.read_tables(table) if partitioning else [table]
+
+    @classmethod
+    def _read_table(cls, table=None, alias=None):
+        """Return the FROM target for reads. Monthly tables are combined with UNION ALL."""
+        table = table or cls.__name__.lower()
+        tables = cls._read_tables(table)
+        if tables == [table]:
+            return f"{table} AS {alias}" if alias else table
+        union = " UNION ALL ".join(f"SELECT * FROM {name}" for name in tables)
+        return f"({union}) AS {alias or table}"
+
+    def _fields(self):
+        """Return the instance attributes that map to table columns, in assignment order."""
+        return {attr: value for attr, value in self.__dict__.items()
+                if not (attr.startswith("_") or callable(value) or isinstance(value, (list, dict)))}
+
+    @classmethod
+    def _columns(cls):
+        """Return the names of the model's `Column` attributes, in declaration order."""
+        return [attr for attr, value in cls.__dict__.items() if isinstance(value, Column)]
+
+    @classmethod
+    def _primary_keys(cls):
+        """Return the names of the columns declared with `primary_key=True`, in declaration order."""
+        return [attr for attr, value in cls.__dict__.items()
+                if isinstance(value, Column) and value.primary_key]
+
+    @classmethod
+    def _pk_condition(cls, id):
+        """Pair the model's primary key columns with `id`, which is a tuple for composite keys."""
+        pk_columns = cls._primary_keys() or ["id"]
+        values = tuple(id) if isinstance(id, (tuple, list)) else (id,)
+        if len(values) != len(pk_columns):
+            raise ValueError(f"Expected {len(pk_columns)} key value(s) for {', '.join(pk_columns)}")
+        return pk_columns, values
+
+    @classmethod
+    def listen(cls, event, callback):
+        """Register `callback` to run after a successful write on this model.
+
+        `event` is one of:
+            - "insert" or "update": called with the saved instance.
+            - "save": shorthand for both "insert" and "update".
+            - "bulk_insert": called with the list of instances passed to `bulk_save()`.
+            - "bulk_load": called with the statistics dict returned by `load_file()`.
+            - "delete": called with a dict of the deleted row's primary key values.
+        """
+        for name in (("insert", "update") if event == "save" else (event,)):
+            _listeners.setdefault((cls, name), []).append(callback)
+
+    @classmethod
+    def _emit(cls, event, payload):
+        query_cache.invalidate(cls.__name__.lower())
+        for callback in _listeners.get((cls, event), ()):
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"[ERROR] {event} listener on {cls.__name__} failed: {e}")
+
     @classmethod
     def get(cls, table, id):
         """Retrieve a record from the database by its ID.
@@ -177,23 +613,26 @@ class Base:
             - Ensure the connection and cursor are properly closed after the operation.
             - Handle potential exceptions using `try`, `except`, and `finally` blocks.
         """
-        conn = MySQL().connect()
-        cursor = conn.cursor(dictionary=True)
+        return cls._get(table, id)
 
+    @classmethod
+    def _get(cls, table, id, projection=None):
         try:
-            pk = "user_id" if table == "user" else "id"
-            query = f"SELECT * FROM {table} WHERE {pk} = %s"
-            cursor.execute(query, (id,))
-            result = cursor.fetchone()
-            return cls(**result) if result else None
+            query, values = cls._get_sql(table, id, projection)
+            rows = cls._select_rows(query, values, [table])
+            return cls._from_row(rows[0], projection) if rows else None
         except Exception as e:
             print(f"[ERROR] Failed to get {table} by id: {e}")
             return None
-        finally:
-            cursor.close()
-            conn.close()
 
 
+    @classmethod
+    def _get_sql(cls, table, id, projection=None):
+        pk_columns, values = cls._pk_condition(id)
+        condition = " AND ".join(f"{col} = %s" for col in pk_columns)
+        select = projection.select_list() if projection else "*"
+        return f"SELECT {select} FROM {cls._read_table(table)} WHERE {condition}", values
+
     @classmethod
     def delete(cls, table, id):
         """Delete a record from the database by its ID.
@@ -208,11 +647,14 @@ class Base:
         cursor = conn.cursor()
 
         try:
-            pk_column = "user_id" if table == "user" else "id"
-            query = f"DELETE FROM {table} WHERE {pk_column} = %s"
-            cursor.execute(query, (id,))
+            pk_columns, values = cls._pk_condition(id)
+            condition = " AND ".join(f"{col} = %s" for col in pk_columns)
+            for target in cls._read_tables(table):
+                cursor.execute(f"DELETE FROM {target} WHERE {condition}", values)
             conn.commit()
-            print(f"[INFO] Record with {pk_column}={id} deleted from {table}")
+            MySQL.mark_write()
+            cls._emit("delete", dict(zip(pk_columns, values)))
+            print(f"[INFO] Record with {', '.join(pk_columns)}={id} deleted from {table}")
         except Exception as e:
             print(f"[ERROR] Failed to delete from {table}: {e}")
             conn.rollback()
@@ -230,49 +672,81 @@ class Base:
             - Ensure the connection and cursor are properly closed after the operation.
             - Return the results as instances of the model.
         """
+        return cls._get_all(table)
+
+    @classmethod
+    def _get_all(cls, table=None, projection=None):
         table = table or cls.__name__.lower()
-        conn = MySQL().connect()
-        cursor = conn.cursor(dictionary=True)
 
         try:
-            cursor.execute(f"SELECT * FROM {table}")
-            results = cursor.fetchall()
-            return [cls(**row) for row in results]
+            select = projection.select_list() if projection else "*"
+            results = cls._select_rows(f"SELECT {select} FROM {cls._read_table(table)}", (), [table])
+            return [cls._from_row(row, projection) for row in results]
         except Exception as e:
             print(f"[ERROR] failed to get all from {table}: {e}")
             return []
-        finally:
-            cursor.close()
-            conn.close()
 
     @classmethod
     def query(cls, **filters):
         """Query records based on filters.
 
+        Filters are column equality tests or range lookups such as `expires_at__lt=now` or
+        `timestamp__between=(start, end)`; see `where()`.
+
         TODO:
             - Open a connection and cursor.
             - Construct the `SELECT` SQL query using the provided filters as conditions.
             - Ensure the connection and cursor are properly closed after the operation.
             - Return the results as instances of the model.
         """
+        return cls._query(filters)
+
+    @classmethod
+    def _query(cls, filters, projection=None):
         table = cls.__name__.lower()
-        conn = MySQL().connect()
-        cursor = conn.cursor(dictionary=True)
 
         try:
-            where_clause = cls.where(**filters)
-            sql = f"SELECT * FROM {table} {where_clause}"
-            values = tuple(filters.values())
-            cursor.execute(sql, values)
-            rows = cursor.fetchall()
-            return [cls(**row) for row in rows]
+            sql, values = cls._query_sql(filters, projection)
+            rows = cls._select_rows(sql, values, [table])
+            return [cls._from_row(row, projection) for row in rows]
         except Exception as e:
             print(f"[ERROR] Query failed: {e}")
             return []
+
+    @classmethod
+    def _query_sql(cls, filters, projection=None):
+        select = projection.select_list() if projection else "*"
+        sql = f"SELECT {select} FROM {cls._read_table()} {cls.where(**filters)}"
+        return sql, tuple(_lookup_values(filters))
+
+    @classmethod
+    def _select_rows(cls, sql, values, tables):
+        """Run a read query and return its rows as dicts.
+
+        If the model sets `__cache__ = True`, results are served from and stored in `query_cache`,
+        keyed by the SQL and its parameters and invalidated by writes to any of `tables`.
+        """
+        key = (sql, tuple(values)) if getattr(cls, "__cache__", False) else None
+        if key is not None:
+            rows = query_cache.get(key)
+            if rows is not None:
+                return [dict(row) for row in rows]
+            versions = query_cache.snapshot(tables)
+
+        conn = MySQL().connect(read=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute(sql, values)
+            rows = cursor.fetchall()
         finally:
             cursor.close()
             conn.close()
 
+        if key is not None:
+            query_cache.put(key, tables, versions, [dict(row) for row in rows])
+        return rows
+
     @classmethod
     def create_table(cls, table_name, schema=None):
         """Create a table for an existing schema.
@@ -327,9 +801,20 @@ class Base:
             - Ensure the connection and cursor are properly closed after the operation.
             - Return the joined results.
         """
-        conn = MySQL().connect()
-        cursor = conn.cursor(dictionary=True)
+        return cls._join(join_model, on, where)
 
+    @classmethod
+    def join_builder(cls, alias=None):
+        """Start a multi-table join from this model. See `orm/joins.py`.
+
+        Example:
+            Signature.join_builder().join(DigitalCertificate, on="digital_certificate_id").all()
+        """
+        from orm.joins import JoinBuilder
+        return JoinBuilder(cls, alias)
+
+    @classmethod
+    def _join(cls, join_model, on=None, where=None, projection=None):
         try:
             table1 = cls.__name__.lower()
             table2 = join_model.__name__.lower()
@@ -338,19 +823,105 @@ class Base:
                 raise ValueError("Join must include a tuple of ON fields")
 
             on_clause = f"{on[0]} = {on[1]}"
-            sql = f"SELECT * FROM {table1} JOIN {table2} ON {on_clause}"
+            select = f"{projection.select_list(table1)}, {table2}.*" if projection else "*"
+            sql = f"SELECT {select} FROM {cls._read_table()} JOIN {join_model._read_table()} ON {on_clause}"
 
             values = ()
             if where:
-                filters = " AND ".join([f"{k} = %s" for k in where])
-                sql += f" WHERE {filters}"
-                values = tuple(where.values())
+                sql += f" {cls.where(**where)}"
+                values = tuple(_lookup_values(where))
 
-            cursor.execute(sql, values)
-            return cursor.fetchall()
+            return cls._select_rows(sql, values, [table1, table2])
         except Exception as e:
             print(f"[ERROR] Failed JOIN: {e}")
             return []
+
+    @classmethod
+    def aggregate(cls, group_by=None, count=None, sum=None, min=None, max=None,
+                  having=None, where=None, stream=False, chunk_size=1000):
+        """Run an aggregation in the database and return one lightweight row per group.
+
+        - `group_by`: list of columns to group on.
+        - `count`, `sum`, `min`, `max`: a column name or a list of column names to aggregate.
+          `count` also accepts "*". Results are named `<function>_<column>` (`count` for COUNT(*)).
+        - `having`: dict of result name -> condition, either a raw string such as "> 5" (as in
+          `having()`) or an `(operator, value)` tuple whose value is passed as a parameter.
+        - `where`: dict of filters, including range lookups, as in `query()`.
+        - `stream`: if True, return a generator that fetches rows `chunk_size` at a time instead
+          of a list. The connection stays open until the generator is exhausted or closed.
+
+        Rows are namedtuples whose fields are the grouped columns followed by the aggregates.
+        Unless streamed, results of a `__cache__` model are cached like `query()` results.
+        """
+        columns = set(cls._columns())
+        group_by = list(group_by or [])
+        selected = list(group_by)
+        fields = list(group_by)
+
+        specs = {"count": count, "sum": sum, "min": min, "max": max}
+        for function in AGGREGATES:
+            targets = specs[function]
+            if targets is None:
+                continue
+            for target in ([targets] if isinstance(targets, str) else targets):
+                if target == "*" and function == "count":
+                    name = "count"
+                elif target in columns:
+                    name = f"{function}_{target}"
+                else:
+                    raise ValueError(f"Cannot {function} unknown column {target!r} of {cls.__name__}")
+                selected.append(f"{function.upper()}({target}) AS {name}")
+                fields.append(name)
+
+        unknown = [col for col in group_by + [_split_lookup(key)[0] for key in where or {}] if col not in columns]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {cls.__name__}: {', '.join(unknown)}")
+        if len(fields) == len(group_by):
+            raise ValueError("aggregate() needs at least one of count, sum, min or max")
+
+        values = _lookup_values(where or {})
+        having_conditions = {}
+        for name, condition in (having or {}).items():
+            if name not in fields:
+                raise ValueError(f"HAVING refers to {name!r}, which is not in the result")
+            if isinstance(condition, tuple):
+                operator, value = condition
+                having_conditions[name] = f"{operator} %s"
+                values.append(value)
+            else:
+                having_conditions[name] = condition
+
+        table = cls.__name__.lower()
+        clauses = [cls.where(**(where or {})), cls.group_by(*group_by), cls.having(**having_conditions)]
+        sql = f"SELECT {', '.join(selected)} FROM {cls._read_table(table)} " + " ".join(c for c in clauses if c)
+        row_type = _row_type(tuple(fields))
+
+        if stream:
+            return cls._stream_rows(sql, values, row_type, chunk_size)
+
+        try:
+            rows = cls._select_rows(sql, values, [table])
+            return [row_type(*(row[field] for field in fields)) for row in rows]
+        except Exception as e:
+            print(f"[ERROR] Aggregate on {table} failed: {e}")
+            return []
+
+    @classmethod
+    def _stream_rows(cls, sql, values, row_type, chunk_size):
+        # consume_results lets the cursor close cleanly if the caller stops iterating early.
+        conn = MySQL().connect(read=True, consume_results=True)
+        cursor = conn.cursor(buffered=False)
+
+        try:
+            cursor.execute(sql, values)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row_type(*row)
+        except Exception as e:
+            print(f"[ERROR] Streaming query failed: {e}")
         finally:
             cursor.close()
             conn.close()
@@ -363,10 +934,15 @@ class Base:
             - This method should help in adding WHERE conditions to any SELECT query.
             - Build the WHERE clause dynamically based on the given conditions (e.g., `WHERE column = value`).
             - Return the generated WHERE condition string.
+
+        Keys may end in a lookup (`__lt`, `__lte`, `__gt`, `__gte`, `__between`) to compare
+        instead of testing equality, e.g. `where(timestamp__gte=start)` gives
+        `WHERE timestamp >= %s`. Use `_lookup_values(conditions)` for the matching parameters.
+        An unknown lookup raises ValueError.
         """
         if not conditions:
             return ""
-        clause = " AND ".join([f"{col} = %s" for col in conditions])
+        clause = " AND ".join(f"{col} {LOOKUPS[lookup]}" for col, lookup in map(_split_lookup, conditions))
         return f"WHERE {clause}"
 
     @classmethod
@@ -0,0 +1,195 @@
+# bulkload.py
+#
+# This file implements `Model.load_file()`, a bulk loader for seed and import files.
+#
+# Replaying an INSERT script or calling `save()` in a loop costs one round trip and one commit per
+# row. The loader instead:
+#   - Reads a CSV file (first line is the header) or a JSONL file (one JSON object per line) and
+#     maps its fields to the model's `Column`s by name. Fields that are not columns are skipped.
+#     Empty CSV fields are loaded as NULL.
+#   - For CSV files, tries `LOAD DATA LOCAL INFILE` first, the fastest path MySQL offers. It needs
+#     `local_infile` enabled on the server, so when the server refuses it the loader falls back.
+#   - Otherwise streams the file in chunks of multi-row INSERT statements, one commit per chunk,
+#     with `unique_checks` and `foreign_key_checks` turned off for the session while it loads.
+#     Memory use stays constant whatever the file size.
+#   - Models with a client-side `__id_strategy__` (see orm/ids.py) get their keys from it, like
+#     `bulk_save()`. Rows that already have a key in the file keep it. LOAD DATA cannot call the
+#     strategy, so a CSV file missing the key column or with a blank key uses batched INSERTs.
+#     Checking the keys reads the file once more before loading.
+#   - Reports rows loaded, elapsed time and rows/sec.
+#   - If a batched INSERT chunk fails, raises `BulkLoadError`. Its `rows` attribute is the number of
+#     rows committed by the earlier chunks, which stay in the table.
+#
+# Because constraint checks are off, the file must already be consistent with the schema. Write
+# listeners are not called for each row. Instead a single "bulk_load" event is emitted with the
+# load statistics, and derived tables (such as the audit rollups) should be rebuilt afterwards.
+#
+# Example usage:
+#
+#   stats = AuditLog.load_file("auditlog.csv")
+#   print(stats["rows"], stats["rows_per_sec"])
+#
+#   AuditLog.load_file("auditlog.jsonl", format="jsonl", chunk_size=5000)
+
+import csv
+import json
+import time
+from itertools import islice
+
+from orm.cache import query_cache
+from orm.dbconnectors import MySQL
+
+
+FORMATS = ("csv", "jsonl")
+
+
+class BulkLoadError(RuntimeError):
+    """Raised when a batched load stops part way. `rows` were committed before the failure."""
+
+    def __init__(self, table, rows):
+        super().__init__(f"Bulk load into {table} stopped after {rows} rows")
+        self.table = table
+        self.rows = rows
+
+
+def load_file(model, path, format="csv", chunk_size=2000, local_infile=True):
+    """Load `path` into `model`'s table and return a dict of load statistics."""
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format {format!r}; expected one of {', '.join(FORMATS)}")
+
+    table = model.__name__.lower()
+    started = time.perf_counter()
+    rows, method = None, "insert"
+
+    if format == "csv" and local_infile and _has_keys(model, path, format):
+        rows = _load_data_infile(model, table, path)
+        if rows is not None:
+            method = "load_data"
+    if rows is None:
+        rows = _load_inserts(model, table, path, format, chunk_size)
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "table": table,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed) if elapsed > 0 else rows,
+        "method": method,
+    }
+    print(f"[INFO] Loaded {rows} rows into {table} via {method} in {stats['seconds']}s "
+          f"({stats['rows_per_sec']} rows/sec)")
+    model._emit("bulk_load", stats)
+    return stats
+
+
+def _mapped_columns(model, fields):
+    """Return the file fields that are model columns, warning about the ones that are not."""
+    columns = model._columns()
+    skipped = [field for field in fields if field not in columns]
+    if skipped:
+        print(f"[INFO] Skipping fields that are not {model.__name__} columns: {', '.join(skipped)}")
+    mapped = [field for field in fields if field in columns]
+    if not mapped:
+        raise ValueError(f"No fields in the file match a {model.__name__} column")
+    return mapped
+
+
+def _has_keys(model, path, format):
+    """Return True unless the model's strategy must assign keys to some rows of the file."""
+    if not model.__id_strategy__.client_side:
+        return True
+    pk_columns = model._primary_keys()
+    return all(record.get(pk) is not None for record in _read_records(path, format) for pk in pk_columns)
+
+
+def _load_data_infile(model, table, path):
+    """Load a CSV file with LOAD DATA LOCAL INFILE. Returns None if the server does not allow it."""
+    with open(path, newline="") as file:
+        header_line = file.readline()
+    header = next(csv.reader([header_line]))
+    mapped = set(_mapped_columns(model, header))
+    line_end = "\\r\\n" if header_line.endswith("\r\n") else "\\n"
+
+    # Every file field is read into a user variable; mapped ones are assigned with '' -> NULL.
+    # CSV quotes by doubling '"' and has no escape character, so a backslash is loaded as is.
+    variables = ", ".join(f"@f{i}" for i in range(len(header)))
+    assignments = ", ".join(f"{field} = NULLIF(@f{i}, '')" for i, field in enumerate(header) if field in mapped)
+    sql = (f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+           f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+           f"LINES TERMINATED BY '{line_end}' IGNORE 1 LINES ({variables}) SET {assignments}")
+
+    try:
+        conn = MySQL().connect(allow_local_infile=True)
+    except Exception as e:
+        print(f"[INFO] LOAD DATA LOCAL INFILE unavailable, using batched INSERTs: {e}")
+        return None
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        cursor.execute(sql, (str(path),))
+        conn.commit()
+        MySQL.mark_write()
+        return cursor.rowcount
+    except Exception as e:
+        print(f"[INFO] LOAD DATA LOCAL INFILE failed, using batched INSERTs: {e}")
+        conn.rollback()
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _read_records(path, format):
+    """Yield each record of the file as a dict."""
+    with open(path, newline="") as file:
+        if format == "csv":
+            for record in csv.DictReader(file):
+                yield {field: (value if value != "" else None) for field, value in record.items()}
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _load_inserts(model, table, path, format, chunk_size):
+    records = _read_records(path, format)
+    first = next(records, None)
+    if first is None:
+        return 0
+    columns = _mapped_columns(model, list(first))
+    client_ids = model.__id_strategy__.client_side
+    if client_ids:
+        columns += [pk for pk in model._primary_keys() if pk not in columns]
+    row_sql = f"({', '.join(['%s'] * len(columns))})"
+    loaded = 0
+
+    conn = MySQL().connect()
+    cursor = conn.cursor()
+
+    try:
+        # Session settings only; they end with this connection.
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        chunk = [first] + list(islice(records, chunk_size - 1))
+        while chunk:
+            if client_ids:
+                instances = [model(**{col: record.get(col) for col in columns}) for record in chunk]
+                model._assign_ids(instances)
+                values = [getattr(instance, col) for instance in instances for col in columns]
+            else:
+                values = [record.get(col) for record in chunk for col in columns]
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))}"
+            cursor.execute(sql, values)
+            conn.commit()
+            MySQL.mark_write()
+            loaded += len(chunk)
+            chunk = list(islice(records, chunk_size))
+        return loaded
+    except Exception as e:
+        print(f"[ERROR] Bulk load into {table} failed after {loaded} rows: {e}")
+        conn.rollback()
+        query_cache.invalidate(table)
+        raise BulkLoadError(table, loaded) from e
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,98 @@
+# cache.py
+#
+# This file defines the `QueryCache` class and the process-wide `query_cache` used by `Base` to
+# cache read results for models that opt in with `__cache__ = True`.
+#
+# Reference tables such as `Role` or `Organization` are read on almost every request but rarely
+# written. For these models, `get`, `get_all`, `query` and `join` results are cached:
+#   - The cache key is the SQL text plus its parameters. Each entry also records the tables the
+#     query read (both sides of a join) and the version of each table at the time of the read.
+#   - Every write made through the ORM (`save`, `delete`, `bulk_save`, `load_file`) bumps the
+#     version of its table. An entry whose recorded versions no longer match is treated as a
+#     miss and discarded. Invalidation is therefore per table and costs O(1) per write.
+#   - The cache holds at most `maxsize` entries and evicts the least recently used one.
+#
+# Versions live in this process only. Writes made by another process, or by SQL outside the ORM,
+# are not seen, so only cache tables whose writes go through this process or that tolerate the
+# staleness. Code that writes with raw SQL should call `query_cache.invalidate(table)`.
+#
+# Example usage:
+#
+#   class Role(Base):
+#       __cache__ = True
+#       ...
+#
+#   Role.query(title="admin")   # database
+#   Role.query(title="admin")   # cache
+#   print(query_cache.stats())  # {'hits': 1, 'misses': 1, ...}
+
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # key -> (tables, versions, rows)
+        self._versions = {}             # table -> version
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def snapshot(self, tables):
+        """Return the current versions of `tables`. Take it before running the query."""
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def get(self, key):
+        """Return the cached rows for `key`, or None on a miss or a stale entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            tables, versions, rows = entry
+            if versions != tuple(self._versions.get(table, 0) for table in tables):
+                del self._entries[key]
+                self._invalidations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return rows
+
+    def put(self, key, tables, versions, rows):
+        """Store `rows` for `key`, read at table `versions` taken by `snapshot()`."""
+        with self._lock:
+            self._entries[key] = (tuple(tables), versions, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, table):
+        """Bump `table`'s version, making every cached result that read it stale."""
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+query_cache = QueryCache()
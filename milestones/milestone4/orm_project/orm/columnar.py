@@ -0,0 +1,234 @@
+# columnar.py
+#
+# This file implements `Model.fetch_columns()`, which reads query results column by column into
+# typed buffers for analytics, instead of building one model instance per row.
+#
+# A model instance costs a Python object per row plus a Python object for every value. Here each
+# column is stored in a single buffer:
+#   - `Integer`, `Float` and `Boolean` columns become `array.array` buffers ('q', 'd' and 'b'),
+#     8, 8 and 1 bytes per value, with no Python object per value.
+#   - `Date` and `DateTime` columns are stored the same way, as days or microseconds since
+#     1970-01-01. Indexing the column returns `date` / `datetime` objects again.
+#   - Every other column (strings, enums, blobs) is dictionary encoded: each distinct value is kept
+#     once in `values`, and `codes` is an `array('i')` of indexes into it. Columns such as `result`,
+#     `action` or `method` have few distinct values, so this is a 4-byte code per row.
+#   - NULLs in typed columns are recorded in a `nulls` bytearray (1 = NULL), allocated only once
+#     the first NULL is seen. NULL strings use the code -1.
+#
+# Rows are read from an unbuffered cursor `chunk_size` at a time and appended to the buffers, so
+# the full result never exists as rows in memory. If the query fails part way, the error is
+# raised rather than returning the columns read so far.
+#
+# If NumPy is installed, `result.to_numpy()` (or `fetch_columns(..., numpy=True)`) converts the
+# buffers to NumPy arrays without copying numeric data. Columns with NULLs become masked arrays.
+#
+# Example usage:
+#
+#   events = VerificationEvent.fetch_columns(["timestamp", "result", "document_id"],
+#                                            where={"timestamp__gte": "2026-01-01"})
+#   failures = events["result"].count("failure")
+#   arrays = events.to_numpy()   # {"timestamp": datetime64[us] array, "result": ..., ...}
+
+from array import array
+from datetime import datetime, timedelta
+
+from orm.base import _lookup_values
+from orm.datatypes import Boolean, Date, DateTime, Float, Integer, to_datetime
+from orm.dbconnectors import MySQL
+
+
+EPOCH = datetime(1970, 1, 1)
+ONE_DAY = timedelta(days=1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class TypedColumn:
+    """A numeric column stored in an `array.array`, with a lazily allocated NULL mask."""
+
+    def __init__(self, typecode):
+        self.data = array(typecode)
+        self.nulls = None
+
+    def extend(self, values):
+        if None in values:
+            if self.nulls is None:
+                self.nulls = bytearray(len(self.data))
+            self.nulls.extend(value is None for value in values)
+            self.data.extend(self._encode(0 if value is None else value) for value in values)
+            return
+        if self.nulls is not None:
+            self.nulls.extend(bytes(len(values)))
+        self.data.extend(self._encode_all(values))
+
+    def _encode(self, value):
+        return value
+
+    def _encode_all(self, values):
+        return values
+
+    def _decode(self, value):
+        return value
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return self._decode(self.data[index])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self.data)))
+
+    def nbytes(self):
+        return self.data.itemsize * len(self.data) + len(self.nulls or b"")
+
+    def to_numpy(self, np):
+        values = np.frombuffer(self.data, dtype=np.bool_ if self.data.typecode == "b" else self.data.typecode)
+        if self.nulls is None:
+            return values
+        return np.ma.masked_array(values, mask=np.frombuffer(self.nulls, dtype=np.bool_))
+
+
+class TemporalColumn(TypedColumn):
+    """A `Date` or `DateTime` column stored as days or microseconds since 1970-01-01."""
+
+    def __init__(self, with_time):
+        super().__init__("q")
+        self.with_time = with_time
+        self.unit = ONE_MICROSECOND if with_time else ONE_DAY
+
+    def _encode(self, value):
+        if value == 0:
+            return 0
+        return (to_datetime(value) - EPOCH) // self.unit
+
+    def _encode_all(self, values):
+        return map(self._encode, values)
+
+    def _decode(self, value):
+        moment = EPOCH + value * self.unit
+        return moment if self.with_time else moment.date()
+
+    def to_numpy(self, np):
+        values = np.frombuffer(self.data, dtype="datetime64[us]" if self.with_time else "datetime64[D]")
+        if self.nulls is None:
+            return values
+        return np.ma.masked_array(values, mask=np.frombuffer(self.nulls, dtype=np.bool_))
+
+
+class DictionaryColumn:
+    """A column stored as `array('i')` codes into a list of distinct `values`. NULL is -1."""
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values = []
+        self._index = {None: -1}
+
+    def extend(self, values):
+        index = self._index
+        for value in values:
+            if value not in index:
+                index[value] = len(self.values)
+                self.values.append(value)
+        self.codes.extend(index[value] for value in values)
+
+    def count(self, value):
+        code = self._index.get(value)
+        return 0 if code is None else self.codes.count(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        return None if code < 0 else self.values[code]
+
+    def __iter__(self):
+        values = self.values
+        return (None if code < 0 else values[code] for code in self.codes)
+
+    def nbytes(self):
+        return self.codes.itemsize * len(self.codes)
+
+    def to_numpy(self, np):
+        """Return the decoded values as an object array. Use `codes` directly to stay encoded."""
+        return np.array(list(self), dtype=object)
+
+
+class ColumnarResult:
+    """The columns returned by `fetch_columns()`, indexed by column name."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def nbytes(self):
+        """Return the size of the column buffers in bytes, excluding dictionary values."""
+        return sum(column.nbytes() for column in self.columns.values())
+
+    def to_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("NumPy output requires the numpy package (pip install numpy)")
+        return {name: column.to_numpy(numpy) for name, column in self.columns.items()}
+
+
+def fetch_columns(model, columns=None, where=None, chunk_size=10000, numpy=False):
+    """Read `columns` (default: all) of the rows matching `where` into typed column buffers."""
+    columns = list(columns or model._columns())
+    unknown = [col for col in columns if col not in model._columns()]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for {model.__name__}: {', '.join(unknown)}")
+
+    table = model.__name__.lower()
+    buffers = {col: _buffer(getattr(model, col)) for col in columns}
+    sql = f"SELECT {', '.join(columns)} FROM {model._read_table(table)} {model.where(**(where or {}))}"
+    values = _lookup_values(where or {})
+
+    conn = MySQL().connect(read=True, consume_results=True)
+    cursor = conn.cursor(buffered=False)
+
+    try:
+        cursor.execute(sql, values)
+        targets = [buffers[col] for col in columns]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for buffer, column_values in zip(targets, zip(*rows)):
+                buffer.extend(column_values)
+    except Exception as e:
+        print(f"[ERROR] Columnar fetch from {table} failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    result = ColumnarResult(buffers)
+    return result.to_numpy() if numpy else result
+
+
+def _buffer(column):
+    column_type = column.type if isinstance(column.type, type) else type(column.type)
+    if issubclass(column_type, DateTime):
+        return TemporalColumn(with_time=True)
+    if issubclass(column_type, Date):
+        return TemporalColumn(with_time=False)
+    if issubclass(column_type, Integer):
+        return TypedColumn("q")
+    if issubclass(column_type, Float):
+        return TypedColumn("d")
+    if issubclass(column_type, Boolean):
+        return TypedColumn("b")
+    return DictionaryColumn()
@@ -47,6 +47,17 @@ class Column:
         self.on_update = on_update
         self.on_delete = on_delete
         self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        # Instance attributes shadow columns, so this only runs for attributes the instance lacks,
+        # such as a column deferred with `Model.defer()` that has not been loaded yet.
+        if instance is not None and self.name in instance.__dict__.get("_deferred", ()):
+            return instance._load_deferred(self.name)
+        return self
 
     # TODO: Implement a method to return the SQL representation of the column (e.g., "VARCHAR(255) NOT NULL")
     def get_sql(self):
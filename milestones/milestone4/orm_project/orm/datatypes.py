@@ -12,6 +12,10 @@
 #   - The `Integer` class represents an INTEGER column type in SQL.
 #   - The `String` class represents a TEXT column type with an optional length constraint.
 #   - The `Boolean` class represents a BOOLEAN column type.
+#   - The `Date` and `DateTime` classes represent DATE and DATETIME columns. Their `to_python()`
+#     codec turns values read from the database or passed in by callers into `date` / `datetime`
+#     objects. Strings are parsed once per distinct value and the result is cached, because
+#     timestamps in a table repeat heavily (the same day, the same batch insert time).
 #
 # Students should implement the missing methods for each type (e.g., `get_sql`, `validate`)
 # to ensure proper integration with the ORM and the generation of valid SQL queries.
@@ -23,11 +27,48 @@
 #       name = Column(String(255), nullable=False)  # A TEXT column with a length of 255, not nullable
 #       is_active = Column(Boolean, default=True)  # A BOOLEAN column with a default value of True
 #       created_at = Column(Date)  # A DATE column
+#       last_login = Column(DateTime())  # A DATETIME column
 #
 #   This would represent a "User" table with columns: "id", "name", "is_active", and "created_at".
 #   The ORM will use the data types (Integer, String, Boolean, Date) to validate values and generate
 #   SQL queries when interacting with the database.
 
+from datetime import date, datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(text):
+    return date.fromisoformat(text[:10])
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime(text):
+    return datetime.fromisoformat(text)
+
+
+def to_date(value):
+    """Return `value` (a date, datetime or 'YYYY-MM-DD' string) as a `date`, or None."""
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, bytes):
+        value = value.decode()
+    return _parse_date(str(value))
+
+
+def to_datetime(value):
+    """Return `value` (a datetime, date or ISO 8601 string) as a `datetime`, or None."""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, bytes):
+        value = value.decode()
+    return _parse_datetime(str(value))
+
+
 class Integer:
     def __init__(self, type="INTEGER"):
         self.type = type
@@ -91,6 +132,16 @@ class Date:
     def get_sql(self):
         return self.type.upper()
 
+    def to_python(self, value):
+        return to_date(value)
+
+class DateTime(Date):
+    def __init__(self, type='DATETIME'):
+        super().__init__(type)
+
+    def to_python(self, value):
+        return to_datetime(value)
+
 class Blob:
     def __init__(self):
         self.type = "BLOB"
@@ -1,18 +1,157 @@
-import mysql.connector
+# dbconnectors.py
+#
+# This file defines the `MySQL` connector used by every ORM operation to open a connection.
+#
+# The connector knows about one primary and any number of read replicas:
+#   - `DB_HOST` is the primary. Writes, transactions and any `connect()` call without
+#     `read=True` go there.
+#   - `DB_REPLICA_HOSTS` is an optional comma-separated list of replicas (`host` or `host:port`).
+#     `connect(read=True)` picks one round-robin. A replica that refuses the connection is ejected
+#     for `DB_REPLICA_RETRY_SECONDS` (default 30) and the next one is tried. When none is available
+#     the read goes to the primary.
+#   - Read-your-writes: after a write commits on the primary, reads from the same thread or
+#     asyncio task also go to the primary for `DB_STICKY_SECONDS` (default 2), so they do not hit
+#     a replica that has not caught up yet. Write paths call `mark_write()` right after `commit()`,
+#     so the window starts when the write is visible, however long it took. Opening a primary
+#     connection also starts it, which keeps reads made during the write on the primary.
+#
+# `mysql.connector` is imported and `.env` is loaded on the first `connect()`, not when this module
+# is imported, so code that only builds SQL or inspects models does not pay for either.
+#
+# Example usage:
+#
+#   conn = MySQL().connect(read=True)    # replica, unless this thread wrote recently
+#
+#   with MySQL().transaction() as conn:  # primary; commits on success, rolls back on error
+#       conn.cursor().execute("UPDATE ...")
+
+import contextvars
+import itertools
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from contextlib import contextmanager
+
+
+# The `mysql.connector` module, set by `_load_driver()`.
+_driver = None
+_driver_lock = threading.Lock()
+
+# Monotonic time of the last primary connection made by the current thread or task.
+_last_write = contextvars.ContextVar("last_write", default=None)
+
+
+def _load_driver():
+    """Import `mysql.connector` and load `.env` the first time a connection is needed."""
+    global _driver
+    if _driver is None:
+        with _driver_lock:
+            if _driver is None:
+                import mysql.connector
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                _driver = mysql.connector
+    return _driver
+
+
+def _endpoint(address):
+    host, _, port = address.strip().partition(":")
+    return host, int(port) if port else int(os.getenv("DB_PORT", "3306"))
+
+
+class _ReplicaRouter:
+    def __init__(self, replicas, retry_seconds):
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._ejected = {}   # endpoint -> monotonic time it may be retried
+        self._lock = threading.Lock()
+
+    def candidates(self):
+        """Return the replicas that are not ejected, starting with the next one in rotation."""
+        if not self.replicas:
+            return []
+        start = next(self._counter) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        now = time.monotonic()
+        with self._lock:
+            return [replica for replica in ordered if self._ejected.get(replica, 0) <= now]
+
+    def eject(self, replica):
+        with self._lock:
+            self._ejected[replica] = time.monotonic() + self.retry_seconds
 
-load_dotenv()
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def _get_router():
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                hosts = [h for h in os.getenv("DB_REPLICA_HOSTS", "").split(",") if h.strip()]
+                _router = _ReplicaRouter([_endpoint(h) for h in hosts],
+                                         float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30")))
+    return _router
 
 
 class MySQL:
-    def connect(self):
-        connection = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),         # Host where the MySQL server is running
+    def connect(self, read=False, **options):
+        """Open a new connection. Extra `options` are passed to `mysql.connector.connect()`.
+
+        With `read=True` the connection goes to a replica when one is configured, available,
+        and the caller has not written within the stickiness window.
+        """
+        driver = _load_driver()
+        if read and not self._is_sticky():
+            router = _get_router()
+            for replica in router.candidates():
+                try:
+                    return self._open(replica, **options)
+                except driver.Error as e:
+                    print(f"[ERROR] Replica {replica[0]}:{replica[1]} unavailable, ejecting: {e}")
+                    router.eject(replica)
+
+        connection = self._open(_endpoint(os.getenv("DB_HOST", "localhost")), **options)
+        if not read:
+            self.mark_write()
+        return connection
+
+    @contextmanager
+    def transaction(self, **options):
+        """Yield a primary connection; commit on success, roll back on error, always close."""
+        conn = self.connect(**options)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+            self.mark_write()
+
+    @staticmethod
+    def mark_write():
+        """Start the read-your-writes window for the current thread or task. Call after `commit()`."""
+        _last_write.set(time.monotonic())
+
+    @staticmethod
+    def _is_sticky():
+        last = _last_write.get()
+        return last is not None and time.monotonic() - last < float(os.getenv("DB_STICKY_SECONDS", "2"))
+
+    def _open(self, endpoint, **options):
+        host, port = endpoint
+        connection = _load_driver().connect(
+            host=host,                                # Host where the MySQL server is running
+            port=port,
             user=os.getenv("DB_USER"),                # Username for the database
             password=os.getenv("DB_PASSWORD"),        # Password for the user
-            database=os.getenv("DB_NAME"),     # Name of the database to connect to
+            database=os.getenv("DB_NAME"),            # Name of the database to connect to
+            **options,
         )
         return connection
-
-
@@ -0,0 +1,246 @@
+# export.py
+#
+# This file implements `Model.export()`, which streams a table to a file for archiving.
+#
+# `get_all()` builds every row as a model instance before returning, so dumping a large table
+# needs memory proportional to the table. The exporter instead:
+#   - Reads rows in primary key order from an unbuffered cursor, `chunk_size` rows at a time, and
+#     writes each chunk straight to the output file. Memory use does not depend on table size.
+#   - Writes JSONL or CSV, optionally compressed with gzip, bz2 or xz. It can also write Parquet
+#     (columnar, for analytics tools), which requires the optional `pyarrow` package. Parquet is
+#     written one row group per chunk and uses its own internal compression.
+#   - With a `checkpoint` path, records the last exported primary key after every chunk. If the
+#     export is interrupted, running it again with the same checkpoint continues after that key.
+#   - JSONL and CSV output is appended to. The checkpoint also records the output size after each
+#     chunk, and a resumed export first truncates the file to that size. A chunk written after the
+#     last checkpoint, complete or not, is therefore written once, not twice. Compressed output is
+#     written as one complete gzip, bz2 or xz member per chunk, so the truncated file is still
+#     valid; the standard tools and Python modules read multi-member files as one stream.
+#   - Parquet files cannot be appended to or truncated. Each run writes `<path>.tmp`, renames it
+#     when the run ends, and only then advances the checkpoint. A resumed Parquet export is
+#     written to a new part file (`<path>.part1`, `<path>.part2`, ...). If the process dies, the
+#     run's `.tmp` file is discarded and the next run starts again from the last checkpoint.
+#   - Raises if the export cannot finish: `ImportError` before anything is read when Parquet is
+#     requested without `pyarrow`, and the original error if reading or writing fails part way.
+#     The checkpoint then points after the last chunk written, so the export can be resumed.
+#
+# Example usage:
+#
+#   AuditLog.export("auditlog-2025.jsonl.gz", compression="gzip", checkpoint="auditlog.ckpt")
+#   VerificationEvent.export("events.csv", format="csv", where={"result": "failure"})
+#   AuditLog.export("auditlog-q1.jsonl", where={"timestamp__between": ("2026-01-01", "2026-03-31")})
+#   SignatureRevocation.export("revocations.parquet", format="parquet")
+
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import os
+
+from orm.base import _lookup_values
+from orm.dbconnectors import MySQL
+
+
+FORMATS = ("jsonl", "csv", "parquet")
+COMPRESSORS = {None: None, "gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+def export(model, path, format="jsonl", where=None, chunk_size=10000, compression=None, checkpoint=None):
+    """Stream `model`'s table to `path` and return a dict with the rows written and last key."""
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format {format!r}; expected one of {', '.join(FORMATS)}")
+    if format != "parquet" and compression not in COMPRESSORS:
+        raise ValueError(f"Unsupported compression {compression!r}")
+    if format == "parquet":
+        _import_pyarrow()
+
+    table = model.__name__.lower()
+    columns = model._columns()
+    pk_columns = model._primary_keys()
+    if not pk_columns:
+        raise ValueError(f"{model.__name__} has no primary key to order the export by")
+
+    state = _read_checkpoint(checkpoint)
+    last_key = state.get("last_key")
+    part = state.get("part", 0) + 1 if format == "parquet" and last_key is not None else None
+    if part is not None:
+        path = f"{path}.part{part}"
+
+    values = _lookup_values(where or {})
+    clause = model.where(**(where or {}))
+    if last_key is not None:
+        keyset = f"({', '.join(pk_columns)}) > ({', '.join(['%s'] * len(pk_columns))})"
+        clause = f"{clause} AND {keyset}" if clause else f"WHERE {keyset}"
+        values.extend(last_key)
+    sql = f"SELECT {', '.join(columns)} FROM {model._read_table(table)} {clause} ORDER BY {', '.join(pk_columns)}"
+
+    pk_positions = [columns.index(col) for col in pk_columns]
+    written = 0
+    writer = None
+
+    conn = MySQL().connect(read=True, consume_results=True)
+    cursor = conn.cursor(buffered=False)
+
+    try:
+        cursor.execute(sql, values)
+        resume_size = state.get("bytes") if last_key is not None else None
+        writer = _open_writer(model, path, format, compression, last_key is not None, resume_size, columns)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            writer.write(rows)
+            written += len(rows)
+            state["last_key"] = [rows[-1][i] for i in pk_positions]
+            state["rows"] = state.get("rows", 0) + len(rows)
+            if format != "parquet":
+                state["bytes"] = writer.size()
+                _write_checkpoint(checkpoint, state)
+    except Exception as e:
+        print(f"[ERROR] Export of {table} stopped after {written} rows: {e}")
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+            if format == "parquet":
+                os.replace(writer.tmp, path)
+                if written:
+                    if part is not None:
+                        state["part"] = part
+                    _write_checkpoint(checkpoint, state)
+        cursor.close()
+        conn.close()
+
+    print(f"[INFO] Exported {written} rows from {table} to {path}")
+    return {"table": table, "path": path, "rows": written, "last_key": state.get("last_key")}
+
+
+def _read_checkpoint(checkpoint):
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as file:
+            return json.load(file)
+    return {}
+
+
+def _write_checkpoint(checkpoint, state):
+    """Replace the checkpoint file atomically, so a crash never leaves it half written."""
+    if not checkpoint:
+        return
+    tmp = f"{checkpoint}.tmp"
+    with open(tmp, "w") as file:
+        json.dump(state, file, default=str)
+    os.replace(tmp, checkpoint)
+
+
+def _open_writer(model, path, format, compression, append, resume_size, columns):
+    if format == "parquet":
+        return _ParquetWriter(model, path, columns, compression)
+    file = _ChunkFile(path, COMPRESSORS[compression], append, resume_size)
+    if format == "csv":
+        return _CsvWriter(file, columns, header=not append)
+    return _JsonlWriter(file, columns)
+
+
+class _ChunkFile:
+    """Output file written one chunk at a time, each chunk compressed as a complete member.
+
+    A resumed file is truncated to `resume_size`, the size recorded with the last checkpoint.
+    """
+
+    def __init__(self, path, compress, append, resume_size):
+        self.compress = compress
+        if resume_size is not None and os.path.exists(path):
+            self.file = open(path, "r+b")
+            self.file.truncate(resume_size)
+            self.file.seek(resume_size)
+        else:
+            self.file = open(path, "ab" if append else "wb")
+
+    def write(self, text):
+        data = text.encode()
+        self.file.write(self.compress(data) if self.compress else data)
+        self.file.flush()
+
+    def size(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class _JsonlWriter:
+    def __init__(self, file, columns):
+        self.file = file
+        self.columns = columns
+
+    def write(self, rows):
+        self.file.write("".join(json.dumps(dict(zip(self.columns, row)), default=str) + "\n" for row in rows))
+
+    def size(self):
+        return self.file.size()
+
+    def close(self):
+        self.file.close()
+
+
+class _CsvWriter:
+    def __init__(self, file, columns, header):
+        self.file = file
+        if header:
+            self.write([columns])
+
+    def write(self, rows):
+        text = io.StringIO(newline="")
+        csv.writer(text).writerows(rows)
+        self.file.write(text.getvalue())
+
+    def size(self):
+        return self.file.size()
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, model, path, columns, compression):
+        pyarrow = _import_pyarrow()
+        self.pa = pyarrow
+        self.schema = pyarrow.schema([(col, _arrow_type(pyarrow, getattr(model, col))) for col in columns])
+        self.tmp = f"{path}.tmp"
+        self.writer = pyarrow.parquet.ParquetWriter(self.tmp, self.schema, compression=compression or "snappy")
+
+    def write(self, rows):
+        arrays = [self.pa.array([row[i] for row in rows], type=field.type)
+                  for i, field in enumerate(self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet export requires the pyarrow package (pip install pyarrow)")
+    return pyarrow
+
+
+def _arrow_type(pa, column):
+    """Map a `Column`'s declared type to an Arrow type, defaulting to string."""
+    sql_type = str(getattr(column.type, "type", "")).upper()
+    name = column.type.__name__ if isinstance(column.type, type) else type(column.type).__name__
+    if name == "Integer":
+        return pa.int64()
+    if name == "Float":
+        return pa.float64()
+    if name == "Boolean":
+        return pa.bool_()
+    if sql_type == "DATE":
+        return pa.date32()
+    if sql_type in ("DATETIME", "TIMESTAMP"):
+        return pa.timestamp("us")
+    return pa.string()
@@ -0,0 +1,362 @@
+# ids.py
+#
+# This file defines the primary key strategies a model can choose with `__id_strategy__`:
+#
+#   class VerificationEvent(Base):
+#       __id_strategy__ = TimeOrdered()
+#       ...
+#
+#   - `AutoIncrement` (the default) lets MySQL generate the key. `save()` reads it back from
+#     `cursor.lastrowid` into the primary key column only. `bulk_save()` cannot read keys back.
+#   - `Sequence` allocates keys on the client, in blocks of `block_size`, from a row of the shared
+#     `orm_sequence` table ("hi/lo"). One round trip serves a whole block.
+#   - `TimeOrdered` builds 64-bit keys on the client with no round trip: milliseconds since
+#     `epoch` (41 bits), a node id (10 bits) and a per-millisecond counter (12 bits). Keys from
+#     one process increase over time, which keeps InnoDB inserts at the end of the index.
+#
+# Each process leases its `TimeOrdered` node id from the `orm_node_lease` table:
+#   - On first use it takes the lowest id with no lease or an expired one. The claim is a single
+#     upsert, so two processes never take the same id.
+#   - A background thread renews the lease every `NODE_LEASE_SECONDS / 3` seconds. When the process
+#     exits the lease is released; if it dies, the id becomes free once the lease expires.
+#   - If the lease cannot be renewed before it expires, or another process has taken the id, the
+#     next key leases a new id. A forked child leases its own id too.
+#   - If all 1024 ids are leased, `new_id()` raises instead of sharing an id.
+#
+# With a client-side strategy the key is known before the row is written:
+#   - `Model.new_id()` returns a key to put on a new instance, so related rows can be wired to it.
+#   - `save()`, `bulk_save()` and `Base.flush()` fill in any missing key before inserting.
+#
+# `TimeOrdered` keys need BIGINT columns. Widen the key and every column that references it with
+# a migration before switching a model. `migrations/0001_time_ordered_keys.sql` does this for
+# `Signature`, `AuditLog` and `VerificationEvent`:
+#
+#   python -m orm.migrations apply migrations/0001_time_ordered_keys.sql
+#
+# On first use for a model, `TimeOrdered` checks that its key column is a BIGINT. If it is not,
+# it raises rather than letting the insert overflow.
+#
+# Example usage:
+#
+#   event = VerificationEvent(verification_event_id=VerificationEvent.new_id(), result="success")
+#   log = AuditLog(audit_log_id=AuditLog.new_id(), verification_event_id=event.verification_event_id)
+#   Base.flush([event, log])   # both rows, one transaction, no lastrowid round trips
+
+import atexit
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from orm.dbconnectors import MySQL
+
+
+SEQUENCE_TABLE = "orm_sequence"
+
+CREATE_SEQUENCE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SEQUENCE_TABLE} (
+    name VARCHAR(100) NOT NULL PRIMARY KEY,
+    next_value BIGINT NOT NULL
+)
+"""
+
+
+NODE_LEASE_TABLE = "orm_node_lease"
+NODE_LEASE_SECONDS = 300
+
+CREATE_NODE_LEASE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {NODE_LEASE_TABLE} (
+    node_id SMALLINT NOT NULL PRIMARY KEY,
+    holder VARCHAR(100) NOT NULL,
+    expires_at DATETIME NOT NULL
+)
+"""
+
+# Takes `node_id` for `holder` unless another holder's lease on it has not expired yet.
+CLAIM_NODE_SQL = (
+    f"INSERT INTO {NODE_LEASE_TABLE} (node_id, holder, expires_at) "
+    f"VALUES (%s, %s, NOW() + INTERVAL %s SECOND) "
+    f"ON DUPLICATE KEY UPDATE "
+    f"holder = IF(expires_at <= NOW(), VALUES(holder), holder), "
+    f"expires_at = IF(holder = VALUES(holder), VALUES(expires_at), expires_at)"
+)
+
+
+_table_ready = False
+
+# This process's `NodeLease` for `TimeOrdered` keys, taken on first use.
+_lease = None
+_node_lock = threading.Lock()
+
+
+def ensure_sequence_table():
+    """Create the `orm_sequence` table if it does not exist."""
+    global _table_ready
+    conn = MySQL().connect()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(CREATE_SEQUENCE_SQL)
+        conn.commit()
+        _table_ready = True
+    except Exception as e:
+        print(f"[ERROR] Failed to create {SEQUENCE_TABLE}: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def allocate(name, count, start_after=None):
+    """Reserve `count` values of sequence `name` and return the first.
+
+    A new sequence starts at 1, or after the largest value of the column `start_after`
+    (a `(table, column)` pair) so it does not collide with existing rows.
+    """
+    if not _table_ready:
+        ensure_sequence_table()
+    if start_after is None:
+        seed_sql, seed_values = f"INSERT IGNORE INTO {SEQUENCE_TABLE} (name, next_value) VALUES (%s, 1)", (name,)
+    else:
+        table, column = start_after
+        seed_sql = (f"INSERT IGNORE INTO {SEQUENCE_TABLE} (name, next_value) "
+                    f"SELECT %s, COALESCE(MAX({column}), 0) + 1 FROM {table}")
+        seed_values = (name,)
+
+    conn = MySQL().connect()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(seed_sql, seed_values)
+        cursor.execute(f"SELECT next_value FROM {SEQUENCE_TABLE} WHERE name = %s FOR UPDATE", (name,))
+        first = cursor.fetchone()[0]
+        cursor.execute(f"UPDATE {SEQUENCE_TABLE} SET next_value = next_value + %s WHERE name = %s", (count, name))
+        conn.commit()
+        return first
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def node_id(bits):
+    """Return this process's node id, a number below `2 ** bits` leased from `orm_node_lease`."""
+    global _lease
+    with _node_lock:
+        if _lease is None or not _lease.valid():
+            if _lease is not None:
+                _lease.stop()
+            _lease = NodeLease.acquire(1 << bits)
+        return _lease.node_id
+
+
+class NodeLease:
+    """A node id held by this process in `orm_node_lease`, renewed in a background thread."""
+
+    def __init__(self, node_id, holder, seconds=NODE_LEASE_SECONDS):
+        self.node_id = node_id
+        self.holder = holder
+        self.seconds = seconds
+        self.pid = os.getpid()
+        self.lost = False
+        self._renewed = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="orm-node-lease", daemon=True)
+
+    @classmethod
+    def acquire(cls, count, seconds=NODE_LEASE_SECONDS):
+        """Lease the lowest free node id below `count`. Raises RuntimeError if none is free."""
+        holder = f"{socket.gethostname()[:60]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(CREATE_NODE_LEASE_SQL)
+            cursor.execute(f"SELECT node_id FROM {NODE_LEASE_TABLE} WHERE expires_at > NOW()")
+            taken = {row[0] for row in cursor.fetchall()}
+            for node in (node for node in range(count) if node not in taken):
+                cursor.execute(CLAIM_NODE_SQL, (node, holder, seconds))
+                cursor.execute(f"SELECT holder FROM {NODE_LEASE_TABLE} WHERE node_id = %s", (node,))
+                row = cursor.fetchone()
+                conn.commit()
+                if row is not None and row[0] == holder:
+                    lease = cls(node, holder, seconds)
+                    lease._thread.start()
+                    atexit.register(lease.release)
+                    return lease
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        raise RuntimeError(f"All {count} node ids in {NODE_LEASE_TABLE} are leased; "
+                           f"TimeOrdered keys would collide")
+
+    def valid(self):
+        """Return True if this process still holds the lease."""
+        # Stop using the id a little before the lease can expire on the server.
+        return (not self.lost and self.pid == os.getpid()
+                and time.monotonic() - self._renewed < 0.9 * self.seconds)
+
+    def renew(self):
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                f"UPDATE {NODE_LEASE_TABLE} SET expires_at = NOW() + INTERVAL %s SECOND "
+                f"WHERE node_id = %s AND holder = %s",
+                (self.seconds, self.node_id, self.holder),
+            )
+            conn.commit()
+            if cursor.rowcount == 0:
+                self.lost = True
+            else:
+                self._renewed = time.monotonic()
+        except Exception as e:
+            print(f"[ERROR] Failed to renew node id lease {self.node_id}: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def release(self):
+        """Give the node id back. Runs at exit; does nothing if the lease is no longer held."""
+        self.stop()
+        if self.pid != os.getpid() or self.lost:
+            return
+        self.lost = True
+        try:
+            with MySQL().transaction() as conn:
+                conn.cursor().execute(f"DELETE FROM {NODE_LEASE_TABLE} WHERE node_id = %s AND holder = %s",
+                                      (self.node_id, self.holder))
+        except Exception as e:
+            print(f"[ERROR] Failed to release node id lease {self.node_id}: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.seconds / 3):
+            self.renew()
+            if self.lost:
+                return
+
+
+def _require_bigint(model):
+    """Raise if the model's key column exists and is narrower than BIGINT."""
+    table, column = model.__name__.lower(), model._primary_keys()[0]
+    conn = MySQL().connect(read=True)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+            (table, column),
+        )
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if row is not None and str(row[0]).lower() != "bigint":
+        raise ValueError(f"{table}.{column} is {row[0]}, but {model.__name__} uses 64-bit keys; "
+                         f"apply migrations/0001_time_ordered_keys.sql first")
+
+
+class AutoIncrement:
+    client_side = False
+
+    def assign(self, model, instances):
+        pass
+
+    def after_insert(self, instance, lastrowid):
+        pk_columns = type(instance)._primary_keys()
+        if len(pk_columns) == 1 and getattr(instance, pk_columns[0], None) is None:
+            setattr(instance, pk_columns[0], lastrowid)
+
+    def new_id(self, model):
+        raise ValueError(f"{model.__name__} uses AUTO_INCREMENT keys, which are only known after the insert")
+
+
+class _ClientSide:
+    """Shared `assign()` for strategies that generate keys on the client."""
+
+    client_side = True
+
+    def assign(self, model, instances):
+        pk_columns = model._primary_keys()
+        if len(pk_columns) != 1:
+            raise ValueError(f"{model.__name__} needs a single primary key column for {type(self).__name__}")
+        pk = pk_columns[0]
+        for instance in instances:
+            if getattr(instance, pk, None) is None:
+                setattr(instance, pk, self.new_id(model))
+
+    def after_insert(self, instance, lastrowid):
+        pass
+
+
+class Sequence(_ClientSide):
+    def __init__(self, name=None, block_size=1000):
+        self.name = name
+        self.block_size = block_size
+        self._next = {}    # sequence name -> next unused value of the current block
+        self._limit = {}   # sequence name -> first value past the current block
+        self._lock = threading.Lock()
+
+    def new_id(self, model):
+        table = model.__name__.lower()
+        name = self.name or table
+        with self._lock:
+            if self._next.get(name, 0) >= self._limit.get(name, 0):
+                first = allocate(name, self.block_size, start_after=(table, model._primary_keys()[0]))
+                self._next[name], self._limit[name] = first, first + self.block_size
+            value = self._next[name]
+            self._next[name] = value + 1
+            return value
+
+
+class TimeOrdered(_ClientSide):
+    NODE_BITS = 10
+    COUNTER_BITS = 12
+
+    def __init__(self, epoch=datetime(2024, 1, 1)):
+        self.epoch_ms = int(epoch.timestamp() * 1000)
+        self._last_ms = -1
+        self._counter = 0
+        self._checked = set()   # models whose key column was checked to be a BIGINT
+        self._lock = threading.Lock()
+
+    def new_id(self, model):
+        if model not in self._checked:
+            _require_bigint(model)
+            self._checked.add(model)
+        node = node_id(self.NODE_BITS)
+        with self._lock:
+            now = self._now()
+            if now < self._last_ms:
+                # The clock went backwards: keep issuing from the last millisecond seen.
+                now = self._last_ms
+            if now == self._last_ms:
+                self._counter = (self._counter + 1) % (1 << self.COUNTER_BITS)
+                if self._counter == 0:
+                    while now <= self._last_ms:
+                        now = self._now()
+            else:
+                self._counter = 0
+            self._last_ms = now
+            return ((now - self.epoch_ms) << (self.NODE_BITS + self.COUNTER_BITS)
+                    | node << self.COUNTER_BITS
+                    | self._counter)
+
+    def _now(self):
+        return time.time_ns() // 1_000_000
+
+
+AUTO_INCREMENT = AutoIncrement()
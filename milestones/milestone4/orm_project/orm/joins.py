@@ -0,0 +1,173 @@
+# joins.py
+#
+# This file defines the `JoinBuilder` class returned by `Model.join_builder()`. It joins any number
+# of models in one statement, whereas `Base.join()` joins exactly two tables with `SELECT *`.
+#
+#   - `join()` / `left_join()` add a model with an INNER or LEFT JOIN. `on` is either a pair of
+#     qualified columns, as in `Base.join()`, or a single column name shared by the new model and
+#     the most recently joined table that has it.
+#   - Each table gets an alias (its table name by default). Pass `alias=` to join the same model
+#     twice.
+#   - Every selected column is aliased as `<alias>__<column>` in the SQL, so same-named columns
+#     such as `user_id`, `timestamp` or `result` no longer overwrite each other. `columns()`
+#     restricts the columns selected from one table, like `Model.only()`.
+#   - `all()` returns one dict per row keyed by `"<alias>.<column>"`. `all(hydrate=True)` returns
+#     one tuple per row with a model instance for each table, or None for a LEFT JOIN that found
+#     nothing.
+#
+# Reads go through `Base._select_rows()`, so they use replicas and the query cache like `query()`.
+#
+# Example usage (the whole verification context in one statement):
+#
+#   rows = (Signature.join_builder()
+#           .join(DigitalCertificate, on="digital_certificate_id")
+#           .join(PublicKey, on="digital_certificate_id")
+#           .left_join(SignatureRevocation, on="signature_id")
+#           .where(document_id=42)
+#           .all(hydrate=True))
+#
+#   for signature, certificate, public_key, revocation in rows:
+#       ...
+
+from orm.base import _lookup_values, _split_lookup
+
+
+class JoinBuilder:
+    def __init__(self, model, alias=None):
+        self._tables = []       # (alias, model, join type, ON clause)
+        self._projections = {}  # alias -> Projection of the columns selected from that table
+        self._conditions = []
+        self._values = []
+        self._order_by = []
+        self._limit = None
+        self._add(model, alias, None, None)
+
+    def join(self, model, on, alias=None):
+        """Add `model` with an INNER JOIN."""
+        return self._add(model, alias, "JOIN", on)
+
+    def left_join(self, model, on, alias=None):
+        """Add `model` with a LEFT JOIN."""
+        return self._add(model, alias, "LEFT JOIN", on)
+
+    def columns(self, alias, *columns):
+        """Select only `columns` (plus the primary key) from the table known as `alias`.
+
+        A model may be given instead of an alias if it is joined only once.
+        """
+        alias, model = self._lookup(alias)
+        self._projections[alias] = model.only(*columns)
+        return self
+
+    def where(self, conditions=None, **filters):
+        """Add filters, including range lookups such as `__gte` or `__between` (see `Base.where()`).
+
+        `conditions` is a dict keyed by `"<alias>.<column>"`. Keyword `filters` apply to the first
+        table of the join.
+        """
+        first = self._tables[0][0]
+        conditions = {**(conditions or {}), **{f"{first}.{key}": value for key, value in filters.items()}}
+        if not conditions:
+            return self
+        for key in conditions:
+            alias, _, column = _split_lookup(key)[0].partition(".")
+            _, model = self._lookup(alias)
+            if column not in model._columns():
+                raise ValueError(f"Unknown column {column!r} for {model.__name__}")
+        self._conditions.append(self._tables[0][1].where(**conditions)[len("WHERE "):])
+        self._values.extend(_lookup_values(conditions))
+        return self
+
+    def order_by(self, *columns):
+        """Order by qualified columns, e.g. `"signature.timestamp DESC"`."""
+        self._order_by.extend(columns)
+        return self
+
+    def limit(self, count):
+        self._limit = int(count)
+        return self
+
+    def sql(self):
+        """Return the SQL statement and its parameters."""
+        select = ", ".join(f"{alias}.{col} AS {alias}__{col}"
+                           for alias, model, _, _ in self._tables
+                           for col in self._selected(alias, model))
+        alias, model, _, _ = self._tables[0]
+        parts = [f"SELECT {select} FROM {model._read_table(alias=alias)}"]
+        for alias, model, join_type, on_clause in self._tables[1:]:
+            parts.append(f"{join_type} {model._read_table(alias=alias)} ON {on_clause}")
+        if self._conditions:
+            parts.append("WHERE " + " AND ".join(self._conditions))
+        if self._order_by:
+            parts.append("ORDER BY " + ", ".join(self._order_by))
+        if self._limit is not None:
+            parts.append(f"LIMIT {self._limit}")
+        return " ".join(parts), tuple(self._values)
+
+    def all(self, hydrate=False):
+        """Run the join. Returns dicts keyed by `"<alias>.<column>"`, or model tuples if `hydrate`."""
+        sql, values = self.sql()
+        base = self._tables[0][1]
+        tables = [model.__name__.lower() for _, model, _, _ in self._tables]
+        try:
+            rows = base._select_rows(sql, values, tables)
+        except Exception as e:
+            print(f"[ERROR] Failed JOIN: {e}")
+            return []
+
+        if not hydrate:
+            return [{key.replace("__", ".", 1): value for key, value in row.items()} for row in rows]
+        return [tuple(self._hydrate(row, alias, model) for alias, model, _, _ in self._tables) for row in rows]
+
+    def first(self, hydrate=False):
+        rows = self.limit(1).all(hydrate=hydrate)
+        return rows[0] if rows else None
+
+    def _hydrate(self, row, alias, model):
+        prefix = f"{alias}__"
+        values = {key[len(prefix):]: value for key, value in row.items() if key.startswith(prefix)}
+        pk_columns = [col for col in model._primary_keys() if col in values]
+        if pk_columns and all(values[col] is None for col in pk_columns):
+            return None
+        # Columns left out by `columns()` are deferred and load on first access, as with `only()`.
+        return model._from_row(values, self._projections.get(alias))
+
+    def _selected(self, alias, model):
+        projection = self._projections.get(alias)
+        return projection.columns if projection else model._columns()
+
+    def _add(self, model, alias, join_type, on):
+        used = {existing for existing, _, _, _ in self._tables}
+        if alias is None:
+            alias = model.__name__.lower()
+            suffix = 2
+            while alias in used:
+                alias = f"{model.__name__.lower()}_{suffix}"
+                suffix += 1
+        elif alias in used:
+            raise ValueError(f"Alias {alias!r} is already used in this join")
+
+        on_clause = None
+        if join_type is not None:
+            if isinstance(on, str):
+                on_clause = f"{self._owner_of(on)}.{on} = {alias}.{on}"
+            elif on and len(on) == 2:
+                on_clause = f"{on[0]} = {on[1]}"
+            else:
+                raise ValueError("Join must include a column name or a tuple of ON fields")
+
+        self._tables.append((alias, model, join_type, on_clause))
+        return self
+
+    def _owner_of(self, column):
+        """Return the alias of the most recently joined table that has `column`."""
+        for alias, model, _, _ in reversed(self._tables):
+            if column in model._columns():
+                return alias
+        raise ValueError(f"No joined table has a column named {column!r}")
+
+    def _lookup(self, alias):
+        for existing, model, _, _ in self._tables:
+            if existing == alias or model is alias:
+                return existing, model
+        raise ValueError(f"{alias!r} is not part of this join")
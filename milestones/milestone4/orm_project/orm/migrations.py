@@ -18,6 +18,36 @@
 #   - Ensure the connection and cursor are properly closed after the operation, even in case of errors.
 #   - Handle exceptions with appropriate error messages.
 #   - Commit the transaction if the operation is successful, and rollback if there is an error.
+#
+# Migration files live in `migrations/` and are applied in name order. Each file has a
+# `-- migrate:up` section and a `-- migrate:down` section of `;`-terminated statements. Applied
+# migrations are recorded in the `orm_migration` table, so applying one twice is a no-op.
+#
+# MySQL commits each DDL statement on its own. If a statement fails, the statements before it stay
+# applied and the migration is not recorded. Fix the cause, undo or skip the applied part, and run
+# it again.
+#
+# Example usage:
+#
+#   python -m orm.migrations apply migrations/0001_time_ordered_keys.sql
+#   python -m orm.migrations rollback migrations/0001_time_ordered_keys.sql
+#   python -m orm.migrations status
+
+import argparse
+import os
+
+from orm.dbconnectors import MySQL
+
+
+MIGRATION_TABLE = "orm_migration"
+
+CREATE_MIGRATION_SQL = f"""
+CREATE TABLE IF NOT EXISTS {MIGRATION_TABLE} (
+    name VARCHAR(255) NOT NULL PRIMARY KEY,
+    applied_at DATETIME NOT NULL
+)
+"""
+
 
 class Migrations:
 
@@ -119,28 +149,103 @@ class Migrations:
 
     @classmethod
     def apply_migration(cls, migration_file):
-        """Apply a migration from a given migration file.
+        """Apply the `-- migrate:up` section of `migration_file`, unless it was applied already.
 
-        TODO:
-            - Open a new connection and cursor.
-            - Read the SQL commands from the migration file.
-            - Execute the SQL commands to update the database schema.
-            - Ensure the connection and cursor are properly closed after the operation.
-            - Commit the transaction if successful, and rollback on failure.
+        Returns True if the migration is applied when the call returns.
         """
-        pass
+        name = os.path.basename(migration_file)
+        if name in cls.applied():
+            print(f"[INFO] Migration {name} is already applied")
+            return True
+        up, _ = cls._read_sections(migration_file)
+        statements = up + [(f"INSERT INTO {MIGRATION_TABLE} (name, applied_at) VALUES (%s, NOW())", (name,))]
+        if cls._run(name, statements):
+            print(f"[INFO] Applied migration {name}")
+            return True
+        return False
 
     @classmethod
     def rollback_migration(cls, migration_file):
-        """Rollback a previously applied migration.
-
-        TODO:
-            - Open a new connection and cursor.
-            - Read the rollback SQL commands from the migration file.
-            - Execute the SQL commands to revert the database schema.
-            - Ensure the connection and cursor are properly closed after the operation.
-            - Commit the transaction if successful, and rollback on failure.
-        """
-        pass
-
+        """Run the `-- migrate:down` section of `migration_file`, if the migration is applied."""
+        name = os.path.basename(migration_file)
+        if name not in cls.applied():
+            print(f"[INFO] Migration {name} is not applied")
+            return True
+        _, down = cls._read_sections(migration_file)
+        statements = down + [(f"DELETE FROM {MIGRATION_TABLE} WHERE name = %s", (name,))]
+        if cls._run(name, statements):
+            print(f"[INFO] Rolled back migration {name}")
+            return True
+        return False
 
+    @classmethod
+    def applied(cls):
+        """Return the names of the applied migrations."""
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(CREATE_MIGRATION_SQL)
+            cursor.execute(f"SELECT name FROM {MIGRATION_TABLE}")
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def _read_sections(migration_file):
+        """Split a migration file into its up and down statements, as `(sql, ())` pairs."""
+        sections = {"up": [], "down": []}
+        current = None
+        with open(migration_file) as file:
+            for line in file:
+                marker = line.strip().lower()
+                if marker in ("-- migrate:up", "-- migrate:down"):
+                    current = marker.rpartition(":")[2]
+                elif current and not marker.startswith("--"):
+                    sections[current].append(line)
+        if not sections["up"] or not sections["down"]:
+            raise ValueError(f"{migration_file} needs '-- migrate:up' and '-- migrate:down' sections")
+        return tuple([(sql.strip(), ()) for sql in "".join(sections[key]).split(";") if sql.strip()]
+                     for key in ("up", "down"))
+
+    @staticmethod
+    def _run(name, statements):
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+        sql = None
+
+        try:
+            for sql, values in statements:
+                cursor.execute(sql, values)
+            conn.commit()
+            return True
+        except Exception as e:
+            # DDL commits implicitly in MySQL, so statements before `sql` stay applied.
+            print(f"[ERROR] Migration {name} failed at: {sql}\n  {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or roll back a SQL migration file.")
+    parser.add_argument("command", choices=("apply", "rollback", "status"))
+    parser.add_argument("migration_file", nargs="?", help="e.g. migrations/0001_time_ordered_keys.sql")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        for name in sorted(Migrations.applied()):
+            print(name)
+    elif args.migration_file is None:
+        parser.error(f"{args.command} needs a migration file")
+    elif args.command == "apply":
+        Migrations.apply_migration(args.migration_file)
+    else:
+        Migrations.rollback_migration(args.migration_file)
+
+
+if __name__ == "__main__":
+    main()
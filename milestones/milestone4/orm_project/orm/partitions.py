@@ -0,0 +1,312 @@
+# partitions.py
+#
+# This file defines time-based partitioning for models whose tables only grow, such as `AuditLog`
+# and `VerificationEvent`. A model opts in by declaring a `__partition__` attribute:
+#
+#   class AuditLog(Base):
+#       __partition__ = RangePartitioning("timestamp")
+#       ...
+#
+# Two strategies are supported, both with one partition per calendar month:
+#   - `RangePartitioning`: native MySQL `PARTITION BY RANGE COLUMNS(<column>)`, one partition named
+#     `pYYYYMM` per month plus a catch-all `pmax`. The table keeps its name, so triggers, `get()`
+#     and `query()` work unchanged. MySQL requires the partition column to be part of the primary
+#     key, and partitioned InnoDB tables cannot have foreign keys, so those must be dropped first.
+#   - `MonthlyTables`: one ordinary table per month named `<table>_YYYYMM`, created `LIKE` the base
+#     table. `save()` and `bulk_save()` write each row to the table of its month. `get()`,
+#     `query()`, `get_all()`, `aggregate()`, joins, `fetch_columns()` and `export()` read every
+#     monthly table through a UNION ALL, and `delete()` deletes from each of them. The list of
+#     monthly tables is cached for `refresh_seconds` (default 60), so create months ahead of use
+#     with `add_partitions()`. Use it when native partitioning is not an option. Changing a row's
+#     partition column does not move it to another month's table.
+#
+# `Model.query_range(start, end, **filters)` reads only the partitions overlapping `[start, end)`.
+# With native partitions MySQL prunes them from the range predicate. With monthly tables only the
+# tables for those months are queried, combined with UNION ALL.
+#
+# Old data is removed a whole month at a time with `drop_partitions(model, before)`. Dropping a
+# partition or a table is a metadata operation whatever its size, unlike a mass DELETE. With
+# `archive=True` the month is kept as a standalone `<table>_archive_YYYYMM` table instead. For
+# native partitions this uses `EXCHANGE PARTITION`, which swaps the data without copying it.
+#
+# Example usage:
+#
+#   add_partitions(AuditLog, until="2026-12")       # create partitions up to December 2026
+#   AuditLog.query_range("2026-01-01", "2026-02-01", user_id=7)   # only January's table
+#   AuditLog.get("auditlog", 42)                                    # every monthly table
+#   drop_partitions(AuditLog, before="2025-01", archive=True)
+
+import threading
+import time
+from datetime import date, datetime
+
+from orm.base import _lookup_values
+from orm.cache import query_cache
+from orm.datatypes import to_datetime
+from orm.dbconnectors import MySQL
+
+
+def month_start(value):
+    """Return the first day of the month containing `value` (a date, datetime or 'YYYY-MM[-DD...]' string)."""
+    if isinstance(value, (date, datetime)):
+        return date(value.year, value.month, 1)
+    year, month = str(value)[:7].split("-")
+    return date(int(year), int(month), 1)
+
+
+def next_month(value):
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def months(start, end):
+    """Return the first day of every month from `start`'s month up to and including `end`'s month."""
+    month, last = month_start(start), month_start(end)
+    result = []
+    while month <= last:
+        result.append(month)
+        month = next_month(month)
+    return result
+
+
+def _suffix(month):
+    return f"{month.year:04d}{month.month:02d}"
+
+
+class RangePartitioning:
+    def __init__(self, column):
+        self.column = column
+
+    def partition_name(self, month):
+        return f"p{_suffix(month)}"
+
+    def write_table(self, table, value):
+        return table
+
+    def read_tables(self, table):
+        return [table]
+
+
+class MonthlyTables:
+    def __init__(self, column, refresh_seconds=60):
+        self.column = column
+        self.refresh_seconds = refresh_seconds
+        self._tables = {}   # base table -> (monotonic time the list expires, monthly table names)
+        self._lock = threading.Lock()
+
+    def table_name(self, table, month):
+        return f"{table}_{_suffix(month)}"
+
+    def write_table(self, table, value):
+        if value is None:
+            raise ValueError(f"Cannot route a row with no {self.column} to a monthly table")
+        return self.table_name(table, month_start(value))
+
+    def read_tables(self, table):
+        """Return the existing monthly tables, or the base table if there are none yet.
+
+        The list is cached for `refresh_seconds`. `add_partitions()` and `drop_partitions()`
+        refresh it in this process.
+        """
+        with self._lock:
+            cached = self._tables.get(table)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+        names = [self.table_name(table, month) for month in _existing_monthly(table)] or [table]
+        with self._lock:
+            self._tables[table] = (time.monotonic() + self.refresh_seconds, names)
+        return names
+
+    def forget(self, table):
+        with self._lock:
+            self._tables.pop(table, None)
+
+
+def _partitioning(model):
+    partitioning = getattr(model, "__partition__", None)
+    if partitioning is None:
+        raise ValueError(f"{model.__name__} does not declare __partition__")
+    return partitioning
+
+
+def query_range(model, start=None, end=None, filters=None):
+    """Return instances of `model` whose partition column is in `[start, end)` and match `filters`.
+
+    `filters` are the same as for `query()`, so they may include range lookups on other columns.
+    """
+    partitioning = getattr(model, "__partition__", None)
+    table = model.__name__.lower()
+    column = partitioning.column if partitioning else "timestamp"
+
+    conditions = dict(filters or {})
+    if start is not None:
+        conditions[f"{column}__gte"] = start
+    if end is not None:
+        conditions[f"{column}__lt"] = end
+    where = model.where(**conditions)
+    values = _lookup_values(conditions)
+
+    if isinstance(partitioning, MonthlyTables):
+        # Until the first month table exists, rows are read from the base table, as `query()` does.
+        if partitioning.read_tables(table) == [table]:
+            tables = [table]
+        else:
+            tables = _monthly_tables(partitioning, table, start, end)
+        if not tables:
+            return []
+        sql = " UNION ALL ".join(f"SELECT * FROM {name} {where}" for name in tables)
+        values = values * len(tables)
+    else:
+        sql = f"SELECT * FROM {table} {where}"
+
+    conn = MySQL().connect(read=True)
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.execute(sql, values)
+        return [model._from_row(row) for row in cursor.fetchall()]
+    except Exception as e:
+        print(f"[ERROR] Range query on {table} failed: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def add_partitions(model, until, start=None):
+    """Create monthly partitions (or tables) for every month up to and including `until`.
+
+    For native partitions, a table that is not partitioned yet is converted, starting at `start`
+    (default: the current month). That conversion rewrites the table once. Later calls only split
+    the empty `pmax` partition, which is quick.
+    """
+    partitioning = _partitioning(model)
+    table = model.__name__.lower()
+
+    if isinstance(partitioning, MonthlyTables):
+        wanted = months(start or date.today(), until)
+        created = _execute(table, [
+            f"CREATE TABLE IF NOT EXISTS {partitioning.table_name(table, month)} LIKE {table}" for month in wanted
+        ])
+        partitioning.forget(table)
+        return created
+
+    existing = _native_partitions(table)
+    if not existing:
+        wanted = months(start or date.today(), until)
+        pk_columns = model._primary_keys()
+        primary_key = ", ".join(pk_columns + [partitioning.column]
+                                if partitioning.column not in pk_columns else pk_columns)
+        return _execute(table, [
+            f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY ({primary_key}) "
+            f"PARTITION BY RANGE COLUMNS({partitioning.column}) ({_partition_list(partitioning, wanted)})"
+        ])
+
+    wanted = [month for month in months(max(existing), until) if month not in existing]
+    if not wanted:
+        return True
+    return _execute(table, [
+        f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({_partition_list(partitioning, wanted)})"
+    ])
+
+
+def drop_partitions(model, before, archive=False):
+    """Drop (or archive) every monthly partition or table for months earlier than `before`'s month."""
+    partitioning = _partitioning(model)
+    table = model.__name__.lower()
+    cutoff = month_start(before)
+
+    if isinstance(partitioning, MonthlyTables):
+        old = [month for month in _existing_monthly(table) if month < cutoff]
+        statements = []
+        for month in old:
+            name = partitioning.table_name(table, month)
+            if archive:
+                statements.append(f"RENAME TABLE {name} TO {table}_archive_{_suffix(month)}")
+            else:
+                statements.append(f"DROP TABLE {name}")
+        dropped = _execute(table, statements)
+        partitioning.forget(table)
+        return dropped
+
+    old = [month for month in _native_partitions(table) if month < cutoff]
+    statements = []
+    for month in old:
+        partition = partitioning.partition_name(month)
+        if archive:
+            archive_table = f"{table}_archive_{_suffix(month)}"
+            statements += [
+                f"CREATE TABLE {archive_table} LIKE {table}",
+                f"ALTER TABLE {archive_table} REMOVE PARTITIONING",
+                f"ALTER TABLE {table} EXCHANGE PARTITION {partition} WITH TABLE {archive_table}",
+            ]
+        statements.append(f"ALTER TABLE {table} DROP PARTITION {partition}")
+    return _execute(table, statements)
+
+
+def _partition_list(partitioning, wanted):
+    parts = [f"PARTITION {partitioning.partition_name(month)} VALUES LESS THAN ('{next_month(month)}')"
+             for month in wanted]
+    return ", ".join(parts + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"])
+
+
+def _native_partitions(table):
+    """Return the months that have a native partition on `table`."""
+    names = _fetch_column(
+        "SELECT partition_name FROM information_schema.partitions "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND partition_name IS NOT NULL",
+        (table,),
+    )
+    return sorted(month_start(f"{name[1:5]}-{name[5:7]}") for name in names if name != "pmax")
+
+
+def _existing_monthly(table):
+    """Return the months that have a `<table>_YYYYMM` table."""
+    names = _fetch_column(
+        "SELECT table_name FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name LIKE %s",
+        (f"{table}\\_%",),
+    )
+    suffixes = [name[len(table) + 1:] for name in names]
+    return sorted(month_start(f"{s[:4]}-{s[4:]}") for s in suffixes if len(s) == 6 and s.isdigit())
+
+
+def _monthly_tables(partitioning, table, start, end):
+    """Return the existing monthly tables that overlap `[start, end)`."""
+    start, end = to_datetime(start), to_datetime(end)
+    return [partitioning.table_name(table, month) for month in _existing_monthly(table)
+            if (start is None or to_datetime(next_month(month)) > start)
+            and (end is None or to_datetime(month) < end)]
+
+
+def _fetch_column(sql, values):
+    conn = MySQL().connect(read=True)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(sql, values)
+        return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        print(f"[ERROR] Failed to list partitions: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _execute(table, statements):
+    conn = MySQL().connect()
+    cursor = conn.cursor()
+
+    try:
+        for sql in statements:
+            cursor.execute(sql)
+        conn.commit()
+        query_cache.invalidate(table)
+        return True
+    except Exception as e:
+        print(f"[ERROR] Partition maintenance failed: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,74 @@
+# projection.py
+#
+# This file defines the `Projection` class returned by `Model.only()` and `Model.defer()`. A
+# projection runs the usual read methods (`get`, `get_all`, `query`, `join`, and the async
+# `aget`, `aget_all`, `aquery`, `astream`) but selects only some of the model's columns instead
+# of `SELECT *`.
+#
+# Columns left out of the projection are "deferred": instances are built without them and load
+# them on first access, one query per instance. To load a deferred column for many instances at
+# once, call `Model.load_deferred(instances, "column")`, which issues one batched query per chunk.
+# The primary key is always selected so deferred columns can be loaded later.
+#
+# Example usage:
+#
+#   documents = Document.defer("content").query(organization_id=1)   # no content transferred
+#   titles = [doc.title for doc in documents]
+#
+#   Document.load_deferred(documents[:20], "content")                # one query for 20 bodies
+#   print(documents[0].content)
+#
+#   Document.only("title").get_all()                                  # document_id and title only
+
+
+class Projection:
+    def __init__(self, model, columns):
+        unknown = [col for col in columns if col not in model._columns()]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {model.__name__}: {', '.join(unknown)}")
+
+        pk_columns = model._primary_keys()
+        self.model = model
+        self.columns = pk_columns + [col for col in model._columns() if col in columns and col not in pk_columns]
+        self.deferred = [col for col in model._columns() if col not in self.columns]
+
+    def only(self, *columns):
+        """Narrow the projection to `columns` (plus the primary key)."""
+        return Projection(self.model, [col for col in self.columns if col in columns])
+
+    def defer(self, *columns):
+        """Remove `columns` from the projection."""
+        return Projection(self.model, [col for col in self.columns if col not in columns])
+
+    def select_list(self, table=None):
+        """Return the SQL select list, with columns qualified by `table` if given."""
+        prefix = f"{table}." if table else ""
+        return ", ".join(f"{prefix}{col}" for col in self.columns)
+
+    def get(self, table, id):
+        return self.model._get(table, id, projection=self)
+
+    def get_all(self, table=None):
+        return self.model._get_all(table, projection=self)
+
+    def query(self, **filters):
+        return self.model._query(filters, projection=self)
+
+    def join(self, join_model, on=None, where=None):
+        return self.model._join(join_model, on, where, projection=self)
+
+    async def aget(self, table, id):
+        from orm import aio
+        return await aio.aget(self.model, table, id, projection=self)
+
+    async def aget_all(self, table=None):
+        from orm import aio
+        return await aio.aget_all(self.model, table, projection=self)
+
+    async def aquery(self, **filters):
+        from orm import aio
+        return await aio.aquery(self.model, filters, projection=self)
+
+    def astream(self, chunk_size=1000, **filters):
+        from orm import aio
+        return aio.astream(self.model, filters, chunk_size, projection=self)
@@ -0,0 +1,226 @@
+# access_index.py
+#
+# This file defines the `AccessIndex` class, an in-memory view of the `AccessControlEntry` table
+# used to answer "can this user access this document?" without a database round trip.
+#
+# Business Requirement #1 revokes expired grants with a daily MySQL EVENT, so between two sweeps
+# the table still holds grants that are no longer valid. The index fixes both problems:
+#   - `can_access()` is a single dictionary lookup keyed by `(user_id, document_id)` that also
+#     checks the grant's own `expires_at`, so the answer is correct to the second.
+#   - A min-heap ordered by `expires_at` tells the background thread exactly when the next grant
+#     runs out. Expired grants are moved to `AccessRevocationLog` and deleted from
+#     `AccessControlEntry` in batches, one transaction per batch.
+#   - `attach()` registers listeners on `AccessControlEntry` so every `save()` and `delete()` made
+#     through the ORM is reflected in the index immediately.
+#
+# Heap entries are never removed in place. When a grant is re-saved or deleted, its old heap entry
+# is left behind and skipped when popped because it no longer matches the map ("lazy deletion").
+#
+# Example usage:
+#
+#   index = AccessIndex()
+#   index.load()     # bulk-load every grant
+#   index.attach()   # follow AccessControlEntry.save()/delete()
+#   index.start()    # expire grants on time in a background thread
+#
+#   if index.can_access(user_id=7, document_id=42, access_type="read"):
+#       ...
+
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+
+from orm.cache import query_cache
+from orm.datatypes import to_datetime
+from orm.dbconnectors import MySQL
+from models.models import AccessControlEntry, AccessRevocationLog
+
+
+class AccessIndex:
+    def __init__(self, batch_size=500, flush_interval=5.0, clock=datetime.now):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._entries = {}   # (user_id, document_id) -> (access_type, expires_at)
+        self._heap = []      # (expires_at, user_id, document_id)
+        self._expired = []   # rows waiting to be written to AccessRevocationLog
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._stopped = False
+
+    def load(self):
+        """Replace the index contents with every row of `AccessControlEntry`, read in one query."""
+        entries = AccessControlEntry.get_all()
+        with self._lock:
+            self._entries = {}
+            for entry in entries:
+                expires_at = entry.expires_at
+                self._entries[(entry.user_id, entry.document_id)] = (entry.access_type, expires_at)
+            self._heap = [(expires_at, user_id, document_id)
+                          for (user_id, document_id), (_, expires_at) in self._entries.items()
+                          if expires_at is not None]
+            heapq.heapify(self._heap)
+            self._wakeup.notify()
+        return len(self._entries)
+
+    def attach(self):
+        """Keep the index in sync with `AccessControlEntry` writes made through the ORM."""
+        AccessControlEntry.listen("save", self._on_save)
+        AccessControlEntry.listen("bulk_insert", self._on_bulk_insert)
+        AccessControlEntry.listen("delete", self._on_delete)
+
+    def can_access(self, user_id, document_id, access_type=None):
+        """Return True if the user holds an unexpired grant on the document.
+
+        If `access_type` is given, the grant must also be of that type.
+        """
+        entry = self._entries.get((user_id, document_id))
+        if entry is None:
+            return False
+        granted_type, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            return False
+        return access_type is None or granted_type == access_type
+
+    def expire(self, now=None):
+        """Drop every grant whose `expires_at` has passed and queue it for revocation logging.
+
+        Returns the number of grants expired. A full batch is flushed to the database right away.
+        """
+        now = now or self._clock()
+        expired = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, user_id, document_id = heapq.heappop(self._heap)
+                key = (user_id, document_id)
+                entry = self._entries.get(key)
+                if entry is None or entry[1] != expires_at:
+                    continue
+                del self._entries[key]
+                self._expired.append((user_id, document_id, entry[0], expires_at))
+                expired += 1
+            full = len(self._expired) >= self.batch_size
+        if full:
+            self.flush()
+        return expired
+
+    def flush(self):
+        """Move queued expired grants to `AccessRevocationLog` in a single transaction."""
+        with self._lock:
+            batch, self._expired = self._expired, []
+            self._last_flush = time.monotonic()
+        if not batch:
+            return 0
+
+        log_table = AccessRevocationLog.__name__.lower()
+        acl_table = AccessControlEntry.__name__.lower()
+        keys = " OR ".join(["(user_id = %s AND document_id = %s AND expires_at <= %s)"] * len(batch))
+        key_values = [value for user_id, document_id, _, expires_at in batch
+                      for value in (user_id, document_id, _whole_second_after(expires_at))]
+
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.executemany(
+                f"INSERT INTO {log_table} (user_id, document_id, access_type, revoked_at) "
+                f"VALUES (%s, %s, %s, %s)",
+                batch,
+            )
+            # Matching on expires_at leaves alone any grant that was renewed after it expired here.
+            # The DATETIME column rounds away the microseconds `_on_save()` may have seen, so the
+            # bound is the next whole second.
+            cursor.execute(
+                f"DELETE FROM {acl_table} WHERE {keys}",
+                key_values,
+            )
+            conn.commit()
+            query_cache.invalidate(log_table)
+            query_cache.invalidate(acl_table)
+            return len(batch)
+        except Exception as e:
+            print(f"[ERROR] Failed to flush expired access entries: {e}")
+            conn.rollback()
+            with self._lock:
+                self._expired[:0] = batch
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    def start(self):
+        """Start the background thread that expires grants as their `expires_at` is reached."""
+        if self._thread is not None:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="access-index-expiry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and flush any grants still waiting to be logged."""
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if self._stopped:
+                    return
+                delay = self._next_delay()
+                if delay is None or delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+            self.expire()
+            if self._expired and time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def _next_delay(self):
+        """Seconds until the next expiry or pending flush, or None if there is nothing to wait for."""
+        delays = []
+        if self._heap:
+            delays.append((self._heap[0][0] - self._clock()).total_seconds())
+        if self._expired:
+            delays.append(self.flush_interval - (time.monotonic() - self._last_flush))
+        return min(delays) if delays else None
+
+    def _on_save(self, entry):
+        key = (entry.user_id, entry.document_id)
+        expires_at = to_datetime(entry.expires_at)
+        with self._lock:
+            self._entries[key] = (entry.access_type, expires_at)
+            if expires_at is not None:
+                heapq.heappush(self._heap, (expires_at, entry.user_id, entry.document_id))
+                if self._heap[0][0] == expires_at:
+                    self._wakeup.notify()
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._compact()
+
+    def _on_bulk_insert(self, entries):
+        for entry in entries:
+            self._on_save(entry)
+
+    def _on_delete(self, keys):
+        with self._lock:
+            self._entries.pop((keys.get("user_id"), keys.get("document_id")), None)
+
+    def _compact(self):
+        """Rebuild the heap without the stale entries left behind by re-saved or deleted grants."""
+        self._heap = [(expires_at, user_id, document_id)
+                      for (user_id, document_id), (_, expires_at) in self._entries.items()
+                      if expires_at is not None]
+        heapq.heapify(self._heap)
+
+
+def _whole_second_after(value):
+    """Round `value` up to a whole second, the latest a DATETIME column could have stored it as."""
+    if value.microsecond == 0:
+        return value
+    return value.replace(microsecond=0) + timedelta(seconds=1)
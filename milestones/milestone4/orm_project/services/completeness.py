@@ -0,0 +1,275 @@
+# completeness.py
+#
+# This file defines the `CompletenessTracker` class, which keeps a precomputed answer to Business
+# Requirement #6: has every required role signed this document?
+#
+# `CheckDocumentSignature` joins `Signature`, `User` and `Role` for each check. Here the answer is
+# stored in two small tables and kept up to date as signatures are written:
+#   - `DocumentRoleSignature` counts the unrevoked signatures per `(document_id, role_id)`, for the
+#     required roles only.
+#   - `DocumentCompleteness` holds one row per document with `signed_mask` (bit i is set when
+#     required role i has signed) and `complete`. It is indexed on `(organization_id, complete)`.
+#
+# `attach()` registers listeners so that writes made through the ORM update both tables:
+#   - A `Signature` insert adds one to the signer's role count.
+#   - A `SignatureRevocation` insert takes one from it. Only the first revocation of a signature
+#     is counted: the update also inserts the signature into `countedrevocation`, whose primary
+#     key is `signature_id`, and subtracts only the signatures this insert added. This holds when
+#     one bulk insert revokes a signature twice, and when two revocations are written at once.
+#   - A `Document` insert adds the document with an empty mask, so it is listed as pending.
+# The affected documents' masks are then recomputed from their counts, using primary key lookups.
+#
+# `is_fully_signed()` reads one row by primary key, and `pending_documents()` reads the index.
+# Neither joins.
+#
+# Counts use the signer's role at signing time. Run `rebuild()` after changing a user's role,
+# after deleting signatures, or after writes made outside the ORM:
+#
+#   python -m services.completeness rebuild
+#
+# Example usage:
+#
+#   tracker = CompletenessTracker()          # required roles: admin and verifier
+#   tracker.ensure_tables()
+#   tracker.attach()
+#
+#   if tracker.is_fully_signed(42):
+#       ...
+#   tracker.pending_documents(organization_id=1)   # [document_id, ...]
+
+import argparse
+import uuid
+
+from orm.cache import query_cache
+from orm.dbconnectors import MySQL
+from models.models import (Document, DocumentCompleteness, DocumentRoleSignature, Role, Signature,
+                           SignatureRevocation, User)
+
+
+COUNT_TABLE = DocumentRoleSignature.__name__.lower()
+STATUS_TABLE = DocumentCompleteness.__name__.lower()
+SIGNATURE_TABLE = Signature.__name__.lower()
+REVOCATION_TABLE = SignatureRevocation.__name__.lower()
+USER_TABLE = User.__name__.lower()
+DOCUMENT_TABLE = Document.__name__.lower()
+COUNTED_TABLE = "countedrevocation"
+
+CREATE_COUNT_SQL = f"""
+CREATE TABLE IF NOT EXISTS {COUNT_TABLE} (
+    document_id INT NOT NULL,
+    role_id INT NOT NULL,
+    signature_count INT NOT NULL,
+    PRIMARY KEY (document_id, role_id)
+)
+"""
+
+CREATE_STATUS_SQL = f"""
+CREATE TABLE IF NOT EXISTS {STATUS_TABLE} (
+    document_id INT NOT NULL PRIMARY KEY,
+    organization_id INT,
+    signed_mask INT NOT NULL,
+    complete BOOLEAN NOT NULL,
+    INDEX idx_{STATUS_TABLE}_organization_complete (organization_id, complete)
+)
+"""
+
+CREATE_COUNTED_SQL = f"""
+CREATE TABLE IF NOT EXISTS {COUNTED_TABLE} (
+    signature_id BIGINT NOT NULL PRIMARY KEY,
+    batch CHAR(32) NOT NULL,
+    INDEX idx_{COUNTED_TABLE}_batch (batch)
+)
+"""
+
+
+class CompletenessTracker:
+    def __init__(self, required_roles=("admin", "verifier")):
+        self.required_roles = tuple(required_roles)
+        self._role_ids = None
+
+    def ensure_tables(self):
+        """Create the count, status and counted revocation tables if they do not exist."""
+        return self._execute([(CREATE_COUNT_SQL, ()), (CREATE_STATUS_SQL, ()), (CREATE_COUNTED_SQL, ())])
+
+    def attach(self):
+        """Keep the tables up to date with signatures, revocations and documents written through the ORM."""
+        Signature.listen("insert", lambda signature: self._on_signatures([signature]))
+        Signature.listen("bulk_insert", self._on_signatures)
+        SignatureRevocation.listen("insert", lambda revocation: self._on_revocations([revocation]))
+        SignatureRevocation.listen("bulk_insert", self._on_revocations)
+        Document.listen("insert", lambda document: self._on_documents([document]))
+        Document.listen("bulk_insert", self._on_documents)
+
+    def is_fully_signed(self, document_id):
+        status = DocumentCompleteness.get(STATUS_TABLE, document_id)
+        return bool(status and status.complete)
+
+    def missing_roles(self, document_id):
+        """Return the titles of the required roles that have not signed the document yet."""
+        status = DocumentCompleteness.get(STATUS_TABLE, document_id)
+        mask = status.signed_mask if status else 0
+        return [title for bit, title in enumerate(self.required_roles) if not mask & (1 << bit)]
+
+    def pending_documents(self, organization_id):
+        """Return the ids of the organization's documents still missing a required signature."""
+        rows = DocumentCompleteness.only("document_id").query(organization_id=organization_id, complete=False)
+        return [row.document_id for row in rows]
+
+    def rebuild(self):
+        """Recompute the tables from `Signature`, `SignatureRevocation` and `Document`.
+
+        Runs in a single transaction, so readers see either the old or the new state.
+        """
+        role_ids = self.role_ids()
+        roles = ", ".join(["%s"] * len(role_ids))
+        return self._execute([
+            (f"DELETE FROM {COUNT_TABLE}", ()),
+            (f"INSERT INTO {COUNT_TABLE} (document_id, role_id, signature_count) "
+             f"SELECT s.document_id, u.role_id, COUNT(*) FROM {SIGNATURE_TABLE} s "
+             f"JOIN {USER_TABLE} u ON u.user_id = s.user_id "
+             f"WHERE s.document_id IS NOT NULL AND u.role_id IN ({roles}) AND NOT EXISTS "
+             f"(SELECT 1 FROM {REVOCATION_TABLE} r WHERE r.signature_id = s.signature_id) "
+             f"GROUP BY s.document_id, u.role_id", role_ids),
+            (f"DELETE FROM {COUNTED_TABLE}", ()),
+            (f"INSERT INTO {COUNTED_TABLE} (signature_id, batch) "
+             f"SELECT DISTINCT signature_id, 'rebuild' FROM {REVOCATION_TABLE} WHERE signature_id IS NOT NULL", ()),
+            (f"DELETE FROM {STATUS_TABLE}", ()),
+            self._refresh_sql(None),
+        ])
+
+    def role_ids(self):
+        """Return the ids of the required roles, in the order of their mask bits."""
+        if self._role_ids is None:
+            role_ids = []
+            for title in self.required_roles:
+                roles = Role.query(title=title)
+                if not roles:
+                    raise ValueError(f"Required role {title!r} does not exist")
+                role_ids.append(roles[0].role_id)
+            self._role_ids = role_ids
+        return self._role_ids
+
+    def _on_signatures(self, signatures):
+        signatures = [s for s in signatures if s.document_id is not None and s.user_id is not None]
+        if not signatures:
+            return
+        role_ids = self.role_ids()
+        roles = ", ".join(["%s"] * len(role_ids))
+        statements = [
+            (f"INSERT INTO {COUNT_TABLE} (document_id, role_id, signature_count) "
+             f"SELECT %s, role_id, 1 FROM {USER_TABLE} WHERE user_id = %s AND role_id IN ({roles}) "
+             f"ON DUPLICATE KEY UPDATE signature_count = signature_count + 1",
+             (signature.document_id, signature.user_id, *role_ids))
+            for signature in signatures
+        ]
+        statements.append(self._refresh_sql({s.document_id for s in signatures}))
+        self._execute(statements)
+
+    def _on_revocations(self, revocations):
+        signature_ids = sorted({r.signature_id for r in revocations if r.signature_id is not None})
+        if not signature_ids:
+            return
+        keys = ", ".join(["%s"] * len(signature_ids))
+        documents = self._fetch_column(
+            f"SELECT DISTINCT document_id FROM {SIGNATURE_TABLE} "
+            f"WHERE signature_id IN ({keys}) AND document_id IS NOT NULL", signature_ids)
+        if not documents:
+            return
+        # Signatures already in the counted table were subtracted by an earlier revocation. The
+        # upsert leaves their batch unchanged, so only the ones it adds carry this batch.
+        batch = uuid.uuid4().hex
+        self._execute([
+            (f"INSERT INTO {COUNTED_TABLE} (signature_id, batch) VALUES "
+             f"{', '.join(['(%s, %s)'] * len(signature_ids))} "
+             f"ON DUPLICATE KEY UPDATE batch = batch",
+             [value for signature_id in signature_ids for value in (signature_id, batch)]),
+            (f"UPDATE {COUNT_TABLE} c JOIN ("
+             f"SELECT s.document_id, u.role_id, COUNT(*) AS revoked FROM {SIGNATURE_TABLE} s "
+             f"JOIN {USER_TABLE} u ON u.user_id = s.user_id "
+             f"JOIN {COUNTED_TABLE} k ON k.signature_id = s.signature_id "
+             f"WHERE k.batch = %s "
+             f"GROUP BY s.document_id, u.role_id) AS revocations "
+             f"ON revocations.document_id = c.document_id AND revocations.role_id = c.role_id "
+             f"SET c.signature_count = GREATEST(c.signature_count - revocations.revoked, 0)",
+             (batch,)),
+            self._refresh_sql(documents),
+        ])
+
+    def _on_documents(self, documents):
+        document_ids = {document.document_id for document in documents if document.document_id is not None}
+        if document_ids:
+            self._execute([self._refresh_sql(document_ids)])
+
+    def _refresh_sql(self, document_ids):
+        """Return the upsert recomputing the status of `document_ids`, or of every document if None."""
+        role_ids = self.role_ids()
+        cases = " ".join(f"WHEN %s THEN {1 << bit}" for bit in range(len(role_ids)))
+        full_mask = (1 << len(role_ids)) - 1
+        values = list(role_ids)
+        where = ""
+        if document_ids is not None:
+            document_ids = sorted(document_ids)
+            where = f"WHERE d.document_id IN ({', '.join(['%s'] * len(document_ids))})"
+            values += document_ids
+        sql = (
+            f"INSERT INTO {STATUS_TABLE} (document_id, organization_id, signed_mask, complete) "
+            f"SELECT document_id, organization_id, mask, mask = {full_mask} FROM ("
+            f"SELECT d.document_id, d.organization_id, COALESCE(BIT_OR(CASE c.role_id {cases} END), 0) AS mask "
+            f"FROM {DOCUMENT_TABLE} d LEFT JOIN {COUNT_TABLE} c "
+            f"ON c.document_id = d.document_id AND c.signature_count > 0 "
+            f"{where} GROUP BY d.document_id, d.organization_id) AS status "
+            f"ON DUPLICATE KEY UPDATE organization_id = VALUES(organization_id), "
+            f"signed_mask = VALUES(signed_mask), complete = VALUES(complete)"
+        )
+        return sql, values
+
+    def _fetch_column(self, sql, values):
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(sql, values)
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"[ERROR] Completeness lookup failed: {e}")
+            return []
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _execute(self, statements):
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            for sql, values in statements:
+                cursor.execute(sql, values)
+            conn.commit()
+            query_cache.invalidate(COUNT_TABLE)
+            query_cache.invalidate(STATUS_TABLE)
+            return True
+        except Exception as e:
+            print(f"[ERROR] Completeness update failed: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the document signature completeness tables.")
+    parser.add_argument("--roles", default="admin,verifier", help="comma-separated required role titles")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="recompute completeness from Signature and SignatureRevocation")
+    args = parser.parse_args(argv)
+
+    tracker = CompletenessTracker(required_roles=[title.strip() for title in args.roles.split(",")])
+    tracker.ensure_tables()
+    if args.command == "rebuild":
+        if tracker.rebuild():
+            print(f"[INFO] Rebuilt {COUNT_TABLE} and {STATUS_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# expiry_scanner.py
+#
+# This file defines the `ExpiryScanner` class, which notifies certificate owners ahead of expiry
+# for Business Requirement #7 (certificates expiring within 7 days).
+#
+# The `LogExpiringCertificates` event re-reads every certificate on each run and logs the same
+# certificate again every day of its 7-day window. The scanner instead keeps a watermark: the last
+# `expiration_date` it has already handled.
+#   - Each `scan()` reads only certificates with `watermark < expiration_date <= today + lead_days`,
+#     through an index on `expiration_date`. The cost depends on how many certificates entered the
+#     window since the last run, not on the size of `DigitalCertificate`.
+#   - A `Notification` with no `document_id` is created for the owner of each certificate. The
+#     notifications and a new `CertificateExpiryScan` row recording the watermark are written in
+#     one transaction with `Base.flush()`, so a run either notifies and advances the watermark or
+#     does neither.
+#   - The watermark is the largest `covered_until` of this scanner's rows, whose primary key is
+#     `(scanner, covered_until)`. If two processes scan the same range at once, the second insert
+#     fails and its notifications are rolled back, so nobody is notified twice.
+#   - `start()` runs `scan()` every `interval` seconds in a background thread. Each `scan()` can
+#     also be called from cron with `python -m services.expiry_scanner scan`.
+#
+# `notification.document_id` is NOT NULL in the original schema. Apply
+# `migrations/0002_nullable_notification_document.sql` first; `ensure_schema()` raises until then.
+#
+# The first scan starts at today. A certificate inserted later with an `expiration_date` at or
+# before the watermark is not picked up; call `reset(before)` to scan such a range again.
+#
+# Example usage:
+#
+#   scanner = ExpiryScanner(lead_days=7, interval=3600)
+#   scanner.ensure_schema()
+#   scanner.start()
+
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+
+from orm.base import Base
+from orm.cache import query_cache
+from orm.dbconnectors import MySQL
+from models.models import CertificateExpiryScan, DigitalCertificate, Notification
+
+
+SCAN_TABLE = CertificateExpiryScan.__name__.lower()
+CERTIFICATE_TABLE = DigitalCertificate.__name__.lower()
+NOTIFICATION_TABLE = Notification.__name__.lower()
+EXPIRATION_INDEX = "idx_digitalcertificate_expiration_date"
+
+CREATE_SCAN_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SCAN_TABLE} (
+    scanner VARCHAR(50) NOT NULL,
+    covered_until DATE NOT NULL,
+    scanned_at DATETIME NOT NULL,
+    certificate_count INT NOT NULL,
+    PRIMARY KEY (scanner, covered_until)
+)
+"""
+
+CREATE_INDEX_SQL = f"CREATE INDEX {EXPIRATION_INDEX} ON {CERTIFICATE_TABLE} (expiration_date)"
+
+NULLABLE_SQL = (
+    "SELECT is_nullable FROM information_schema.columns "
+    "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s"
+)
+
+INDEX_EXISTS_SQL = (
+    "SELECT COUNT(*) FROM information_schema.statistics "
+    "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s"
+)
+
+
+class ExpiryScanner:
+    def __init__(self, lead_days=7, interval=24 * 60 * 60, name="certificate-expiry",
+                 clock=datetime.now):
+        self.lead_days = lead_days
+        self.interval = interval
+        self.name = name
+        self._clock = clock
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def ensure_schema(self):
+        """Create the scan table and the `expiration_date` index if they do not exist.
+
+        Raises ValueError if `notification.document_id` is still NOT NULL.
+        """
+        statements = [CREATE_SCAN_SQL]
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(NULLABLE_SQL, (NOTIFICATION_TABLE, "document_id"))
+            row = cursor.fetchone()
+            if row is not None and row[0] != "YES":
+                raise ValueError(f"{NOTIFICATION_TABLE}.document_id is NOT NULL; "
+                                 f"apply migrations/0002_nullable_notification_document.sql first")
+            cursor.execute(INDEX_EXISTS_SQL, (CERTIFICATE_TABLE, EXPIRATION_INDEX))
+            if cursor.fetchone()[0] == 0:
+                statements.append(CREATE_INDEX_SQL)
+            for sql in statements:
+                cursor.execute(sql)
+            conn.commit()
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"[ERROR] Failed to prepare expiry scanner schema: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def watermark(self):
+        """Return the last `expiration_date` already scanned, or None before the first scan."""
+        rows = CertificateExpiryScan.aggregate(max="covered_until", where={"scanner": self.name})
+        return rows[0].max_covered_until if rows else None
+
+    def scan(self):
+        """Notify owners of certificates that entered the expiry window. Returns how many."""
+        now = self._clock()
+        horizon = now.date() + timedelta(days=self.lead_days)
+        watermark = self.watermark()
+        if watermark is not None and watermark >= horizon:
+            return 0
+
+        if watermark is None:
+            expiring = DigitalCertificate.only("user_id", "expiration_date").query(
+                expiration_date__between=(now.date(), horizon))
+        else:
+            expiring = DigitalCertificate.only("user_id", "expiration_date").query(
+                expiration_date__gt=watermark, expiration_date__lte=horizon)
+
+        notifications = [
+            Notification(
+                user_id=certificate.user_id,
+                document_id=None,
+                timestamp=now,
+                type="certificate-expiry",
+                content=(f"Certificate {certificate.digital_certificate_id} expires on "
+                         f"{certificate.expiration_date}"),
+                read_unread=False,
+            )
+            for certificate in expiring if certificate.user_id is not None
+        ]
+        scan = CertificateExpiryScan(scanner=self.name, covered_until=horizon, scanned_at=now,
+                                     certificate_count=len(notifications))
+        if not Base.flush(notifications + [scan]):
+            return 0
+        if notifications:
+            print(f"[INFO] Notified {len(notifications)} certificate owner(s) of expiry up to {horizon}")
+        return len(notifications)
+
+    def reset(self, before):
+        """Forget scans that covered `before` or later, so that range is scanned again."""
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(f"DELETE FROM {SCAN_TABLE} WHERE scanner = %s AND covered_until >= %s",
+                           (self.name, before))
+            conn.commit()
+            query_cache.invalidate(SCAN_TABLE)
+        except Exception as e:
+            print(f"[ERROR] Failed to reset expiry scanner: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def start(self):
+        """Scan now and then every `interval` seconds in a background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="certificate-expiry-scanner", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"[ERROR] Certificate expiry scan failed: {e}")
+            self._stopped.wait(self.interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Notify owners of certificates that expire soon.")
+    parser.add_argument("--lead-days", type=int, default=7, help="days ahead to look (default 7)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("scan", help="scan once and exit")
+    watch = commands.add_parser("watch", help="scan on a schedule until interrupted")
+    watch.add_argument("--interval", type=float, default=3600, help="seconds between scans")
+    reset = commands.add_parser("reset", help="scan again from a date on the next run")
+    reset.add_argument("before", type=date.fromisoformat, help="YYYY-MM-DD")
+    args = parser.parse_args(argv)
+
+    scanner = ExpiryScanner(lead_days=args.lead_days, interval=getattr(args, "interval", 0))
+    scanner.ensure_schema()
+    if args.command == "scan":
+        scanner.scan()
+    elif args.command == "reset":
+        scanner.reset(args.before)
+    else:
+        scanner.start()
+        try:
+            scanner._thread.join()
+        except KeyboardInterrupt:
+            scanner.stop()
+
+
+if __name__ == "__main__":
+    main()
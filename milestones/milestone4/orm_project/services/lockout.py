@@ -0,0 +1,174 @@
+# lockout.py
+#
+# This file defines the `LockoutTracker` class, which enforces Business Requirement #9: lock a
+# user out after 3 failed verification attempts and restore access after 24 hours.
+#
+# Reading `Session.failedAttempts`, adding one and saving it back is a read-modify-write that loses
+# updates when two failed attempts arrive at the same time. The tracker avoids that by:
+#   - Counting failures per user in memory over a sliding time window. Each user's counter is
+#     guarded by one of a fixed set of striped locks, so concurrent attempts for different users
+#     do not contend.
+#   - Persisting each failure with a single atomic `UPDATE ... SET failedAttempts = failedAttempts + 1`
+#     on the user's latest `Session` row, which also sets `lockedUntil` when the limit is reached.
+#     A user with no `Session` row gets one, with `result = 'failure'` so that the
+#     `BeforeSessionInsertLockout` trigger keeps its attempt count and lock. The user's `User` row
+#     is locked with `SELECT ... FOR UPDATE` first, so two processes cannot both find no session
+#     and insert two.
+#   - Ignoring failures while the user is locked, so repeated attempts do not extend the lock.
+#   - Caching `lockedUntil` per user, so `is_locked()` is a dictionary lookup and never touches the
+#     database.
+#
+# The cache only sees failures recorded by this process. Call `load()` at startup (and periodically
+# if several processes share the database) to pick up locks recorded elsewhere.
+#
+# Example usage:
+#
+#   lockout = LockoutTracker()
+#   lockout.load()
+#
+#   if lockout.is_locked(user_id):
+#       reject()
+#   elif verify(...):
+#       lockout.record_success(user_id)
+#   else:
+#       lockout.record_failure(user_id)
+
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from orm.cache import query_cache
+from orm.dbconnectors import MySQL
+from models.models import Session, User
+
+
+class LockoutTracker:
+    def __init__(self, max_attempts=3, window=timedelta(hours=24), lock_duration=timedelta(hours=24),
+                 clock=datetime.now, stripes=64):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lock_duration = lock_duration
+        self._clock = clock
+        self._failures = {}       # user_id -> deque of failure times inside the window
+        self._locked_until = {}   # user_id -> datetime
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+
+    def load(self):
+        """Load the currently active locks from `Session` into the cache."""
+        table = Session.__name__.lower()
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                f"SELECT user_id, MAX(lockedUntil) FROM {table} "
+                f"WHERE lockedUntil IS NOT NULL AND lockedUntil > %s GROUP BY user_id",
+                (self._clock(),),
+            )
+            self._locked_until = dict(cursor.fetchall())
+            return len(self._locked_until)
+        except Exception as e:
+            print(f"[ERROR] Failed to load account locks: {e}")
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    def is_locked(self, user_id):
+        """Return True if the user is locked out. Never queries the database."""
+        until = self._locked_until.get(user_id)
+        return until is not None and until > self._clock()
+
+    def locked_until(self, user_id):
+        """Return the end of the user's current lock, or None if they are not locked."""
+        until = self._locked_until.get(user_id)
+        return until if until is not None and until > self._clock() else None
+
+    def record_failure(self, user_id):
+        """Record a failed attempt. Returns True if this attempt locked the account.
+
+        Attempts made while the account is locked are ignored, so they do not extend the lock.
+        """
+        now = self._clock()
+        locked_until = None
+
+        with self._stripe(user_id):
+            until = self._locked_until.get(user_id)
+            if until is not None and until > now:
+                return False
+            failures = self._failures.setdefault(user_id, deque())
+            while failures and failures[0] <= now - self.window:
+                failures.popleft()
+            failures.append(now)
+            if len(failures) >= self.max_attempts:
+                locked_until = now + self.lock_duration
+                self._locked_until[user_id] = locked_until
+                failures.clear()
+
+        self._persist_failure(user_id, now, locked_until)
+        return locked_until is not None
+
+    def record_success(self, user_id):
+        """Clear the user's failure count and expired lock. An active lock is left in place."""
+        if self.is_locked(user_id):
+            return
+        with self._stripe(user_id):
+            had_failures = bool(self._failures.pop(user_id, None))
+            had_lock = self._locked_until.pop(user_id, None) is not None
+        if had_failures or had_lock:
+            self._execute(
+                "UPDATE {table} SET failedAttempts = 0, lockedUntil = NULL "
+                "WHERE user_id = %s ORDER BY start_time DESC LIMIT 1",
+                (user_id,),
+            )
+
+    def _persist_failure(self, user_id, now, locked_until):
+        """Count the failure on the user's latest `Session`, or on a new one if they have none."""
+        table = Session.__name__.lower()
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            # Serializes writers for this user until commit, across processes.
+            cursor.execute(f"SELECT user_id FROM {User.__name__.lower()} WHERE user_id = %s FOR UPDATE",
+                           (user_id,))
+            cursor.fetchall()
+            cursor.execute(
+                f"UPDATE {table} SET lockedUntil = COALESCE(%s, lockedUntil), "
+                f"failedAttempts = COALESCE(failedAttempts, 0) + 1 "
+                f"WHERE user_id = %s ORDER BY start_time DESC LIMIT 1",
+                (locked_until, user_id),
+            )
+            if cursor.rowcount == 0:
+                cursor.execute(
+                    f"INSERT INTO {table} (user_id, start_time, result, failedAttempts, lockedUntil) "
+                    f"VALUES (%s, %s, %s, 1, %s)",
+                    (user_id, now, "failure", locked_until),
+                )
+            conn.commit()
+            query_cache.invalidate(table)
+        except Exception as e:
+            print(f"[ERROR] Failed to persist lockout state: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _execute(self, sql, values):
+        table = Session.__name__.lower()
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(sql.format(table=table), values)
+            conn.commit()
+            query_cache.invalidate(table)
+        except Exception as e:
+            print(f"[ERROR] Failed to persist lockout state: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _stripe(self, user_id):
+        return self._stripes[hash(user_id) % len(self._stripes)]
@@ -0,0 +1,209 @@
+# rollups.py
+#
+# This file defines the `AuditRollups` class, which keeps the `AuditLogRollup` summary table up to
+# date for Business Requirement #10 (monthly summary of user actions).
+#
+# `GenerateAuditSummary()` rebuilds the summary by scanning `AuditLog`, so the cost of the report
+# grows with the size of the log. Here the summary is maintained incrementally instead:
+#   - `attach()` registers listeners on `AuditLog`. Every row inserted through `save()` or
+#     `bulk_save()` adds one to its `(summary_month, user_id, action, result)` counter with an
+#     `INSERT ... ON DUPLICATE KEY UPDATE`. A bulk insert is counted in Python first and applied
+#     as one multi-row upsert.
+#   - `rebuild()` recomputes the summary from `AuditLog`, for every month or for a single month.
+#     Use it to backfill, and after rows are written outside the ORM (for example by the
+#     `AfterVerificationEventInsert` trigger) or if a process stopped between an insert and its
+#     rollup update.
+#   - `reconcile()` finds the months whose summary total no longer matches the number of
+#     `AuditLog` rows and rebuilds only those. The listener commits after the `AuditLog` insert,
+#     in its own transaction, so a process that stops between the two leaves the summary short
+#     until the next reconcile. Run it from cron (`python -m services.rollups reconcile`).
+#   - `monthly_report()` reads one month of the summary through its primary key.
+#
+# Audit log rows are append-only, so updates and deletes of `AuditLog` rows are not tracked.
+# NULL `user_id`, `action` and `result` values are stored as 0 and '' because they are part of the
+# summary's primary key.
+#
+# Example usage:
+#
+#   rollups = AuditRollups()
+#   rollups.ensure_table()
+#   rollups.attach()
+#   rollups.monthly_report("2025-07")
+#
+# From the command line:
+#
+#   python -m services.rollups rebuild
+#   python -m services.rollups rebuild --month 2025-07
+#   python -m services.rollups reconcile --since 2025-06
+
+import argparse
+from collections import Counter
+from datetime import date
+
+from orm.cache import query_cache
+from orm.dbconnectors import MySQL
+from orm.partitions import month_start, next_month
+from models.models import AuditLog, AuditLogRollup
+
+
+SUMMARY_TABLE = AuditLogRollup.__name__.lower()
+AUDIT_TABLE = AuditLog.__name__.lower()
+
+CREATE_SUMMARY_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+    summary_month DATE NOT NULL,
+    user_id INT NOT NULL,
+    action VARCHAR(255) NOT NULL,
+    result VARCHAR(50) NOT NULL,
+    action_count INT NOT NULL,
+    PRIMARY KEY (summary_month, user_id, action, result)
+)
+"""
+
+UPSERT_SQL = (
+    f"INSERT INTO {SUMMARY_TABLE} (summary_month, user_id, action, result, action_count) VALUES {{rows}} "
+    f"ON DUPLICATE KEY UPDATE action_count = action_count + VALUES(action_count)"
+)
+
+REBUILD_SQL = (
+    f"INSERT INTO {SUMMARY_TABLE} (summary_month, user_id, action, result, action_count) "
+    f"SELECT DATE_FORMAT(timestamp, '%Y-%m-01'), COALESCE(user_id, 0), COALESCE(action, ''), "
+    f"COALESCE(result, ''), COUNT(*) "
+    f"FROM {AUDIT_TABLE} WHERE timestamp IS NOT NULL {{where}} "
+    f"GROUP BY 1, 2, 3, 4"
+)
+
+AUDIT_TOTALS_SQL = (
+    f"SELECT DATE_FORMAT(timestamp, '%Y-%m-01'), COUNT(*) FROM {AUDIT_TABLE} "
+    f"WHERE timestamp >= %s GROUP BY 1"
+)
+
+SUMMARY_TOTALS_SQL = (
+    f"SELECT summary_month, SUM(action_count) FROM {SUMMARY_TABLE} "
+    f"WHERE summary_month >= %s GROUP BY 1"
+)
+
+
+class AuditRollups:
+    def ensure_table(self):
+        """Create the summary table if it does not exist."""
+        self._execute([(CREATE_SUMMARY_SQL, ())])
+
+    def attach(self):
+        """Keep the summary up to date with `AuditLog` inserts made through the ORM."""
+        AuditLog.listen("insert", self._on_insert)
+        AuditLog.listen("bulk_insert", self._on_bulk_insert)
+
+    def monthly_report(self, month):
+        """Return the summary rows for `month` as `AuditLogRollup` instances."""
+        return AuditLogRollup.query(summary_month=month_start(month))
+
+    def rebuild(self, month=None):
+        """Recompute the summary from `AuditLog`, for every month or only for `month`.
+
+        Runs in a single transaction, so readers see either the old or the new counts.
+        """
+        if month is None:
+            statements = [
+                (f"DELETE FROM {SUMMARY_TABLE}", ()),
+                (REBUILD_SQL.format(where=""), ()),
+            ]
+        else:
+            start = month_start(month)
+            end = next_month(start)
+            statements = [
+                (f"DELETE FROM {SUMMARY_TABLE} WHERE summary_month = %s", (start,)),
+                (REBUILD_SQL.format(where="AND timestamp >= %s AND timestamp < %s"), (start, end)),
+            ]
+        return self._execute(statements)
+
+    def reconcile(self, since=None):
+        """Rebuild every month from `since` (default: the previous month) whose summary total differs
+        from its `AuditLog` row count. Returns the rebuilt months.
+        """
+        if since is None:
+            today = date.today()
+            since = date(today.year - (today.month == 1), (today.month - 2) % 12 + 1, 1)
+        start = month_start(since)
+        expected = self._totals(AUDIT_TOTALS_SQL, start)
+        actual = self._totals(SUMMARY_TOTALS_SQL, start)
+        if expected is None or actual is None:
+            return []
+        drifted = sorted(month for month in expected.keys() | actual.keys()
+                         if expected.get(month, 0) != actual.get(month, 0))
+        return [month for month in drifted if self.rebuild(month)]
+
+    def _totals(self, sql, start):
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(sql, (start,))
+            return {month_start(month): int(total) for month, total in cursor.fetchall()}
+        except Exception as e:
+            print(f"[ERROR] Reading audit rollup totals failed: {e}")
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _on_insert(self, entry):
+        self._apply(Counter([self._key(entry)]))
+
+    def _on_bulk_insert(self, entries):
+        self._apply(Counter(self._key(entry) for entry in entries))
+
+    def _key(self, entry):
+        if entry.timestamp is None:
+            return None
+        return (month_start(entry.timestamp), entry.user_id or 0, entry.action or "", entry.result or "")
+
+    def _apply(self, counts):
+        counts.pop(None, None)
+        if not counts:
+            return
+        rows = ", ".join(["(%s, %s, %s, %s, %s)"] * len(counts))
+        values = [value for key, count in counts.items() for value in (*key, count)]
+        self._execute([(UPSERT_SQL.format(rows=rows), values)])
+
+    def _execute(self, statements):
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+
+        try:
+            for sql, values in statements:
+                cursor.execute(sql, values)
+            conn.commit()
+            query_cache.invalidate(SUMMARY_TABLE)
+            return True
+        except Exception as e:
+            print(f"[ERROR] Audit rollup update failed: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the AuditLog monthly rollup table.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser("rebuild", help="recompute the rollup from AuditLog")
+    rebuild.add_argument("--month", help="only rebuild this month (YYYY-MM)")
+    reconcile = commands.add_parser("reconcile", help="rebuild the months whose totals drifted from AuditLog")
+    reconcile.add_argument("--since", help="first month to check (YYYY-MM, default: the previous month)")
+    args = parser.parse_args(argv)
+
+    rollups = AuditRollups()
+    rollups.ensure_table()
+    if args.command == "rebuild":
+        if rollups.rebuild(args.month):
+            print(f"[INFO] Rebuilt {SUMMARY_TABLE}" + (f" for {args.month}" if args.month else ""))
+    elif args.command == "reconcile":
+        rebuilt = rollups.reconcile(args.since)
+        print(f"[INFO] Reconciled {SUMMARY_TABLE}: rebuilt {len(rebuilt)} month(s)"
+              + (f" ({', '.join(m.strftime('%Y-%m') for m in rebuilt)})" if rebuilt else ""))
+
+
+if __name__ == "__main__":
+    main()
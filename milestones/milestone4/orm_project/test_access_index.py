@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from models.models import AccessControlEntry
+from services.access_index import AccessIndex
+
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def grant(user_id, document_id, access_type="read", expires_at=None):
+    return AccessControlEntry(user_id=user_id, document_id=document_id, access_type=access_type,
+                              granted_at=NOW, expires_at=expires_at)
+
+
+def make_index(*grants, batch_size=500):
+    clock = Clock(NOW)
+    index = AccessIndex(batch_size=batch_size, clock=clock)
+    for entry in grants:
+        index._on_save(entry)
+    return index, clock
+
+
+def test_can_access_checks_grant_type_and_expiry():
+    index, clock = make_index(grant(1, 10, "read", NOW + timedelta(hours=1)), grant(2, 10, "write"))
+
+    assert index.can_access(1, 10)
+    assert index.can_access(1, 10, access_type="read")
+    assert not index.can_access(1, 10, access_type="write")
+    assert not index.can_access(1, 11)
+    assert index.can_access(2, 10)
+
+    clock.now = NOW + timedelta(hours=1)
+    assert not index.can_access(1, 10)
+    assert index.can_access(2, 10)
+
+
+def test_expire_pops_only_due_grants_in_expiry_order():
+    index, _ = make_index(grant(1, 10, expires_at=NOW + timedelta(minutes=30)),
+                          grant(2, 10, expires_at=NOW + timedelta(minutes=10)),
+                          grant(3, 10, expires_at=NOW + timedelta(hours=2)),
+                          grant(4, 10))
+
+    assert index.expire(NOW) == 0
+    assert index.expire(NOW + timedelta(hours=1)) == 2
+    assert [row[0] for row in index._expired] == [2, 1]
+    assert index.can_access(3, 10) and index.can_access(4, 10)
+    assert index._next_delay() is not None
+
+
+def test_renewed_grant_skips_its_stale_heap_entry():
+    index, _ = make_index(grant(1, 10, expires_at=NOW + timedelta(minutes=5)))
+    index._on_save(grant(1, 10, expires_at=NOW + timedelta(days=1)))
+
+    assert index.expire(NOW + timedelta(hours=1)) == 0
+    assert index.can_access(1, 10)
+    assert index.expire(NOW + timedelta(days=2)) == 1
+
+
+def test_deleted_grant_is_not_expired():
+    index, _ = make_index(grant(1, 10, expires_at=NOW + timedelta(minutes=5)))
+    index._on_delete({"user_id": 1, "document_id": 10})
+
+    assert not index.can_access(1, 10)
+    assert index.expire(NOW + timedelta(hours=1)) == 0
+
+
+def test_heap_is_compacted_when_mostly_stale():
+    index, _ = make_index()
+    for minute in range(200):
+        index._on_save(grant(1, 10, expires_at=NOW + timedelta(minutes=minute + 1)))
+
+    assert len(index._heap) <= 2 * len(index._entries) + 64
+    assert (NOW + timedelta(minutes=200), 1, 10) in index._heap
+    assert index.expire(NOW + timedelta(minutes=199)) == 0
+
+
+def test_full_batch_is_flushed_in_one_transaction(fake_db):
+    index, _ = make_index(*(grant(user_id, 10, expires_at=NOW + timedelta(minutes=1)) for user_id in range(3)),
+                          batch_size=3)
+
+    assert index.expire(NOW + timedelta(minutes=1)) == 3
+    assert len(fake_db.executed("INSERT INTO accessrevocationlog")) == 3
+    assert len(fake_db.executed("DELETE FROM accesscontrolentry")) == 1
+    assert fake_db.commits == 1
+    assert index._expired == []
+
+
+def test_failed_flush_requeues_the_batch(fake_db):
+    fake_db.respond("DELETE FROM accesscontrolentry", error=RuntimeError("lock wait timeout"))
+    index, _ = make_index(grant(1, 10, expires_at=NOW))
+    index.expire(NOW)
+
+    assert index.flush() == 0
+    assert fake_db.rollbacks == 1
+    assert index._expired == [(1, 10, "read", NOW)]
+
+
+def test_delete_matches_expiry_stored_without_microseconds(fake_db):
+    expires_at = NOW.replace(microsecond=600_000)
+    index, _ = make_index(grant(1, 10, expires_at=expires_at))
+    index.expire(expires_at)
+
+    assert index.flush() == 1
+    (sql, values), = fake_db.executed("DELETE FROM accesscontrolentry")
+    assert "user_id = %s AND document_id = %s AND expires_at <= %s" in sql
+    assert values == (1, 10, NOW + timedelta(seconds=1))
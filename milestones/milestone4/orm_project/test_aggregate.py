@@ -0,0 +1,53 @@
+import pytest
+
+from models.models import AuditLog, Role
+from orm.cache import query_cache
+
+
+def test_grouped_counts_sql_and_rows(fake_db):
+    fake_db.respond("FROM auditlog", rows=[{"user_id": 7, "result": "failure", "count": 4, "max_timestamp": None}])
+
+    rows = AuditLog.aggregate(group_by=["user_id", "result"], count="*", max="timestamp",
+                              where={"action": "verify"}, having={"count": (">=", 3)})
+
+    (sql, values), = fake_db.statements
+    assert sql == ("SELECT user_id, result, COUNT(*) AS count, MAX(timestamp) AS max_timestamp FROM auditlog "
+                   "WHERE action = %s GROUP BY user_id, result HAVING count >= %s")
+    assert values == ("verify", 3)
+    assert rows[0]._fields == ("user_id", "result", "count", "max_timestamp")
+    assert (rows[0].user_id, rows[0].count) == (7, 4)
+
+
+def test_several_columns_per_function(fake_db):
+    AuditLog.aggregate(min=["timestamp", "audit_log_id"], sum="user_id")
+
+    (sql, _), = fake_db.statements
+    assert sql == ("SELECT SUM(user_id) AS sum_user_id, MIN(timestamp) AS min_timestamp, "
+                   "MIN(audit_log_id) AS min_audit_log_id FROM auditlog")
+
+
+@pytest.mark.parametrize("arguments, message", [
+    ({"sum": "nope"}, "Cannot sum unknown column 'nope'"),
+    ({"sum": "*"}, "Cannot sum unknown column"),
+    ({"group_by": ["nope"], "count": "*"}, "Unknown column"),
+    ({"count": "*", "where": {"nope__gte": 1}}, "Unknown column"),
+    ({"group_by": ["user_id"]}, "needs at least one"),
+    ({"count": "*", "having": {"max_timestamp": "> 1"}}, "HAVING refers to 'max_timestamp'"),
+])
+def test_unknown_columns_and_functions_are_rejected(fake_db, arguments, message):
+    with pytest.raises(ValueError, match=message):
+        AuditLog.aggregate(**arguments)
+    assert fake_db.statements == []
+
+
+def test_cached_model_results_are_served_from_cache_until_a_write(fake_db):
+    fake_db.respond("FROM role", rows=lambda sql, values: [{"count": len(fake_db.statements)}])
+
+    first = Role.aggregate(count="*")
+    assert Role.aggregate(count="*") == first
+    assert len(fake_db.executed("COUNT(*)")) == 1
+    assert query_cache.stats()["hits"] == 1
+
+    Role(role_id=1, title="admin", permissions="all").save()
+    assert Role.aggregate(count="*") != first
+    assert len(fake_db.executed("COUNT(*)")) == 2
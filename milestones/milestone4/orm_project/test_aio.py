@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from models.models import AuditLog, Notification, VerificationEvent
+from orm.base import Base
+
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def notification(**fields):
+    return Notification(user_id=7, document_id=10, timestamp=NOW, type="info", content="hi",
+                        read_unread=False, **fields)
+
+
+def test_aget_reads_one_row(fake_db, fake_aio):
+    fake_db.respond("FROM notification", rows=[{"notification_id": 3, "user_id": 7, "content": "hi"}])
+
+    found = asyncio.run(Notification.aget("notification", 3))
+
+    assert (found.notification_id, found.user_id, found.content) == (3, 7, "hi")
+    (sql, values), = fake_db.executed("FROM notification")
+    assert "WHERE notification_id = %s" in sql and values == (3,)
+
+
+def test_aquery_builds_the_blocking_sql(fake_db, fake_aio):
+    fake_db.respond("FROM notification", rows=[{"notification_id": 1}, {"notification_id": 2}])
+
+    found = asyncio.run(Notification.aquery(user_id=7, timestamp__gte=NOW))
+
+    assert [row.notification_id for row in found] == [1, 2]
+    assert fake_db.executed("FROM notification")[0] == Notification._query_sql({"user_id": 7, "timestamp__gte": NOW})
+
+
+def test_asave_inserts_and_reads_back_the_key(fake_db, fake_aio):
+    inserted = []
+    Notification.listen("insert", inserted.append)
+    row = notification()
+
+    asyncio.run(row.asave())
+
+    assert row.notification_id == 1
+    assert inserted == [row]
+    assert len(fake_db.executed("INSERT INTO notification")) == 1 and fake_db.commits == 1
+
+
+def test_client_side_ids_are_assigned_off_the_event_loop(fake_db, fake_aio, monkeypatch):
+    threads = []
+
+    def new_id(model):
+        threads.append(threading.current_thread())
+        return 99
+
+    monkeypatch.setattr(VerificationEvent.__id_strategy__, "new_id", new_id)
+    event = VerificationEvent(user_id=7, document_id=10, timestamp=NOW, result="success")
+
+    asyncio.run(event.asave())
+
+    assert event.verification_event_id == 99
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_aflush_writes_every_model_in_one_transaction(fake_db, fake_aio, monkeypatch):
+    monkeypatch.setattr(VerificationEvent.__id_strategy__, "new_id", lambda model: 5)
+    monkeypatch.setattr(AuditLog.__id_strategy__, "new_id", lambda model: 6)
+    event = VerificationEvent(user_id=7, document_id=10, timestamp=NOW, result="success")
+    log = AuditLog(user_id=7, verification_event_id=5, action="verify", timestamp=NOW, result="success")
+
+    assert asyncio.run(Base.aflush([event, log])) == 2
+
+    tables = [sql.split()[2] for sql, _ in fake_db.statements]
+    assert tables == ["verificationevent", "auditlog"]
+    assert fake_db.commits == 1 and log.audit_log_id == 6
+
+
+def test_failed_aflush_rolls_back(fake_db, fake_aio):
+    fake_db.respond("INSERT INTO notification", error=RuntimeError("deadlock"))
+
+    assert asyncio.run(Base.aflush([notification(), notification()])) == 0
+    assert fake_db.rollbacks == 1 and fake_db.commits == 0
@@ -0,0 +1,72 @@
+import pytest
+
+from models.models import AuditLog
+from orm.bulkload import BulkLoadError, load_file
+
+
+CSV = (
+    "audit_log_id,user_id,action,timestamp,result,method,ip\n"
+    "1,7,upload,2026-03-01 12:00:00,success,C:\\keys\\signer.pem,127.0.0.1\n"
+    "2,7,verify,2026-03-01 12:01:00,failure,,127.0.0.1\n"
+    "3,8,verify,2026-03-01 12:02:00,success,,127.0.0.1\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "auditlog.csv"
+    path.write_text(CSV)
+    return path
+
+
+def test_load_data_keeps_backslashes(fake_db, csv_file):
+    stats = load_file(AuditLog, csv_file)
+
+    (sql, _), = fake_db.executed("LOAD DATA LOCAL INFILE")
+    assert "ESCAPED BY ''" in sql
+    assert stats["method"] == "load_data"
+
+
+def test_batched_insert_loads_every_row(fake_db, csv_file):
+    stats = load_file(AuditLog, csv_file, local_infile=False, chunk_size=2)
+
+    assert stats["rows"] == 3
+    assert len(fake_db.executed("INSERT INTO auditlog")) == 2
+    assert fake_db.executed("INSERT INTO auditlog")[0][1][5] == "C:\\keys\\signer.pem"
+
+
+def test_failed_chunk_raises_with_committed_row_count(fake_db, csv_file):
+    chunks = []
+
+    def fail_second_chunk(sql, values):
+        chunks.append(values)
+        if len(chunks) == 2:
+            raise RuntimeError("duplicate key")
+        return []
+
+    fake_db.respond("INSERT INTO auditlog", rows=fail_second_chunk)
+
+    with pytest.raises(BulkLoadError) as error:
+        load_file(AuditLog, csv_file, local_infile=False, chunk_size=2)
+    assert error.value.rows == 2
+    assert fake_db.commits == 1 and fake_db.rollbacks == 1
+
+
+def test_client_side_keys_are_assigned(fake_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(AuditLog.__id_strategy__, "new_id", lambda model: 99)
+    path = tmp_path / "auditlog.csv"
+    path.write_text("audit_log_id,user_id,action\n,7,upload\n5,7,verify\n")
+
+    stats = load_file(AuditLog, path)
+
+    assert stats["method"] == "insert"
+    assert not fake_db.executed("LOAD DATA")
+    (sql, values), = fake_db.executed("INSERT INTO auditlog")
+    assert values == (99, "7", "upload", "5", "7", "verify")
+
+
+def test_client_side_keys_in_every_row_keep_load_data(fake_db, csv_file):
+    stats = load_file(AuditLog, csv_file)
+
+    assert stats["method"] == "load_data"
+    assert not fake_db.executed("INSERT INTO auditlog")
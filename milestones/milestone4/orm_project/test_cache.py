@@ -0,0 +1,58 @@
+from models.models import Role
+from orm.cache import QueryCache
+
+
+def test_hit_after_put_at_current_versions():
+    cache = QueryCache()
+    versions = cache.snapshot(["role"])
+    cache.put("key", ["role"], versions, [{"role_id": 1}])
+
+    assert cache.get("key") == [{"role_id": 1}]
+    assert cache.stats()["hits"] == 1
+
+
+def test_write_to_any_read_table_invalidates():
+    cache = QueryCache()
+    cache.put("join", ["user", "role"], cache.snapshot(["user", "role"]), [])
+    cache.put("roles", ["role"], cache.snapshot(["role"]), [])
+
+    cache.invalidate("user")
+
+    assert cache.get("join") is None
+    assert cache.get("roles") == []
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["size"] == 1
+
+
+def test_rows_read_before_a_concurrent_write_are_stale():
+    cache = QueryCache()
+    versions = cache.snapshot(["role"])
+    cache.invalidate("role")          # a write lands while the query runs
+    cache.put("key", ["role"], versions, [{"role_id": 1}])
+
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(maxsize=2)
+    for key in ("a", "b"):
+        cache.put(key, ["role"], cache.snapshot(["role"]), [key])
+    cache.get("a")
+    cache.put("c", ["role"], cache.snapshot(["role"]), ["c"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ["a"] and cache.get("c") == ["c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cached_model_reads_once_until_written(fake_db, monkeypatch):
+    monkeypatch.setattr(Role, "__cache__", True, raising=False)
+    fake_db.respond("SELECT * FROM role", rows=lambda sql, values: [{"role_id": 1, "title": "admin"}])
+
+    assert Role.query(title="admin")[0].role_id == 1
+    assert Role.query(title="admin")[0].role_id == 1
+    assert len(fake_db.executed("SELECT * FROM role")) == 1
+
+    Role(role_id=2, title="verifier").save()
+    Role.query(title="admin")
+    assert len(fake_db.executed("SELECT * FROM role")) == 2
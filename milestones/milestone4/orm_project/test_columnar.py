@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytest
+
+from models.models import VerificationEvent
+
+
+def test_docstring_example_columns(fake_db):
+    fake_db.respond("SELECT timestamp, result, document_id FROM verificationevent", rows=[
+        (datetime(2026, 1, 2, 9, 30), "failure", 10),
+        (datetime(2026, 1, 3, 9, 30), "success", None),
+        (datetime(2026, 1, 4, 9, 30), "failure", 11),
+    ])
+
+    events = VerificationEvent.fetch_columns(["timestamp", "result", "document_id"],
+                                             where={"timestamp__gte": "2026-01-01"})
+
+    assert events["result"].count("failure") == 2
+    assert events["timestamp"][0] == datetime(2026, 1, 2, 9, 30)
+    assert list(events["document_id"]) == [10, None, 11]
+
+
+def test_failed_fetch_raises_instead_of_returning_empty_columns(fake_db):
+    fake_db.respond("FROM verificationevent", error=RuntimeError("Lost connection to MySQL server"))
+
+    with pytest.raises(RuntimeError, match="Lost connection"):
+        VerificationEvent.fetch_columns(["result"])
+    assert fake_db.rollbacks == 1
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from models.models import SignatureRevocation
+from services.completeness import CompletenessTracker
+
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def revoke(signature_id):
+    return SignatureRevocation(reason="key compromised", revoked_at=NOW, signature_id=signature_id)
+
+
+def make_tracker(fake_db):
+    fake_db.respond("SELECT DISTINCT document_id", rows=[(10,)])
+    tracker = CompletenessTracker()
+    tracker._role_ids = [1, 2]
+    return tracker
+
+
+def test_signature_revoked_twice_in_one_batch_is_subtracted_once(fake_db):
+    tracker = make_tracker(fake_db)
+
+    tracker._on_revocations([revoke(5), revoke(5), revoke(6)])
+
+    (claim_sql, claimed), = fake_db.executed("INSERT INTO countedrevocation")
+    (sql, (batch,)), = fake_db.executed("UPDATE documentrolesignature")
+    assert claimed == (5, batch, 6, batch)
+    assert "ON DUPLICATE KEY UPDATE batch = batch" in claim_sql
+    assert "k.batch = %s" in sql and "COUNT(*) FROM signaturerevocation" not in sql
+    assert fake_db.commits == 1
+
+
+def test_each_revocation_batch_subtracts_only_its_own_claims(fake_db):
+    tracker = make_tracker(fake_db)
+
+    tracker._on_revocations([revoke(5)])
+    tracker._on_revocations([revoke(5)])
+
+    first, second = (values[0] for _, values in fake_db.executed("UPDATE documentrolesignature"))
+    assert first != second
+
+
+def test_rebuild_marks_every_revoked_signature_counted(fake_db):
+    tracker = make_tracker(fake_db)
+
+    assert tracker.rebuild()
+    assert fake_db.executed("DELETE FROM countedrevocation")
+    assert fake_db.executed("INSERT INTO countedrevocation (signature_id, batch) SELECT DISTINCT")
+
+
+def test_counted_revocations_are_indexed_by_batch(fake_db):
+    CompletenessTracker().ensure_tables()
+
+    (sql, _), = fake_db.executed("CREATE TABLE IF NOT EXISTS countedrevocation")
+    assert "INDEX idx_countedrevocation_batch (batch)" in sql
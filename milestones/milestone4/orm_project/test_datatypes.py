@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+import pytest
+
+from models.models import DigitalCertificate, VerificationEvent
+from orm.datatypes import Date, DateTime, to_date, to_datetime
+
+
+NOW = datetime(2026, 3, 1, 12, 30, 15, 250000)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    (date(2026, 3, 1), date(2026, 3, 1)),
+    (NOW, date(2026, 3, 1)),
+    ("2026-03-01", date(2026, 3, 1)),
+    ("2026-03-01 12:30:15", date(2026, 3, 1)),
+    (b"2026-03-01", date(2026, 3, 1)),
+])
+def test_date_decodes(value, expected):
+    assert Date().to_python(value) == expected
+    assert to_date(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    (NOW, NOW),
+    (date(2026, 3, 1), datetime(2026, 3, 1)),
+    ("2026-03-01 12:30:15.250000", NOW),
+    ("2026-03-01T12:30:15", datetime(2026, 3, 1, 12, 30, 15)),
+    (b"2026-03-01 12:30:15", datetime(2026, 3, 1, 12, 30, 15)),
+])
+def test_datetime_decodes(value, expected):
+    assert DateTime().to_python(value) == expected
+    assert to_datetime(value) == expected
+
+
+def test_bad_text_is_rejected():
+    with pytest.raises(ValueError):
+        to_datetime("yesterday")
+
+
+def test_rows_are_decoded_when_loaded():
+    certificate = DigitalCertificate._from_row({"digital_certificate_id": 1, "issue_date": "2026-01-01",
+                                                "expiration_date": b"2027-01-01"})
+
+    assert certificate.issue_date == date(2026, 1, 1)
+    assert certificate.expiration_date == date(2027, 1, 1)
+
+
+def test_values_are_encoded_as_given(fake_db, monkeypatch):
+    monkeypatch.setattr(VerificationEvent.__id_strategy__, "new_id", lambda model: 1)
+    VerificationEvent(user_id=7, timestamp=NOW, result="success").save()
+
+    (sql, values), = fake_db.executed("INSERT INTO verificationevent")
+    columns = sql.split("(", 1)[1].split(")", 1)[0].split(", ")
+    assert dict(zip(columns, values))["timestamp"] == NOW
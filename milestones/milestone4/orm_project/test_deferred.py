@@ -0,0 +1,39 @@
+from models.models import Notification
+
+
+def rows(sql, values):
+    if sql.startswith("SELECT notification_id, content"):
+        return [{"notification_id": key, "content": f"message {key}"} for key in values]
+    return [{"notification_id": 1, "user_id": 7}, {"notification_id": 2, "user_id": 8}]
+
+
+def test_deferred_column_loads_once_on_access(fake_db):
+    fake_db.respond("FROM notification", rows=rows)
+    first, _ = Notification.defer("content").query(user_id=7)
+
+    assert "content" not in fake_db.statements[0][0].split(" FROM ")[0]
+    assert first.content == "message 1"
+    assert first.content == "message 1"
+    assert len(fake_db.executed("SELECT notification_id, content")) == 1
+
+
+def test_load_deferred_batches_instances(fake_db):
+    fake_db.respond("FROM notification", rows=rows)
+    found = Notification.defer("content").query(user_id=7)
+
+    Notification.load_deferred(found, chunk_size=1000)
+
+    (sql, values), = fake_db.executed("SELECT notification_id, content")
+    assert sql.endswith("WHERE (notification_id) IN ((%s), (%s))") and values == (1, 2)
+    assert [row.content for row in found] == ["message 1", "message 2"]
+    assert len(fake_db.statements) == 2
+
+
+def test_assigned_value_is_kept(fake_db):
+    fake_db.respond("FROM notification", rows=rows)
+    first, second = Notification.defer("content").query(user_id=7)
+    first.content = "edited"
+
+    Notification.load_deferred([first, second])
+
+    assert first.content == "edited"
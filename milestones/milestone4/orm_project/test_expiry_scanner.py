@@ -0,0 +1,43 @@
+from datetime import date, datetime
+
+import pytest
+
+from services.expiry_scanner import ExpiryScanner
+
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def make_scanner(fake_db, watermark=None):
+    fake_db.respond("FROM certificateexpiryscan", rows=[{"max_covered_until": watermark}] if watermark else [])
+    fake_db.respond("FROM digitalcertificate", rows=[
+        {"digital_certificate_id": 3, "user_id": 7, "expiration_date": date(2026, 3, 5)},
+    ])
+    return ExpiryScanner(lead_days=7, clock=lambda: NOW)
+
+
+def test_scan_notifies_owner_and_advances_watermark_together(fake_db):
+    scanner = make_scanner(fake_db, watermark=date(2026, 3, 2))
+
+    assert scanner.scan() == 1
+
+    assert fake_db.executed("FROM digitalcertificate")[0][1] == (date(2026, 3, 2), date(2026, 3, 8))
+    (sql, values), = fake_db.executed("INSERT INTO notification")
+    assert 7 in values and "Certificate 3 expires on 2026-03-05" in values
+    assert fake_db.executed("INSERT INTO certificateexpiryscan")[0][1][:2] == ("certificate-expiry", date(2026, 3, 8))
+    assert fake_db.commits == 1
+
+
+def test_failed_flush_does_not_advance_watermark(fake_db):
+    scanner = make_scanner(fake_db)
+    fake_db.respond("INSERT INTO notification", error=RuntimeError("foreign key constraint fails"))
+
+    assert scanner.scan() == 0
+    assert fake_db.rollbacks == 1 and fake_db.commits == 0
+
+
+def test_ensure_schema_requires_nullable_document_id(fake_db):
+    fake_db.respond("SELECT is_nullable", rows=[("NO",)])
+
+    with pytest.raises(ValueError, match="0002_nullable_notification_document.sql"):
+        ExpiryScanner().ensure_schema()
@@ -0,0 +1,96 @@
+import gzip
+import json
+import sys
+
+import pytest
+
+from models.models import AuditLog
+import orm.export
+from orm.export import export
+
+
+ROWS = [(1, 7, None, "verify", "2026-03-01 12:00:00", "success", "password", "127.0.0.1"),
+        (2, 7, None, "verify", "2026-03-01 12:01:00", "failure", "password", "127.0.0.1")]
+
+
+def test_exports_rows_and_checkpoint(fake_db, tmp_path):
+    fake_db.respond("SELECT", rows=ROWS)
+    checkpoint = tmp_path / "auditlog.ckpt"
+
+    result = export(AuditLog, tmp_path / "auditlog.jsonl", checkpoint=str(checkpoint))
+
+    assert result["rows"] == 2
+    assert json.loads(checkpoint.read_text())["last_key"] == [2]
+
+
+def test_parquet_without_pyarrow_fails_before_reading(fake_db, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ImportError, match="pyarrow"):
+        export(AuditLog, tmp_path / "auditlog.parquet", format="parquet")
+    assert fake_db.statements == []
+
+
+def test_read_failure_is_raised_after_logging(fake_db, tmp_path, capsys):
+    fake_db.respond("SELECT", error=RuntimeError("connection lost"))
+
+    with pytest.raises(RuntimeError, match="connection lost"):
+        export(AuditLog, tmp_path / "auditlog.jsonl")
+    assert "[ERROR] Export of auditlog stopped after 0 rows" in capsys.readouterr().out
+
+
+def audit_rows(sql, values):
+    """Rows 1-4, after the resume key when the query has one."""
+    rows = [(key, 7, None, "verify", "2026-03-01 12:00:00", "success", "password", "127.0.0.1")
+            for key in range(1, 5)]
+    after = values[-1] if "> (%s)" in sql else 0
+    return [row for row in rows if row[0] > after]
+
+
+def crash_on_second_checkpoint(monkeypatch):
+    checkpoints = []
+    write_checkpoint = orm.export._write_checkpoint
+
+    def crash(checkpoint, state):
+        checkpoints.append(state)
+        if len(checkpoints) == 2:
+            raise KeyboardInterrupt("killed")
+        write_checkpoint(checkpoint, state)
+
+    monkeypatch.setattr(orm.export, "_write_checkpoint", crash)
+    return lambda: monkeypatch.setattr(orm.export, "_write_checkpoint", write_checkpoint)
+
+
+@pytest.mark.parametrize("name, compression, read", [
+    ("auditlog.jsonl", None, lambda path: path.read_text()),
+    ("auditlog.jsonl.gz", "gzip", lambda path: gzip.decompress(path.read_bytes()).decode()),
+])
+def test_resume_after_crash_before_checkpoint_writes_each_row_once(fake_db, tmp_path, monkeypatch,
+                                                                   name, compression, read):
+    fake_db.respond("SELECT", rows=audit_rows)
+    path, checkpoint = tmp_path / name, str(tmp_path / "auditlog.ckpt")
+    restore = crash_on_second_checkpoint(monkeypatch)
+
+    with pytest.raises(KeyboardInterrupt):
+        export(AuditLog, path, chunk_size=2, compression=compression, checkpoint=checkpoint)
+    with open(path, "ab") as file:
+        file.write(b"\x1f\x8b partial member")      # a chunk cut off mid-write
+    restore()
+    export(AuditLog, path, chunk_size=2, compression=compression, checkpoint=checkpoint)
+
+    keys = [json.loads(line)["audit_log_id"] for line in read(path).splitlines()]
+    assert keys == [1, 2, 3, 4]
+
+
+def test_csv_resume_does_not_repeat_the_header(fake_db, tmp_path, monkeypatch):
+    fake_db.respond("SELECT", rows=audit_rows)
+    path, checkpoint = tmp_path / "auditlog.csv", str(tmp_path / "auditlog.ckpt")
+    restore = crash_on_second_checkpoint(monkeypatch)
+
+    with pytest.raises(KeyboardInterrupt):
+        export(AuditLog, path, format="csv", chunk_size=2, checkpoint=checkpoint)
+    restore()
+    export(AuditLog, path, format="csv", chunk_size=2, checkpoint=checkpoint)
+
+    lines = path.read_text().splitlines()
+    assert lines[0].startswith("audit_log_id,") and [line[0] for line in lines[1:]] == ["1", "2", "3", "4"]
@@ -0,0 +1,129 @@
+import os
+from datetime import datetime
+
+import pytest
+
+import orm.ids
+from models.models import VerificationEvent
+from orm.ids import TimeOrdered
+
+
+@pytest.fixture
+def node(monkeypatch):
+    monkeypatch.setattr(orm.ids, "node_id", lambda bits: 5)
+
+
+def test_int_key_column_is_rejected(fake_db, node):
+    fake_db.respond("information_schema.columns", rows=[("int",)])
+
+    with pytest.raises(ValueError, match="0001_time_ordered_keys.sql"):
+        TimeOrdered().new_id(VerificationEvent)
+
+
+def test_bigint_key_column_is_checked_once(fake_db, node):
+    fake_db.respond("information_schema.columns", rows=lambda sql, values: [("bigint",)])
+    strategy = TimeOrdered()
+
+    strategy.new_id(VerificationEvent)
+    strategy.new_id(VerificationEvent)
+    assert len(fake_db.executed("information_schema.columns")) == 1
+
+
+class Clock:
+    def __init__(self, *times):
+        self.times = list(times)
+
+    def __call__(self):
+        return self.times.pop(0) if len(self.times) > 1 else self.times[0]
+
+
+def time_ordered(fake_db, clock):
+    fake_db.respond("information_schema.columns", rows=lambda sql, values: [("bigint",)])
+    strategy = TimeOrdered(epoch=datetime(2024, 1, 1))
+    strategy._now = clock
+    return strategy
+
+
+def test_time_ordered_bit_layout(fake_db, node):
+    strategy = time_ordered(fake_db, Clock(TimeOrdered().epoch_ms + 123_456))
+
+    first, second = strategy.new_id(VerificationEvent), strategy.new_id(VerificationEvent)
+
+    assert first >> 22 == 123_456
+    assert (first >> 12) & 1023 == 5
+    assert first & 4095 == 0
+    assert second == first + 1
+    assert first < 1 << 63
+
+
+def test_time_ordered_keys_increase(fake_db, node):
+    start = TimeOrdered().epoch_ms + 1000
+    strategy = time_ordered(fake_db, Clock(start, start + 1, start - 50, start + 2))
+
+    ids = [strategy.new_id(VerificationEvent) for _ in range(4)]
+
+    assert ids == sorted(ids) and len(set(ids)) == 4
+    assert ids[2] >> 22 == 1001     # the clock went back: stays on the last millisecond
+
+
+def test_time_ordered_counter_rollover_waits_for_next_millisecond(fake_db, node):
+    start = TimeOrdered().epoch_ms + 1000
+    strategy = time_ordered(fake_db, Clock(*[start] * 4097, start + 1))
+
+    ids = [strategy.new_id(VerificationEvent) for _ in range(4097)]
+
+    assert ids == sorted(ids) and len(set(ids)) == 4097
+    assert ids[-1] >> 22 == 1001 and ids[-1] & 4095 == 0
+
+
+def claimed_holder(fake_db):
+    return lambda sql, values: [(fake_db.executed("INSERT INTO orm_node_lease")[-1][1][1],)]
+
+
+def test_lease_takes_the_lowest_free_node_id(fake_db):
+    fake_db.respond("WHERE expires_at > NOW()", rows=[(0,), (1,), (3,)])
+    fake_db.respond("SELECT holder FROM orm_node_lease", rows=claimed_holder(fake_db))
+
+    lease = orm.ids.NodeLease.acquire(1024)
+    assert lease.node_id == 2
+    assert lease.valid()
+
+    lease.release()
+    assert fake_db.executed("DELETE FROM orm_node_lease")[0][1] == (2, lease.holder)
+
+
+def test_lease_skips_ids_claimed_concurrently(fake_db):
+    fake_db.respond("SELECT holder FROM orm_node_lease", rows=lambda sql, values: (
+        [("other-process",)] if values == (0,) else claimed_holder(fake_db)(sql, values)))
+
+    lease = orm.ids.NodeLease.acquire(1024)
+    lease.release()
+
+    assert lease.node_id == 1
+
+
+def test_no_free_node_id_raises(fake_db):
+    fake_db.respond("WHERE expires_at > NOW()", rows=[(node,) for node in range(4)])
+
+    with pytest.raises(RuntimeError, match="leased"):
+        orm.ids.NodeLease.acquire(4)
+
+
+def test_lost_or_inherited_lease_is_replaced(fake_db, monkeypatch):
+    fake_db.respond("SELECT holder FROM orm_node_lease", rows=claimed_holder(fake_db))
+    monkeypatch.setattr(orm.ids, "_lease", None)
+
+    first = orm.ids.node_id(10)
+    lease = orm.ids._lease
+    fake_db.respond("WHERE expires_at > NOW()", rows=[(first,)])
+
+    fake_db.respond("UPDATE orm_node_lease", rowcount=0)
+    lease.renew()
+    assert lease.lost
+    assert orm.ids.node_id(10) != first
+
+    orm.ids._lease.pid = -1          # as seen from a forked child
+    assert not orm.ids._lease.valid()
+    orm.ids.node_id(10)
+    assert orm.ids._lease.pid == os.getpid()
+    orm.ids._lease.release()
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+
+# Cumulative import time budget for `models.models`, in microseconds. Importing the models must not
+# pull in the MySQL driver or load `.env`; that happens on the first connection.
+IMPORT_BUDGET_US = 50_000
+
+
+def import_times(module):
+    """Return `{module name: cumulative import time in microseconds}` for a fresh `import module`."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stderr
+
+    imported = {}
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imported[name.strip()] = int(cumulative)
+    return imported
+
+
+def test_models_import_does_not_load_the_driver():
+    imported = import_times("models.models")
+
+    assert "mysql.connector" not in imported, "models.models imports mysql.connector eagerly"
+    assert "dotenv" not in imported, "models.models imports dotenv eagerly"
+
+
+def test_models_import_within_budget():
+    imported = import_times("models.models")
+
+    assert imported["models.models"] <= IMPORT_BUDGET_US, \
+        f"models.models took {imported['models.models']}us to import (budget {IMPORT_BUDGET_US}us)"
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+
+from models.models import DigitalCertificate, Signature, SignatureRevocation, User
+
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def verification_join():
+    return (Signature.join_builder()
+            .join(DigitalCertificate, on="digital_certificate_id")
+            .left_join(SignatureRevocation, on="signature_id"))
+
+
+def test_columns_are_aliased_per_table():
+    sql, values = (Signature.join_builder()
+                   .join(DigitalCertificate, on="digital_certificate_id")
+                   .columns(Signature, "user_id")
+                   .columns("digitalcertificate", "user_id")
+                   .where(document_id=42)
+                   .sql())
+
+    assert sql.startswith("SELECT signature.signature_id AS signature__signature_id, "
+                          "signature.user_id AS signature__user_id, "
+                          "digitalcertificate.digital_certificate_id AS digitalcertificate__digital_certificate_id, "
+                          "digitalcertificate.user_id AS digitalcertificate__user_id FROM signature AS signature ")
+    assert sql.endswith("WHERE signature.document_id = %s")
+    assert values == (42,)
+
+
+def test_on_clauses():
+    sql, _ = (verification_join()
+              .join(User, on=("signature.user_id", "user.user_id"))
+              .sql())
+
+    assert "JOIN digitalcertificate AS digitalcertificate ON " \
+           "signature.digital_certificate_id = digitalcertificate.digital_certificate_id" in sql
+    assert "LEFT JOIN signaturerevocation AS signaturerevocation ON " \
+           "signature.signature_id = signaturerevocation.signature_id" in sql
+    assert "JOIN user AS user ON signature.user_id = user.user_id" in sql
+
+
+def test_same_model_twice_gets_a_second_alias():
+    builder = Signature.join_builder().join(Signature, on=("signature.document_id", "signature_2.document_id"))
+
+    sql, _ = builder.sql()
+    assert "JOIN signature AS signature_2 ON signature.document_id = signature_2.document_id" in sql
+    with pytest.raises(ValueError, match="already used"):
+        builder.join(User, on="user_id", alias="signature")
+
+
+def test_unknown_column_and_missing_on_are_rejected():
+    with pytest.raises(ValueError, match="Unknown column"):
+        Signature.join_builder().where({"signature.nope": 1})
+    with pytest.raises(ValueError, match="No joined table"):
+        Signature.join_builder().join(User, on="email")
+    with pytest.raises(ValueError, match="ON fields"):
+        Signature.join_builder().join(User, on=("signature.user_id",))
+
+
+def test_colliding_columns_keep_both_values(fake_db):
+    fake_db.respond("FROM signature AS signature", rows=[
+        {"signature__signature_id": 1, "signature__user_id": 7,
+         "digitalcertificate__digital_certificate_id": 3, "digitalcertificate__user_id": 8}])
+
+    row, = (Signature.join_builder()
+            .join(DigitalCertificate, on="digital_certificate_id")
+            .columns(Signature, "user_id")
+            .columns(DigitalCertificate, "user_id")
+            .all())
+
+    assert row["signature.user_id"] == 7 and row["digitalcertificate.user_id"] == 8
+
+
+def test_hydrates_each_table_into_its_model(fake_db):
+    fake_db.respond("FROM signature AS signature", rows=[
+        {"signature__signature_id": 1, "signature__user_id": 7, "signature__timestamp": NOW,
+         "digitalcertificate__digital_certificate_id": 3, "digitalcertificate__user_id": 8,
+         "signaturerevocation__revocation_id": None, "signaturerevocation__signature_id": None}])
+
+    (signature, certificate, revocation), = verification_join().all(hydrate=True)
+
+    assert isinstance(signature, Signature) and (signature.signature_id, signature.user_id) == (1, 7)
+    assert isinstance(certificate, DigitalCertificate) and certificate.user_id == 8
+    assert revocation is None
+
+
+def test_first_limits_to_one_row(fake_db):
+    assert verification_join().first() is None
+    assert fake_db.statements[0][0].endswith("LIMIT 1")
@@ -0,0 +1,66 @@
+import asyncio
+import random
+
+import pytest
+
+import orm.aio
+import orm.ids
+from orm.dbconnectors import MySQL
+from loadtest import Fixtures, Recorder, Workload, _timed
+
+
+@pytest.fixture
+def workload(fake_db, monkeypatch):
+    monkeypatch.setattr(orm.ids, "node_id", lambda bits: 5)
+    fake_db.respond("information_schema.columns", rows=lambda sql, values: [("bigint",)])
+    fake_db.respond("FROM signature AS signature", rows=lambda sql, values: [
+        {"signature__signature_id": values[0], "signature__user_id": 7, "signature__document_id": 10}])
+
+    # The async API without aiomysql: the same statements, run through the fake connection.
+    async def select_rows(model, sql, values, tables):
+        return model._select_rows(sql, values, tables)
+
+    async def write(statements):
+        conn = MySQL().connect()
+        cursor = conn.cursor()
+        for sql, values in statements:
+            cursor.execute(sql, values)
+        conn.commit()
+
+    monkeypatch.setattr(orm.aio, "_select_rows", select_rows)
+    monkeypatch.setattr(orm.aio, "_write", write)
+
+    fixtures = Fixtures(user_ids=[7], document_ids=[10], certificates=[(3, 7)], signature_ids=[42],
+                        event_ids=[1], grants=[(7, 10)])
+    return Workload(fixtures, random.Random(1), tracker=None)
+
+
+def statements(fake_db):
+    return [(sql.split(" (")[0], len(values)) for sql, values in fake_db.statements
+            if "information_schema" not in sql]
+
+
+def test_verify_and_averify_issue_the_same_transaction(fake_db, workload):
+    assert workload.verify((42, True))
+    blocking, commits = statements(fake_db), fake_db.commits
+    fake_db.statements.clear()
+
+    assert asyncio.run(workload.averify((42, True)))
+    assert statements(fake_db) == blocking
+    assert fake_db.commits - commits == commits == 1
+
+    event, log = blocking[1][0], blocking[2][0]
+    assert event.startswith("INSERT INTO verificationevent") and log.startswith("INSERT INTO auditlog")
+
+
+def test_failures_are_counted_from_results_and_exceptions(fake_db, workload):
+    recorder = Recorder()
+    fake_db.respond("FROM accesscontrolentry", error=RuntimeError("lost connection"))
+    fake_db.respond("INSERT INTO verificationevent", error=RuntimeError("deadlock"))
+
+    _timed(recorder, "access", lambda: workload.access((7, 10)))
+    _timed(recorder, "verify", lambda: workload.verify((42, True)))
+    _timed(recorder, "sign", lambda: True)
+
+    assert recorder.errors["access"] == 1 and recorder.errors["verify"] == 1
+    assert recorder.errors["sign"] == 0
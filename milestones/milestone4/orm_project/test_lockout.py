@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+from services.lockout import LockoutTracker
+
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **delta):
+        self.now += timedelta(**delta)
+
+
+def make_tracker():
+    clock = Clock(NOW)
+    return LockoutTracker(max_attempts=3, window=timedelta(hours=24), lock_duration=timedelta(hours=24),
+                          clock=clock), clock
+
+
+def test_third_failure_in_window_locks(fake_db):
+    tracker, clock = make_tracker()
+
+    assert not tracker.record_failure(7)
+    clock.advance(hours=1)
+    assert not tracker.record_failure(7)
+    clock.advance(hours=1)
+    assert tracker.record_failure(7)
+
+    assert tracker.is_locked(7)
+    assert tracker.locked_until(7) == NOW + timedelta(hours=26)
+    assert not tracker.is_locked(8)
+    assert fake_db.executed("UPDATE session")[-1][1] == (NOW + timedelta(hours=26), 7)
+
+
+def test_failures_outside_window_do_not_count(fake_db):
+    tracker, clock = make_tracker()
+
+    tracker.record_failure(7)
+    tracker.record_failure(7)
+    clock.advance(hours=24)
+    assert not tracker.record_failure(7)
+    assert not tracker.is_locked(7)
+
+
+def test_lock_expires_after_lock_duration(fake_db):
+    tracker, clock = make_tracker()
+    for _ in range(3):
+        tracker.record_failure(7)
+
+    clock.advance(hours=23, minutes=59)
+    assert tracker.is_locked(7)
+    clock.advance(minutes=1)
+    assert not tracker.is_locked(7)
+    assert tracker.locked_until(7) is None
+
+
+def test_failures_while_locked_do_not_extend_the_lock(fake_db):
+    tracker, clock = make_tracker()
+    for _ in range(3):
+        tracker.record_failure(7)
+    writes = len(fake_db.statements)
+
+    clock.advance(hours=12)
+    for _ in range(3):
+        assert not tracker.record_failure(7)
+
+    assert tracker.locked_until(7) == NOW + timedelta(hours=24)
+    assert len(fake_db.statements) == writes
+
+
+def test_user_without_session_gets_one(fake_db):
+    fake_db.respond("UPDATE session", rowcount=0)
+    tracker, _ = make_tracker()
+
+    tracker.record_failure(7)
+
+    (sql, values), = fake_db.executed("INSERT INTO session")
+    assert "(user_id, start_time, result, failedAttempts, lockedUntil)" in sql
+    assert values == (7, NOW, "failure", None)
+    assert fake_db.commits == 1
+
+
+def test_lock_of_user_without_session_is_inserted_as_failure(fake_db):
+    fake_db.respond("UPDATE session", rowcount=0)
+    tracker, _ = make_tracker()
+
+    for _ in range(3):
+        tracker.record_failure(7)
+
+    assert fake_db.executed("INSERT INTO session")[-1][1] == (7, NOW, "failure", NOW + timedelta(hours=24))
+
+
+def test_user_row_is_locked_before_the_session_write(fake_db):
+    tracker, _ = make_tracker()
+
+    tracker.record_failure(7)
+
+    sql = [statement for statement, _ in fake_db.statements]
+    assert sql[0] == "SELECT user_id FROM user WHERE user_id = %s FOR UPDATE"
+    assert sql[1].startswith("UPDATE session")
+
+
+def test_success_clears_failures(fake_db):
+    tracker, _ = make_tracker()
+    tracker.record_failure(7)
+    tracker.record_failure(7)
+
+    tracker.record_success(7)
+    assert not tracker.record_failure(7)
+    assert fake_db.executed("SET failedAttempts = 0")
+
+
+def test_load_reads_active_locks(fake_db):
+    fake_db.respond("SELECT user_id, MAX(lockedUntil)", rows=[(7, NOW + timedelta(hours=1))])
+    tracker, _ = make_tracker()
+
+    assert tracker.load() == 1
+    assert tracker.is_locked(7)
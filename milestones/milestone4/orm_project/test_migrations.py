@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from orm.migrations import Migrations
+
+
+MIGRATION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations", "0001_time_ordered_keys.sql")
+
+
+def test_sections_are_split_into_statements():
+    up, down = Migrations._read_sections(MIGRATION)
+
+    assert up[0] == ("ALTER TABLE signaturerevocation DROP FOREIGN KEY fk_SignatureRevocation_Signature", ())
+    assert any("MODIFY verification_event_id BIGINT NOT NULL AUTO_INCREMENT" in sql for sql, _ in up)
+    assert any("MODIFY signature_id INT NOT NULL AUTO_INCREMENT" in sql for sql, _ in down)
+    assert not any(sql.startswith("--") for sql, _ in up + down)
+
+
+def test_every_dropped_foreign_key_is_added_back():
+    for statements in Migrations._read_sections(MIGRATION):
+        dropped = {sql.split()[-1] for sql, _ in statements if "DROP FOREIGN KEY" in sql}
+        added = {sql.split("ADD CONSTRAINT ")[1].split()[0] for sql, _ in statements if "ADD CONSTRAINT" in sql}
+        assert dropped == added
+
+
+def test_apply_runs_and_records_once(fake_db):
+    assert Migrations.apply_migration(MIGRATION)
+    assert fake_db.executed("INSERT INTO orm_migration")[0][1] == ("0001_time_ordered_keys.sql",)
+    assert fake_db.executed("MODIFY signature_id BIGINT")
+
+    fake_db.respond("SELECT name FROM orm_migration", rows=[("0001_time_ordered_keys.sql",)])
+    statements = len(fake_db.statements)
+    assert Migrations.apply_migration(MIGRATION)
+    assert len(fake_db.statements) == statements + 2   # only the bookkeeping queries
+
+
+def test_failed_statement_is_not_recorded(fake_db):
+    fake_db.respond("MODIFY signature_id BIGINT", error=RuntimeError("Cannot change column"))
+
+    assert not Migrations.apply_migration(MIGRATION)
+    assert not fake_db.executed("INSERT INTO orm_migration")
+
+
+def test_file_without_sections_is_rejected(tmp_path):
+    path = tmp_path / "0002_broken.sql"
+    path.write_text("ALTER TABLE signature ADD COLUMN note TEXT;\n")
+
+    with pytest.raises(ValueError, match="migrate:up"):
+        Migrations._read_sections(str(path))
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from orm.base import Base
+from orm.columns import Column
+from orm.datatypes import DateTime, Integer, String
+from orm.partitions import MonthlyTables, add_partitions
+
+
+class Reading(Base):
+    __partition__ = MonthlyTables("taken_at")
+
+    reading_id = Column(Integer, primary_key=True)
+    taken_at = Column(DateTime())
+    value = Column(String(50))
+
+
+MONTHS = [("reading_202601",), ("reading_202602",)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_month_list():
+    Reading.__partition__.forget("reading")
+
+
+def test_save_writes_to_the_month_table(fake_db):
+    Reading(reading_id=1, taken_at=datetime(2026, 2, 3), value="x").save()
+
+    assert fake_db.executed("INSERT INTO reading_202602")
+
+
+def test_reads_cover_every_month_table(fake_db):
+    fake_db.respond("information_schema.tables", rows=MONTHS)
+    fake_db.respond("SELECT * FROM (SELECT", rows=lambda sql, values: [
+        {"reading_id": 1, "taken_at": datetime(2026, 2, 3), "value": "x"}])
+
+    assert Reading.get("reading", 1).value == "x"
+    assert len(Reading.query(value="x")) == 1
+
+    sql, _ = fake_db.executed("FROM (SELECT")[0]
+    assert "SELECT * FROM reading_202601 UNION ALL SELECT * FROM reading_202602) AS reading" in sql
+
+
+def test_delete_removes_from_every_month_table(fake_db):
+    fake_db.respond("information_schema.tables", rows=MONTHS)
+
+    Reading.delete("reading", 1)
+
+    assert [sql for sql, _ in fake_db.executed("DELETE FROM")] == [
+        "DELETE FROM reading_202601 WHERE reading_id = %s",
+        "DELETE FROM reading_202602 WHERE reading_id = %s",
+    ]
+    assert fake_db.commits == 1
+
+
+def test_base_table_is_read_until_months_exist(fake_db):
+    Reading.query(value="x")
+
+    assert fake_db.executed("SELECT * FROM reading WHERE value = %s")
+
+
+def test_range_query_reads_the_base_table_until_months_exist(fake_db):
+    fake_db.respond("FROM reading WHERE", rows=[{"reading_id": 1, "taken_at": datetime(2026, 2, 3), "value": "x"}])
+
+    found = Reading.query_range(datetime(2026, 2, 1), datetime(2026, 3, 1))
+
+    assert [row.reading_id for row in found] == [1]
+    assert fake_db.executed("SELECT * FROM reading WHERE taken_at >= %s AND taken_at < %s")
+
+
+def test_month_list_is_cached_and_refreshed_by_add_partitions(fake_db):
+    fake_db.respond("information_schema.tables", rows=MONTHS)
+    Reading.query(value="x")
+    Reading.query(value="x")
+    assert len(fake_db.executed("information_schema.tables")) == 1
+
+    add_partitions(Reading, until="2026-03", start="2026-03")
+    Reading.query(value="x")
+    assert len(fake_db.executed("information_schema.tables")) == 2
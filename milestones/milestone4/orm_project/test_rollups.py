@@ -0,0 +1,89 @@
+from datetime import date, datetime
+from itertools import count
+
+import pytest
+
+from models.models import AuditLog
+from services.rollups import AuditRollups
+
+
+def entry(user_id, action, result, timestamp=datetime(2026, 3, 4, 10, 0, 0)):
+    return AuditLog(user_id=user_id, action=action, result=result, timestamp=timestamp)
+
+
+@pytest.fixture(autouse=True)
+def ids(monkeypatch):
+    next_id = count(1)
+    monkeypatch.setattr(AuditLog.__id_strategy__, "new_id", lambda model: next(next_id))
+
+
+def upserts(fake_db):
+    return fake_db.executed("INSERT INTO auditlogrollup")
+
+
+def test_bulk_insert_is_counted_into_one_upsert(fake_db):
+    AuditRollups().attach()
+
+    AuditLog.bulk_save([
+        entry(7, "login", "success"),
+        entry(7, "login", "success", datetime(2026, 3, 31, 23, 59, 59)),
+        entry(7, "login", "failure"),
+        entry(None, None, None, datetime(2026, 4, 1, 0, 0, 0)),
+        entry(8, "login", "success", None),
+    ])
+
+    [(sql, values)] = upserts(fake_db)
+    assert sql.count("(%s, %s, %s, %s, %s)") == 3
+    assert sql.endswith("ON DUPLICATE KEY UPDATE action_count = action_count + VALUES(action_count)")
+    rows = [values[i:i + 5] for i in range(0, len(values), 5)]
+    assert sorted(rows) == [
+        (date(2026, 3, 1), 7, "login", "failure", 1),
+        (date(2026, 3, 1), 7, "login", "success", 2),
+        (date(2026, 4, 1), 0, "", "", 1),
+    ]
+
+
+def test_each_insert_adds_one(fake_db):
+    AuditRollups().attach()
+
+    entry(7, "login", "success").save()
+    entry(7, "login", "success").save()
+
+    assert [values for _, values in upserts(fake_db)] == [(date(2026, 3, 1), 7, "login", "success", 1)] * 2
+
+
+def test_rebuild_month_replaces_it_in_one_transaction(fake_db):
+    assert AuditRollups().rebuild("2026-03")
+
+    assert fake_db.executed("DELETE FROM auditlogrollup")[0][1] == (date(2026, 3, 1),)
+    [(sql, values)] = upserts(fake_db)
+    assert "FROM auditlog WHERE timestamp IS NOT NULL AND timestamp >= %s AND timestamp < %s" in sql
+    assert values == (date(2026, 3, 1), date(2026, 4, 1))
+    assert fake_db.commits == 1
+
+
+def test_reconcile_rebuilds_only_drifted_months(fake_db):
+    fake_db.respond("FROM auditlog WHERE timestamp >= %s",
+                    rows=[("2026-01-01", 5), ("2026-02-01", 4), ("2026-03-01", 2)])
+    fake_db.respond("FROM auditlogrollup WHERE summary_month >= %s",
+                    rows=[(date(2026, 1, 1), 5), (date(2026, 2, 1), 3)])
+
+    rebuilt = AuditRollups().reconcile("2026-01")
+
+    assert rebuilt == [date(2026, 2, 1), date(2026, 3, 1)]
+    assert fake_db.executed("FROM auditlog WHERE timestamp >= %s")[0][1] == (date(2026, 1, 1),)
+    assert [values for _, values in fake_db.executed("DELETE FROM auditlogrollup")] == [
+        (date(2026, 2, 1),), (date(2026, 3, 1),)]
+
+
+def test_reconcile_rebuilds_months_missing_from_the_log(fake_db):
+    fake_db.respond("FROM auditlogrollup WHERE summary_month >= %s", rows=[(date(2026, 1, 1), 1)])
+
+    assert AuditRollups().reconcile("2026-01") == [date(2026, 1, 1)]
+
+
+def test_reconcile_does_nothing_when_totals_cannot_be_read(fake_db):
+    fake_db.respond("FROM auditlog WHERE timestamp >= %s", error=RuntimeError("gone"))
+
+    assert AuditRollups().reconcile("2026-01") == []
+    assert not fake_db.executed("DELETE FROM auditlogrollup")
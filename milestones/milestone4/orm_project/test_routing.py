@@ -0,0 +1,91 @@
+import asyncio
+import contextvars
+import threading
+import types
+
+import pytest
+
+import orm.dbconnectors
+from orm.dbconnectors import MySQL
+
+
+PRIMARY, REPLICA = ("primary", 3306), ("replica", 3307)
+
+
+class DriverError(Exception):
+    pass
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Record the endpoint of every connection opened, with one replica configured."""
+    endpoints = []
+    monkeypatch.setenv("DB_HOST", "primary")
+    monkeypatch.setenv("DB_REPLICA_HOSTS", "replica:3307")
+    monkeypatch.setattr(orm.dbconnectors, "_router", None)
+    monkeypatch.setattr(orm.dbconnectors, "_driver", types.SimpleNamespace(Error=DriverError))
+    monkeypatch.setattr(orm.dbconnectors, "_last_write", contextvars.ContextVar("last_write", default=None))
+
+    def _open(mysql, endpoint, **options):
+        endpoints.append(endpoint)
+        return object()
+
+    monkeypatch.setattr(MySQL, "_open", _open)
+    return endpoints
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(opened):
+    MySQL().connect(read=True)
+    MySQL().connect()
+
+    assert opened == [REPLICA, PRIMARY]
+
+
+def test_reads_after_a_write_stick_to_the_primary(opened, monkeypatch):
+    MySQL.mark_write()
+    MySQL().connect(read=True)
+    assert opened == [PRIMARY]
+
+    monkeypatch.setenv("DB_STICKY_SECONDS", "0")
+    MySQL().connect(read=True)
+    assert opened == [PRIMARY, REPLICA]
+
+
+def test_stickiness_follows_the_context(opened):
+    MySQL.mark_write()
+
+    contextvars.copy_context().run(MySQL().connect, read=True)      # copies the write time
+    thread = threading.Thread(target=MySQL().connect, kwargs={"read": True})
+    thread.start()                                                   # starts with an empty context
+    thread.join()
+
+    async def read_in_task():
+        MySQL().connect(read=True)
+
+    asyncio.run(read_in_task())                                      # the task copies the context
+
+    assert opened == [PRIMARY, REPLICA, PRIMARY]
+
+
+def test_write_in_a_task_does_not_make_the_caller_sticky(opened):
+    async def write_in_task():
+        MySQL().connect()
+
+    asyncio.run(write_in_task())
+    MySQL().connect(read=True)
+
+    assert opened == [PRIMARY, REPLICA]
+
+
+def test_unavailable_replica_is_ejected(opened, monkeypatch):
+    def _open(mysql, endpoint, **options):
+        opened.append(endpoint)
+        if endpoint == REPLICA:
+            raise DriverError("connection refused")
+        return object()
+
+    monkeypatch.setattr(MySQL, "_open", _open)
+    MySQL().connect(read=True)
+    MySQL().connect(read=True)
+
+    assert opened == [REPLICA, PRIMARY, PRIMARY]
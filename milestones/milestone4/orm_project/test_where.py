@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+
+from models.models import AuditLog
+from orm.base import _lookup_values
+
+
+START, END = datetime(2026, 1, 1), datetime(2026, 2, 1)
+
+
+@pytest.mark.parametrize("lookup, sql", [
+    ("timestamp", "WHERE timestamp = %s"),
+    ("timestamp__lt", "WHERE timestamp < %s"),
+    ("timestamp__lte", "WHERE timestamp <= %s"),
+    ("timestamp__gt", "WHERE timestamp > %s"),
+    ("timestamp__gte", "WHERE timestamp >= %s"),
+])
+def test_comparison_lookups(lookup, sql):
+    assert AuditLog.where(**{lookup: START}) == sql
+    assert _lookup_values({lookup: START}) == [START]
+
+
+def test_between_takes_two_parameters_in_order():
+    conditions = {"user_id": 7, "timestamp__between": (START, END), "result": "failure"}
+
+    assert AuditLog.where(**conditions) == "WHERE user_id = %s AND timestamp BETWEEN %s AND %s AND result = %s"
+    assert _lookup_values(conditions) == [7, START, END, "failure"]
+
+
+def test_query_sends_the_parameters(fake_db):
+    AuditLog.query(timestamp__gte=START, timestamp__lt=END)
+
+    (sql, values), = fake_db.statements
+    assert sql.endswith("WHERE timestamp >= %s AND timestamp < %s")
+    assert values == (START, END)
+
+
+def test_unknown_lookup_is_rejected():
+    with pytest.raises(ValueError, match="Unknown lookup 'since'"):
+        AuditLog.where(timestamp__since=START)